@@ -27,4 +27,197 @@ def get_high_severity_by_status(conn):
         GROUP BY status
         ORDER BY count DESC
     """
-    return pd.read_sql_query(query, conn)
\ No newline at end of file
+    return pd.read_sql_query(query, conn)
+
+# ============================================================
+# DASHBOARD BUNDLE
+# ============================================================
+
+DASHBOARD_TABLES = {
+    "users": "users",
+    "incidents": "cyber_incidents",
+    "datasets": "datasets_metadata",
+    "tickets": "it_tickets",
+}
+
+# Dashboard section -> the DASHBOARD_TABLES keys its queries read.
+# A section only has to be reloaded when one of its tables changed.
+DASHBOARD_SECTIONS = {
+    "kpis": ("users", "incidents", "datasets", "tickets"),
+    "incident_charts": ("incidents",),
+    "recent_incidents": ("incidents",),
+    "previews": ("datasets", "tickets"),
+}
+
+
+def get_table_columns(conn, table_name):
+    """
+    Return the column names of a table ([] if the table does not exist).
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _count(conn, query, params=()):
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    return int(cursor.fetchone()[0])
+
+
+def _value_counts(conn, table_name, col):
+    query = f"""
+        SELECT {col} AS value, COUNT(*) AS count
+        FROM {table_name}
+        GROUP BY {col}
+        ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+
+def _latest_rows(conn, table_name, order_candidates, limit):
+    cols = get_table_columns(conn, table_name)
+    order_col = next((c for c in order_candidates if c in cols), "id")
+    return pd.read_sql_query(
+        f"SELECT * FROM {table_name} ORDER BY {order_col} DESC LIMIT ?",
+        conn,
+        params=(limit,),
+    )
+
+
+def get_dashboard_bundle(conn, sections=None):
+    """
+    Run every query the Dashboard page needs and return the results.
+
+    Missing tables / columns give None (or 0 for counts) instead of an
+    error, so the page can show an info box for that section.
+
+    `sections` limits the queries to some of DASHBOARD_SECTIONS (the live
+    dashboard reloads one section at a time); the result then only holds
+    those sections' keys.
+
+    Returns:
+        dict with keys:
+            counts               {"users", "incidents", "datasets", "tickets"} -> int
+            open_incidents       int
+            high_crit_incidents  int
+            severity_counts      DataFrame(value, count) or None
+            status_counts        DataFrame(value, count) or None
+            recent_incidents     DataFrame or None
+            datasets_preview     DataFrame or None
+            tickets_preview      DataFrame or None
+    """
+    sections = set(DASHBOARD_SECTIONS if sections is None else sections)
+    unknown = sections - set(DASHBOARD_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown dashboard section(s): {', '.join(sorted(unknown))}")
+
+    needed = {key for section in sections for key in DASHBOARD_SECTIONS[section]}
+    columns = {key: get_table_columns(conn, DASHBOARD_TABLES[key]) for key in needed}
+    exists = {key: bool(cols) for key, cols in columns.items()}
+    incidents = DASHBOARD_TABLES["incidents"]
+    inc_cols = columns.get("incidents", [])
+
+    bundle = {}
+
+    if "kpis" in sections:
+        bundle["counts"] = {
+            key: _count(conn, f"SELECT COUNT(*) FROM {name}") if exists[key] else 0
+            for key, name in DASHBOARD_TABLES.items()
+        }
+        bundle["open_incidents"] = 0
+        bundle["high_crit_incidents"] = 0
+        if "status" in inc_cols:
+            bundle["open_incidents"] = _count(
+                conn, f"SELECT COUNT(*) FROM {incidents} WHERE status = ?", ("Open",)
+            )
+        if "severity" in inc_cols:
+            bundle["high_crit_incidents"] = _count(
+                conn, f"SELECT COUNT(*) FROM {incidents} WHERE severity IN ('High', 'Critical')"
+            )
+
+    if "incident_charts" in sections:
+        bundle["severity_counts"] = None
+        bundle["status_counts"] = None
+        if "severity" in inc_cols:
+            bundle["severity_counts"] = _value_counts(conn, incidents, "severity")
+        if "status" in inc_cols:
+            bundle["status_counts"] = _value_counts(conn, incidents, "status")
+
+    if "recent_incidents" in sections:
+        bundle["recent_incidents"] = None
+        if exists["incidents"]:
+            bundle["recent_incidents"] = _latest_rows(conn, incidents, ["created_at"], 10)
+
+    if "previews" in sections:
+        bundle["datasets_preview"] = None
+        bundle["tickets_preview"] = None
+        if exists["datasets"]:
+            bundle["datasets_preview"] = _latest_rows(
+                conn, DASHBOARD_TABLES["datasets"], ["upload_date", "created_at"], 5
+            )
+        if exists["tickets"]:
+            bundle["tickets_preview"] = _latest_rows(
+                conn, DASHBOARD_TABLES["tickets"], ["created_at", "created_date"], 5
+            )
+
+    return bundle
+
+
+# ============================================================
+# TREND SERIES (full resolution; charts downsample them)
+# ============================================================
+
+def get_incident_timeline(conn):
+    """
+    Incidents per hour of created_at, every hour from the first to the
+    last incident (hours without incidents count 0).
+
+    Returns:
+        Series (DatetimeIndex -> count) or None if the table / column is missing
+    """
+    incidents = DASHBOARD_TABLES["incidents"]
+    if "created_at" not in get_table_columns(conn, incidents):
+        return None
+    counts = pd.read_sql_query(
+        f"""
+        SELECT substr(created_at, 1, 13) AS hour, COUNT(*) AS count
+        FROM {incidents}
+        WHERE created_at IS NOT NULL
+        GROUP BY hour
+        """,
+        conn,
+    )
+    hours = pd.to_datetime(counts["hour"], format="%Y-%m-%d %H", errors="coerce")
+    counts = pd.Series(counts["count"].to_numpy(), index=hours)
+    counts = counts[counts.index.notna()].groupby(level=0).sum()
+    if counts.empty:
+        return counts
+    full = pd.date_range(counts.index[0], counts.index[-1], freq="h")
+    return counts.reindex(full, fill_value=0).rename("incidents")
+
+
+def get_ticket_resolution_series(conn):
+    """
+    Resolution time of every ticket that has one, ordered by created_at.
+
+    Returns:
+        Series (DatetimeIndex -> hours) or None if the table / columns are missing
+    """
+    tickets = DASHBOARD_TABLES["tickets"]
+    cols = get_table_columns(conn, tickets)
+    if "created_at" not in cols or "resolution_time_hours" not in cols:
+        return None
+    df = pd.read_sql_query(
+        f"""
+        SELECT created_at, resolution_time_hours
+        FROM {tickets}
+        WHERE created_at IS NOT NULL AND resolution_time_hours IS NOT NULL
+        """,
+        conn,
+    )
+    created = pd.to_datetime(df["created_at"], format="ISO8601", errors="coerce")
+    series = pd.Series(df["resolution_time_hours"].to_numpy(dtype="float64"), index=created)
+    # sorted here rather than in SQL: created_at strings of mixed formats
+    # do not sort as timestamps
+    return series[series.index.notna()].sort_index(kind="stable").rename("resolution_time_hours")
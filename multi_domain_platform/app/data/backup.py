@@ -0,0 +1,394 @@
+import hashlib
+import json
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.data.db import ARCHIVE_FILE, CATALOG_FILE, SHARDS, get_data_dir, is_sharded
+
+
+SNAPSHOT_DIR = "snapshots"       # data/snapshots/<YYYYmmdd-HHMMSS>/
+MANIFEST_FILE = "manifest.json"
+
+# Incremental copy: PAGES_PER_STEP pages per backup step, then STEP_SLEEP
+# seconds with no lock held so writers can commit in between.
+PAGES_PER_STEP = 256
+STEP_SLEEP = 0.005
+
+# A write from another connection restarts an incremental backup; after
+# this many restarts the copy is finished in a single step instead.
+MAX_RESTARTS = 5
+
+KEEP_SNAPSHOTS = 7
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def database_files(data_dir=None):
+    """
+    The live database files of the current layout (some may not exist).
+
+    Returns:
+        dict: name -> Path (catalog, one entry per shard when sharded, and
+        archive for the retention archive)
+    """
+    data_dir = Path(data_dir or get_data_dir())
+    files = {"catalog": data_dir / CATALOG_FILE}
+    if is_sharded(data_dir):
+        files.update({domain: data_dir / filename for domain, (filename, _) in SHARDS.items()})
+    files["archive"] = data_dir / ARCHIVE_FILE
+    return files
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ============================================================
+# COPYING
+# ============================================================
+
+def _pin_read_snapshot(src, schemas):
+    """
+    Open one read transaction on `src` and read every schema in it, so
+    each WAL file is held at the same snapshot for the rest of the
+    transaction. In WAL mode this does not block writers, and a backup
+    taken inside it never restarts.
+    """
+    src.execute("BEGIN")
+    for schema in schemas:
+        src.execute(f"SELECT COUNT(*) FROM {schema}.sqlite_master").fetchone()
+
+
+def _copy_schema(src, schema, dest_path, pages, step_sleep, max_restarts):
+    """
+    Copy one database of the connection `src` (main or an attached
+    schema) to dest_path with the online backup API, `pages` pages per
+    step with a sleep between steps.
+
+    Returns:
+        dict: pages, steps, restarts, single_step (fallback used)
+    """
+    dest_path = Path(dest_path)
+    tmp_path = dest_path.with_suffix(dest_path.suffix + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    stats = {"pages": 0, "steps": 0, "restarts": 0, "single_step": False}
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining
+        stats["steps"] += 1
+        stats["pages"] = total
+        if last_remaining is not None and remaining >= last_remaining:
+            stats["restarts"] += 1        # source changed: the copy started over
+            if stats["restarts"] > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        if remaining and step_sleep:
+            time.sleep(step_sleep)
+
+    dest = sqlite3.connect(str(tmp_path))
+    try:
+        try:
+            src.backup(dest, pages=pages, progress=progress, name=schema)
+        except _TooManyRestarts:
+            # busy source: copy everything while holding the read lock once
+            stats["single_step"] = True
+            src.backup(dest, pages=-1, name=schema)
+    finally:
+        dest.close()
+
+    tmp_path.replace(dest_path)
+    return stats
+
+
+def backup_file(src_path, dest_path, pages=PAGES_PER_STEP, step_sleep=STEP_SLEEP,
+                max_restarts=MAX_RESTARTS):
+    """
+    Copy one live database with the online backup API.
+
+    The copy runs `pages` pages per step and sleeps in the progress
+    callback between steps. The result is a consistent snapshot of a
+    single point in time:
+
+    - WAL databases: one read transaction is held for the whole copy,
+      which does not block writers
+    - rollback-journal databases: the source is only locked during a
+      step, but a commit from another connection restarts the copy; after
+      `max_restarts` restarts it is finished in a single step
+
+    Returns:
+        dict: pages, steps, restarts, seconds, journal_mode,
+        single_step (fallback used)
+    """
+    start = time.perf_counter()
+    src = sqlite3.connect(str(src_path), isolation_level=None)
+    try:
+        journal_mode = src.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode == "wal":
+            _pin_read_snapshot(src, ["main"])
+        stats = _copy_schema(src, "main", dest_path, pages, step_sleep, max_restarts)
+    finally:
+        if src.in_transaction:
+            src.execute("COMMIT")
+        src.close()
+
+    stats["journal_mode"] = journal_mode
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+# ============================================================
+# SNAPSHOTS
+# ============================================================
+
+def snapshot_root(data_dir=None):
+    return Path(data_dir or get_data_dir()) / SNAPSHOT_DIR
+
+
+def create_snapshot(data_dir=None, pages=PAGES_PER_STEP, step_sleep=STEP_SLEEP, verify=True):
+    """
+    Back up every database file of the current layout, archive.db
+    included, into a new data/snapshots/<timestamp>/ folder with a
+    manifest.
+
+    All files are copied from one connection with the other files
+    ATTACHed. When every file is in WAL mode, one read transaction pins
+    all of them before the first page is copied, so the snapshot is one
+    point in time across the files (as far as SQLite allows: a WAL
+    commit is only atomic per file, see app/data/writer.py) and writers
+    are never blocked. If a file uses a rollback journal, holding that
+    transaction would block its writers for the whole copy, so each file
+    is copied on its own like backup_file() does, and the manifest says
+    "point_in_time": false.
+
+    Returns:
+        Path: the snapshot folder
+    """
+    data_dir = Path(data_dir or get_data_dir())
+    root = snapshot_root(data_dir)
+    name = time.strftime("%Y%m%d-%H%M%S")
+    folder = root / name
+    suffix = 1
+    while folder.exists():
+        folder = root / f"{name}-{suffix}"
+        suffix += 1
+    partial = folder.with_name(folder.name + ".partial")
+    partial.mkdir(parents=True)
+
+    files = {key: path for key, path in database_files(data_dir).items() if path.exists()}
+    manifest = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sharded": is_sharded(data_dir),
+        "point_in_time": False,
+        "files": {},
+    }
+    # every file attached under its key to one connection (main is unused)
+    src = sqlite3.connect(":memory:", isolation_level=None)
+    try:
+        for key, path in files.items():
+            src.execute(f"ATTACH DATABASE ? AS {key}", (str(path),))
+        modes = {key: src.execute(f"PRAGMA {key}.journal_mode").fetchone()[0] for key in files}
+        if modes and all(mode == "wal" for mode in modes.values()):
+            _pin_read_snapshot(src, list(files))
+            manifest["point_in_time"] = True
+
+        for key, path in files.items():
+            start = time.perf_counter()
+            stats = _copy_schema(src, key, partial / path.name, pages, step_sleep, MAX_RESTARTS)
+            manifest["files"][key] = {
+                "file": path.name,
+                "bytes": (partial / path.name).stat().st_size,
+                "sha256": _sha256(partial / path.name),
+                **stats,
+                "journal_mode": modes[key],
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+        if src.in_transaction:
+            src.execute("COMMIT")
+        (partial / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+        partial.rename(folder)      # a snapshot folder only appears once complete
+    except Exception:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    finally:
+        src.close()
+
+    if verify:
+        problems = verify_snapshot(folder)
+        if problems:
+            raise RuntimeError(f"Snapshot {folder.name} failed verification: {problems}")
+    return folder
+
+
+def list_snapshots(data_dir=None):
+    """
+    Complete snapshots, oldest first.
+
+    Returns:
+        list of dicts: name, path, created_at, bytes, files
+    """
+    root = snapshot_root(data_dir)
+    if not root.exists():
+        return []
+    snapshots = []
+    for folder in sorted(p for p in root.iterdir() if p.is_dir()):
+        manifest_path = folder / MANIFEST_FILE
+        if not manifest_path.exists():
+            continue                  # partial / foreign folder
+        manifest = json.loads(manifest_path.read_text())
+        snapshots.append({
+            "name": folder.name,
+            "path": folder,
+            "created_at": manifest["created_at"],
+            "bytes": sum(f["bytes"] for f in manifest["files"].values()),
+            "files": sorted(manifest["files"]),
+        })
+    return snapshots
+
+
+def rotate_snapshots(keep=KEEP_SNAPSHOTS, data_dir=None):
+    """
+    Delete all but the `keep` newest snapshots.
+
+    Returns:
+        list of str: names of the deleted snapshots
+    """
+    snapshots = list_snapshots(data_dir)
+    doomed = snapshots[:-keep] if keep > 0 else snapshots
+    for snap in doomed:
+        shutil.rmtree(snap["path"])
+    return [snap["name"] for snap in doomed]
+
+
+def verify_snapshot(folder):
+    """
+    Check a snapshot can be restored: every file matches the checksum in
+    the manifest and passes PRAGMA integrity_check.
+
+    Returns:
+        list of str: problems found (empty when the snapshot is good)
+    """
+    folder = Path(folder)
+    manifest_path = folder / MANIFEST_FILE
+    if not manifest_path.exists():
+        return [f"{folder.name}: missing {MANIFEST_FILE}"]
+
+    problems = []
+    manifest = json.loads(manifest_path.read_text())
+    for key, entry in manifest["files"].items():
+        path = folder / entry["file"]
+        if not path.exists():
+            problems.append(f"{entry['file']}: missing")
+            continue
+        if _sha256(path) != entry["sha256"]:
+            problems.append(f"{entry['file']}: checksum mismatch")
+            continue
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = [row[0] for row in conn.execute("PRAGMA integrity_check").fetchall()]
+        finally:
+            conn.close()
+        if result != ["ok"]:
+            problems.append(f"{entry['file']}: {'; '.join(result[:5])}")
+    return problems
+
+
+def restore_snapshot(folder, data_dir=None):
+    """
+    Restore every file of a verified snapshot over the live databases.
+
+    Each file is written through the backup API into the live database,
+    which replaces its content in one transaction (other connections see
+    either the old or the restored data). Stop writers first: changes
+    made since the snapshot are lost.
+
+    Returns:
+        list of str: restored file names
+    """
+    folder = Path(folder)
+    problems = verify_snapshot(folder)
+    if problems:
+        raise RuntimeError(f"Refusing to restore {folder.name}: {problems}")
+
+    data_dir = Path(data_dir or get_data_dir())
+    manifest = json.loads((folder / MANIFEST_FILE).read_text())
+    restored = []
+    for entry in manifest["files"].values():
+        src = sqlite3.connect(f"file:{folder / entry['file']}?mode=ro", uri=True)
+        dest = sqlite3.connect(str(data_dir / entry["file"]), timeout=30)
+        try:
+            src.backup(dest)
+        finally:
+            dest.close()
+            src.close()
+        restored.append(entry["file"])
+    return restored
+
+
+# ============================================================
+# SCHEDULING
+# ============================================================
+
+class SnapshotScheduler:
+    """
+    Background thread that takes a snapshot every `interval` seconds and
+    keeps the newest `keep` ones.
+
+        scheduler = SnapshotScheduler(interval=3600)
+        scheduler.start()
+        ...
+        scheduler.stop()
+    """
+
+    def __init__(self, interval, keep=KEEP_SNAPSHOTS, data_dir=None,
+                 pages=PAGES_PER_STEP, step_sleep=STEP_SLEEP, on_snapshot=None, on_error=None):
+        self.interval = interval
+        self.keep = keep
+        self.data_dir = data_dir
+        self.pages = pages
+        self.step_sleep = step_sleep
+        self.on_snapshot = on_snapshot      # on_snapshot(folder, deleted_names)
+        self.on_error = on_error            # on_error(exception)
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        folder = create_snapshot(self.data_dir, self.pages, self.step_sleep)
+        deleted = rotate_snapshots(self.keep, self.data_dir)
+        if self.on_snapshot:
+            self.on_snapshot(folder, deleted)
+        return folder
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:     # keep the schedule alive, report the failure
+                self.last_error = e
+                if self.on_error:
+                    self.on_error(e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="snapshots", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
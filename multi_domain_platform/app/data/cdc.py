@@ -0,0 +1,181 @@
+# app/data/cdc.py
+
+import json
+
+from app.data.db import table_exists
+from app.data.writer import write
+
+
+# Base table -> change log written by its CDC triggers
+CHANGE_LOGS = {
+    "cyber_incidents": "cyber_incidents_changes",
+    "it_tickets": "it_tickets_changes",
+}
+
+class ChangeLogTruncated(Exception):
+    """The changes after a consumer's cursor were already pruned from the log."""
+
+    def __init__(self, table_name, seq, oldest_seq):
+        super().__init__(
+            f"{table_name}: changes after seq {seq} were pruned "
+            f"(oldest retained is {oldest_seq}); reload from the table"
+        )
+        self.table_name = table_name
+        self.seq = seq
+        self.oldest_seq = oldest_seq
+
+
+# ============================================================
+# LOG MAINTENANCE
+# ============================================================
+
+def current_seq(conn, table_name):
+    """
+    Sequence number of the newest change (0 if nothing was logged yet).
+
+    Returns:
+        int
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {CHANGE_LOGS[table_name]}")
+    return cursor.fetchone()[0]
+
+
+def oldest_seq(conn, table_name):
+    """
+    Sequence number of the oldest change still in the log (None if empty).
+
+    Returns:
+        int or None
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN(seq) FROM {CHANGE_LOGS[table_name]}")
+    return cursor.fetchone()[0]
+
+
+def _prune_changes(conn, log, upto_seq):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"DELETE FROM {log} WHERE seq <= ? AND seq < (SELECT MAX(seq) FROM {log})",
+        (upto_seq,),
+    )
+    return cursor.rowcount
+
+
+def prune_changes(conn, table_name, upto_seq):
+    """
+    Delete logged changes with seq <= upto_seq (all consumers are past it),
+    through the writer of the file that holds the table and its log.
+
+    seq is AUTOINCREMENT, so numbers are never reused after pruning. The
+    newest change is always kept so changes_since() can tell a pruned
+    gap from an idle table.
+
+    Returns:
+        int: number of changes deleted
+    """
+    log = CHANGE_LOGS[table_name]
+    return write(conn, table_name, _prune_changes, log, upto_seq)
+
+
+# ============================================================
+# READING CHANGES
+# ============================================================
+
+def changes_since(conn, table_name, seq=0, batch_size=1000):
+    """
+    Yield the changes logged after `seq`, oldest first.
+
+    Reads the log in keyset-paginated batches (seq > last seen), so a
+    long backlog is never loaded at once and each batch is a fast range
+    scan on the primary key. Changes committed while iterating are
+    yielded too.
+
+    Each change is a dict: seq, op ("I", "U" or "D"), row_id, old, new
+    (old/new are the row as a dict, None where not applicable),
+    changed_at.
+
+    Raises:
+        ChangeLogTruncated: changes after `seq` were already pruned
+    """
+    log = CHANGE_LOGS[table_name]
+    cursor = conn.cursor()
+
+    first = oldest_seq(conn, table_name)
+    if first is not None and first > seq + 1:
+        raise ChangeLogTruncated(table_name, seq, first)
+
+    last = seq
+    while True:
+        cursor.execute(
+            f"SELECT seq, op, row_id, old, new, changed_at FROM {log} "
+            f"WHERE seq > ? ORDER BY seq LIMIT ?",
+            (last, batch_size),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        for change_seq, op, row_id, old, new, changed_at in rows:
+            yield {
+                "seq": change_seq,
+                "op": op,
+                "row_id": row_id,
+                "old": json.loads(old) if old else None,
+                "new": json.loads(new) if new else None,
+                "changed_at": changed_at,
+            }
+        last = rows[-1][0]
+
+
+# ============================================================
+# CONSUMERS
+# ============================================================
+# Everything that replays a change log from a stored position registers
+# how to read that position, so the log can be pruned up to the oldest
+# one still needed. A consumer that falls behind a pruned log gets
+# ChangeLogTruncated and rebuilds from the table.
+
+_consumers = {}           # name -> position(conn, table_name) -> seq or None
+
+
+def register_consumer(name, position):
+    """
+    Register a change-log consumer.
+
+    position(conn, table_name) returns the last seq the consumer applied,
+    or None when it keeps no position for that table (it starts from the
+    table itself, so it needs no old changes).
+    """
+    _consumers[name] = position
+
+
+def consumer_positions(conn, table_name):
+    """
+    Stored position of every registered consumer of a table's log.
+
+    Returns:
+        dict: consumer name -> seq (consumers without one are left out)
+    """
+    positions = {}
+    for name, position in _consumers.items():
+        seq = position(conn, table_name)
+        if seq is not None:
+            positions[name] = seq
+    return positions
+
+
+def prune_consumed_changes(conn, table_name):
+    """
+    Prune a table's change log up to the lowest position any registered
+    consumer still needs (everything, if no consumer keeps one). Import
+    the consumer modules first so they are registered.
+
+    Returns:
+        dict: upto_seq, deleted, positions
+    """
+    if not table_exists(conn, CHANGE_LOGS[table_name]):
+        return {"upto_seq": 0, "deleted": 0, "positions": {}}
+    positions = consumer_positions(conn, table_name)
+    upto_seq = min(positions.values(), default=current_seq(conn, table_name))
+    deleted = prune_changes(conn, table_name, upto_seq)
+    return {"upto_seq": upto_seq, "deleted": deleted, "positions": positions}
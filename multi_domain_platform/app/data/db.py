@@ -1,21 +1,168 @@
+import os
 import sqlite3
 from pathlib import Path
 
-def connect_database():
+from app.data.instrumentation import InstrumentedConnection
+
+
+# This file is: multi_domain_platform/app/data/db.py
+# parents[2] -> multi_domain_platform/
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Catalog database: the single-file database, and in the sharded layout the
+# home of the cross-domain / auxiliary tables (ai_jobs, text_clusters, ...)
+CATALOG_FILE = "intelligence_platform.db"
+
+# Archived rows of the retention jobs (app/data/retention.py), kept out of
+# the hot files
+ARCHIVE_FILE = "archive.db"
+
+# Sharded layout: domain -> (database file, base tables stored in it).
+# The domain name is also the schema name the shard is attached under.
+SHARDS = {
+    "users": ("users.db", ("users",)),
+    "incidents": ("incidents.db", ("cyber_incidents",)),
+    "datasets": ("datasets.db", ("datasets_metadata",)),
+    "tickets": ("tickets.db", ("it_tickets",)),
+}
+
+
+def get_data_dir():
+    """
+    Folder holding the database file(s).
+
+    multi_domain_platform/data/ unless the MDP_DATA_DIR environment
+    variable points elsewhere (the benchmark suite uses a throwaway folder).
+    """
+    data_dir = Path(os.environ.get("MDP_DATA_DIR", PROJECT_ROOT / "data"))
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def is_sharded(data_dir=None):
+    """
+    Whether each domain lives in its own database file.
+
+    MDP_DB_LAYOUT=sharded / single forces a layout; otherwise the sharded
+    layout is used once every shard file exists (scripts/split_database.py
+    creates them).
+    """
+    layout = os.environ.get("MDP_DB_LAYOUT", "auto")
+    if layout in ("sharded", "single"):
+        return layout == "sharded"
+    data_dir = data_dir or get_data_dir()
+    return all((data_dir / filename).exists() for filename, _ in SHARDS.values())
+
+
+def connect_file(db_path, check_same_thread=True):
+    """
+    Connect to one database file as is (no shards attached), instrumented
+    like connect_database's connections.
+    """
+    if os.environ.get("MDP_QUERY_STATS", "1") == "0":
+        return sqlite3.connect(str(db_path), check_same_thread=check_same_thread)
+    return sqlite3.connect(
+        str(db_path), factory=InstrumentedConnection, check_same_thread=check_same_thread
+    )
+
+
+def connect_database(domain=None, check_same_thread=True):
     """
     Connect to the SQLite database using an absolute path.
 
     Database location (recommended):
     multi_domain_platform/data/intelligence_platform.db
+
+    Set the MDP_DATA_DIR environment variable to use another data folder
+    (the benchmark suite points it at a throwaway directory).
+
+    In the sharded layout (see is_sharded) users, incidents, datasets and
+    tickets each have their own file, so writes to one domain never wait
+    for another domain's write lock:
+
+    - domain=None: the catalog with every shard ATTACHed under its domain
+      name, for cross-domain queries (unqualified table names still work)
+    - domain="users" / "incidents" / "datasets" / "tickets": that shard only
+    - domain="catalog": the catalog file only
+
+    In the single-file layout every domain maps to the same file.
+
+    Connections are instrumented (per-statement timing + slow-query log,
+    see app/data/instrumentation.py) unless MDP_QUERY_STATS=0.
+
+    check_same_thread=False lets a long-lived connection be shared between
+    threads; the caller must then serialize access to it.
+    """
+    if domain is not None and domain != "catalog" and domain not in SHARDS:
+        raise ValueError(f"Unknown domain '{domain}'")
+
+    data_dir = get_data_dir()
+    if not is_sharded(data_dir) or domain == "catalog":
+        return connect_file(data_dir / CATALOG_FILE, check_same_thread)
+
+    if domain is not None:
+        return connect_file(data_dir / SHARDS[domain][0], check_same_thread)
+
+    conn = connect_file(data_dir / CATALOG_FILE, check_same_thread)
+    for name, (filename, _) in SHARDS.items():
+        conn.execute("ATTACH DATABASE ? AS " + name, (str(data_dir / filename),))
+    return conn
+
+
+def domain_schema(conn, domain):
+    """
+    Schema name that holds a domain's tables on this connection: the
+    domain itself when its shard is attached, otherwise "main".
+
+    Use it to qualify CREATE statements, which would otherwise always
+    create the object in main.
     """
-    # This file is: multi_domain_platform/app/data/db.py
-    # parents[2] -> multi_domain_platform/
-    PROJECT_ROOT = Path(__file__).resolve().parents[2]
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA database_list")
+    attached = {row[1] for row in cursor.fetchall()}
+    return domain if domain in attached else "main"
+
 
-    DATA_DIR = PROJECT_ROOT / "data"   
-   
+def table_schema(conn, table_name):
+    """
+    Schema name holding a base table on this connection (see domain_schema).
+    Tables that belong to no shard live in main.
+    """
+    for domain, (_, tables) in SHARDS.items():
+        if table_name in tables:
+            return domain_schema(conn, domain)
+    return "main"
 
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    db_path = DATA_DIR / "intelligence_platform.db"  
-    return sqlite3.connect(str(db_path))
\ No newline at end of file
+def table_exists(conn, name):
+    """
+    Whether a table exists in any database of the connection
+    (sqlite_master on its own only covers main).
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA database_list")
+    for schema in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(
+            f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?",
+            (name,),
+        )
+        if cursor.fetchone() is not None:
+            return True
+    return False
+
+
+def database_file(conn, table_name):
+    """
+    Path of the file that holds a base table on this connection (the
+    attached shard, or the main file).
+
+    Returns:
+        Path, or None for an in-memory / temporary database
+    """
+    schema = table_schema(conn, table_name)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA database_list")
+    for _, name, filename in cursor.fetchall():
+        if name == schema and filename:
+            return Path(filename).resolve()
+    return None
@@ -1,19 +1,15 @@
 import pandas as pd
 from pathlib import Path
 from app.data.db import connect_database
+from app.data.models import Incident, fetch_one, iter_models
+from app.data.writer import write, write_bulk
 
 
 # ============================================================
 # STEP 7.1 — INSERT INCIDENT (CREATE)
 # ============================================================
 
-def insert_incident(conn, date, incident_type, severity, status, description, reported_by=None):
-    """
-    Insert a new cyber incident into the database.
-
-    Returns:
-        int: ID of the inserted incident
-    """
+def _insert_incident(conn, date, incident_type, severity, status, description, reported_by):
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -22,10 +18,21 @@ def insert_incident(conn, date, incident_type, severity, status, description, re
         VALUES (?, ?, ?, ?, ?, ?)
     """, (date, incident_type, severity, status, description, reported_by))
 
-    conn.commit()
     return cursor.lastrowid
 
 
+def insert_incident(conn, date, incident_type, severity, status, description, reported_by=None):
+    """
+    Insert a new cyber incident into the database (through the writer
+    thread, see app/data/writer.py).
+
+    Returns:
+        int: ID of the inserted incident
+    """
+    return write(conn, "cyber_incidents", _insert_incident,
+                 date, incident_type, severity, status, description, reported_by)
+
+
 # ============================================================
 # STEP 7.2 — READ INCIDENTS
 # ============================================================
@@ -44,17 +51,42 @@ def get_all_incidents(conn):
     return df
 
 
-# ============================================================
-# STEP 7.3 — UPDATE INCIDENT
-# ============================================================
-
-def update_incident_status(conn, incident_id, new_status):
+def get_incident(conn, incident_id):
     """
-    Update the status of an incident.
+    Retrieve one incident by id.
 
     Returns:
-        int: number of rows updated (0 or 1)
+        Incident or None
+    """
+    return fetch_one(conn, Incident, "id = ?", (incident_id,))
+
+
+def iter_incidents(conn, status=None, severity=None, batch_size=1000):
+    """
+    Stream incidents (optionally filtered by status / severity), newest
+    id first, without building a DataFrame.
+
+    Yields:
+        Incident
     """
+    conditions, params = [], []
+    if status is not None:
+        conditions.append("status = ?")
+        params.append(status)
+    if severity is not None:
+        conditions.append("severity = ?")
+        params.append(severity)
+    yield from iter_models(
+        conn, Incident, " AND ".join(conditions) or None, params,
+        order_by="id DESC", batch_size=batch_size,
+    )
+
+
+# ============================================================
+# STEP 7.3 — UPDATE INCIDENT
+# ============================================================
+
+def _update_incident_status(conn, incident_id, new_status):
     cursor = conn.cursor()
 
     cursor.execute(
@@ -62,21 +94,24 @@ def update_incident_status(conn, incident_id, new_status):
         (new_status, incident_id)
     )
 
-    conn.commit()
     return cursor.rowcount
 
 
-# ============================================================
-# STEP 7.4 — DELETE INCIDENT
-# ============================================================
-
-def delete_incident(conn, incident_id):
+def update_incident_status(conn, incident_id, new_status):
     """
-    Delete an incident from the database.
+    Update the status of an incident (through the writer thread).
 
     Returns:
-        int: number of rows deleted (0 or 1)
+        int: number of rows updated (0 or 1)
     """
+    return write(conn, "cyber_incidents", _update_incident_status, incident_id, new_status)
+
+
+# ============================================================
+# STEP 7.4 — DELETE INCIDENT
+# ============================================================
+
+def _delete_incident(conn, incident_id):
     cursor = conn.cursor()
 
     cursor.execute(
@@ -84,14 +119,31 @@ def delete_incident(conn, incident_id):
         (incident_id,)
     )
 
-    conn.commit()
     return cursor.rowcount
 
 
+def delete_incident(conn, incident_id):
+    """
+    Delete an incident from the database (through the writer thread).
+
+    Returns:
+        int: number of rows deleted (0 or 1)
+    """
+    return write(conn, "cyber_incidents", _delete_incident, incident_id)
+
+
 # ============================================================
 # CSV LOADING (USED IN MAIN)
 # ============================================================
 
+def _insert_rows(conn, table_name, columns, rows):
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(
+        f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+        rows,
+    )
+
+
 def load_csv_to_table(conn, csv_path, table_name):
     """
     Load a CSV file into a database table using pandas.
@@ -168,16 +220,16 @@ def load_csv_to_table(conn, csv_path, table_name):
 
     df = df[cols_to_use]
 
-    # Extra columns like 'resolution_time_hours' will be dropped here,
-    # because they are not in table_cols.
+    # Columns the table lacks are dropped here. 'category' (incidents) and
+    # 'resolution_time_hours' (tickets) are kept since schema version 3
+    # (app/data/migrations.py).
 
-    # 4 — Insert into DB
-    df.to_sql(
-        table_name,
-        conn,
-        if_exists="append",
-        index=False
-    )
+    # 4 — Insert into DB, in one transaction of its own on the writer thread
+    # (plain INSERTs instead of DataFrame.to_sql: pandas only looks for the
+    # table in main.sqlite_master and would create a second copy in main
+    # when the table lives in an attached shard)
+    rows = list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+    write_bulk(conn, table_name, _insert_rows, table_name, cols_to_use, rows)
 
     print(f"✅ Loaded {len(df)} rows into '{table_name}' from {csv_path.name}")
     return len(df)
@@ -0,0 +1,325 @@
+# app/data/instrumentation.py
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+
+
+# Statements slower than this (execute + fetch) go to the slow-query log
+SLOW_QUERY_MS = float(os.environ.get("MDP_SLOW_QUERY_MS", "100"))
+SLOW_LOG_SIZE = 200
+
+# Progress handler fires every N SQLite VM instructions
+PROGRESS_STEP = 1000
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+_THIS_FILE = str(Path(__file__).resolve())
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """
+    Reduce a statement to its shape so calls with different literals
+    are counted together: literals become ?, IN lists collapse, and
+    whitespace is squashed.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?, ...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def _find_caller():
+    """Return 'path:line in function' of the first project frame outside this module."""
+    frame = sys._getframe(2)
+    root = str(PROJECT_ROOT)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and filename != _THIS_FILE:
+            rel = os.path.relpath(filename, root)
+            return f"{rel}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+# ============================================================
+# STATS REGISTRY (process-wide, shared by every connection)
+# ============================================================
+
+class QueryStats:
+    """Thread-safe aggregate stats plus a bounded slow-query log."""
+
+    def __init__(self, slow_log_size=SLOW_LOG_SIZE):
+        self._lock = threading.Lock()
+        self._by_sql = {}
+        self._slow = deque(maxlen=slow_log_size)
+
+    def record(self, sql, elapsed_ms, rows, vm_steps, statements, caller, error=None):
+        key = normalize_sql(sql)
+        with self._lock:
+            entry = self._by_sql.get(key)
+            if entry is None:
+                entry = self._by_sql[key] = {
+                    "sql": key,
+                    "calls": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                    "vm_steps": 0,
+                    "statements": 0,
+                    "last_error": None,
+                    "callers": Counter(),
+                }
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["rows"] += rows
+            entry["vm_steps"] += vm_steps
+            entry["statements"] += statements
+            entry["callers"][caller] += 1
+            if error is not None:
+                entry["errors"] += 1
+                entry["last_error"] = error
+
+    def add_fetch(self, sql, elapsed_ms, rows, vm_steps):
+        """Attribute fetch time / rows to a statement that was already recorded."""
+        key = normalize_sql(sql)
+        with self._lock:
+            entry = self._by_sql.get(key)
+            if entry is None:
+                return
+            entry["total_ms"] += elapsed_ms
+            entry["rows"] += rows
+            entry["vm_steps"] += vm_steps
+
+    def log_slow(self, slow_entry):
+        with self._lock:
+            self._slow.append(slow_entry)
+
+    def summary(self):
+        """
+        Aggregate stats per normalized statement, most total time first.
+
+        Returns:
+            list[dict]
+        """
+        with self._lock:
+            rows = []
+            for entry in self._by_sql.values():
+                row = dict(entry)
+                row["avg_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+                row["callers"] = dict(entry["callers"].most_common(5))
+                rows.append(row)
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def slow_queries(self):
+        """Slow-query log, newest first."""
+        with self._lock:
+            return [dict(e) for e in reversed(self._slow)]
+
+    def reset(self):
+        with self._lock:
+            self._by_sql.clear()
+            self._slow.clear()
+
+
+QUERY_STATS = QueryStats()
+
+
+def get_query_stats():
+    """Aggregate per-statement stats (see QueryStats.summary)."""
+    return QUERY_STATS.summary()
+
+
+def get_slow_queries():
+    """Slow-query log entries with their EXPLAIN QUERY PLAN, newest first."""
+    return QUERY_STATS.slow_queries()
+
+
+def reset_query_stats():
+    """Forget all recorded stats and slow queries."""
+    QUERY_STATS.reset()
+
+
+# ============================================================
+# INSTRUMENTED CONNECTION / CURSOR
+# ============================================================
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that times execute*() and fetch*() calls.
+
+    Time and rows spent fetching are added to the statement that produced
+    them, so pandas.read_sql_query (execute + fetchall) is measured as a
+    whole. Once a statement crosses SLOW_QUERY_MS it is written to the
+    slow-query log together with its query plan.
+    """
+
+    def _start(self):
+        conn = self.connection
+        return time.perf_counter(), conn._vm_ticks, conn._trace_count
+
+    def _finish(self, sql, params, started, caller, error=None, executemany=False):
+        t0, ticks0, trace0 = started
+        conn = self.connection
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        vm_steps = (conn._vm_ticks - ticks0) * PROGRESS_STEP
+        statements = conn._trace_count - trace0
+        rows = max(self.rowcount, 0) if executemany else 0
+
+        QUERY_STATS.record(sql, elapsed_ms, rows, vm_steps, statements, caller, error)
+
+        self._sql = sql
+        self._params = params
+        self._caller = caller
+        self._elapsed_ms = elapsed_ms
+        self._rows = rows
+        self._slow_entry = None
+        self._check_slow()
+
+    def _check_slow(self):
+        if self._elapsed_ms < SLOW_QUERY_MS:
+            return
+        if self._slow_entry is None:
+            self._slow_entry = {
+                "sql": self._sql,
+                "normalized": normalize_sql(self._sql),
+                "duration_ms": self._elapsed_ms,
+                "rows": self._rows,
+                "caller": self._caller,
+                "logged_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "plan": self.connection.explain_query_plan(self._sql, self._params),
+            }
+            QUERY_STATS.log_slow(self._slow_entry)
+        else:
+            # later fetches keep the logged entry up to date
+            self._slow_entry["duration_ms"] = self._elapsed_ms
+            self._slow_entry["rows"] = self._rows
+
+    def execute(self, sql, parameters=()):
+        caller = _find_caller()
+        started = self._start()
+        try:
+            super().execute(sql, parameters)
+        except sqlite3.Error as e:
+            self._finish(sql, parameters, started, caller, error=str(e))
+            raise
+        self._finish(sql, parameters, started, caller)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        caller = _find_caller()
+        started = self._start()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error as e:
+            self._finish(sql, (), started, caller, error=str(e), executemany=True)
+            raise
+        self._finish(sql, (), started, caller, executemany=True)
+        return self
+
+    def executescript(self, sql_script):
+        caller = _find_caller()
+        started = self._start()
+        try:
+            super().executescript(sql_script)
+        except sqlite3.Error as e:
+            self._finish(sql_script, (), started, caller, error=str(e))
+            raise
+        self._finish(sql_script, (), started, caller)
+        return self
+
+    def _fetch(self, fetch, *args):
+        t0, ticks0 = time.perf_counter(), self.connection._vm_ticks
+        result = fetch(*args)
+        if getattr(self, "_sql", None) is None:
+            return result
+
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        vm_steps = (self.connection._vm_ticks - ticks0) * PROGRESS_STEP
+        if isinstance(result, list):
+            rows = len(result)
+        else:
+            rows = 0 if result is None else 1
+        QUERY_STATS.add_fetch(self._sql, elapsed_ms, rows, vm_steps)
+
+        self._elapsed_ms += elapsed_ms
+        self._rows += rows
+        self._check_slow()
+        return result
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._fetch(super().fetchmany)
+        return self._fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection that records every statement in QUERY_STATS.
+
+    Use as `sqlite3.connect(path, factory=InstrumentedConnection)`.
+    A progress handler counts VM instructions per statement, and a trace
+    callback counts the statements SQLite actually runs (including the
+    ones fired by triggers).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._vm_ticks = 0
+        self._trace_count = 0
+        self.set_progress_handler(self._on_progress, PROGRESS_STEP)
+        self.set_trace_callback(self._on_trace)
+
+    def _on_progress(self):
+        self._vm_ticks += 1
+        return 0  # never abort
+
+    def _on_trace(self, statement):
+        self._trace_count += 1
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def explain_query_plan(self, sql, params=()):
+        """
+        Return EXPLAIN QUERY PLAN output for a read statement.
+
+        Runs on a plain cursor so it is not recorded itself.
+
+        Returns:
+            list[str]: one line per plan step ([] for non-SELECT statements)
+        """
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return []
+        try:
+            cursor = super().cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+            return [f"{'  ' * (parent > 0)}{detail}" for _, parent, _, detail in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return [f"(plan unavailable: {e})"]
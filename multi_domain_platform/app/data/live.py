@@ -0,0 +1,127 @@
+# app/data/live.py
+
+import threading
+import time
+
+from app.data.analytics import DASHBOARD_SECTIONS, DASHBOARD_TABLES
+from app.data.cdc import CHANGE_LOGS, current_seq
+from app.data.db import connect_database, get_data_dir, table_exists, table_schema
+
+
+# Auto-refresh intervals offered on the dashboard (seconds)
+REFRESH_INTERVALS = (5, 10, 30, 60)
+
+# However many screens poll, the database is checked at most this often
+MIN_POLL_INTERVAL = 1.0
+
+
+class ChangePoller:
+    """
+    Cheap "did anything change?" check shared by every dashboard session.
+
+    One long-lived connection reads PRAGMA data_version per database file;
+    it only changes when another connection committed to that file, and
+    reading it touches no table pages. Only when a file changed are the
+    version tokens of its tables recomputed:
+
+    - tables with a change log (cyber_incidents, it_tickets): the newest
+      change seq, so unrelated writes to the same file do not count
+    - other tables: the file's data_version
+
+    Results are reused for MIN_POLL_INTERVAL seconds, so dozens of open
+    wallboards cost one poll per interval between them.
+    """
+
+    def __init__(self, min_interval=MIN_POLL_INTERVAL):
+        self.min_interval = min_interval
+        self.polls = 0              # polls that reached the database
+        self.changes = 0            # polls that found a changed file
+        self._lock = threading.Lock()
+        self._conn = None
+        self._data_dir = None
+        self._schemas = {}          # table key -> schema name
+        self._logged = set()        # table keys with a change log
+        self._data_versions = {}    # schema -> last data_version seen
+        self._versions = {}         # table key -> version token
+        self._polled_at = 0.0
+
+    def _connect(self):
+        data_dir = get_data_dir()
+        if self._conn is not None and data_dir == self._data_dir:
+            return
+        self.close()
+        self._conn = connect_database(check_same_thread=False)
+        self._data_dir = data_dir
+        self._schemas = {
+            key: table_schema(self._conn, name) for key, name in DASHBOARD_TABLES.items()
+        }
+        self._logged = {
+            key for key, name in DASHBOARD_TABLES.items()
+            if name in CHANGE_LOGS and table_exists(self._conn, CHANGE_LOGS[name])
+        }
+
+    def versions(self):
+        """
+        Current version token of every dashboard table.
+
+        Returns:
+            dict: DASHBOARD_TABLES key -> hashable token (equal tokens mean
+            the table did not change)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._versions and now - self._polled_at < self.min_interval:
+                return dict(self._versions)
+
+            self._connect()
+            cursor = self._conn.cursor()
+            changed = set()
+            for schema in set(self._schemas.values()):
+                cursor.execute(f"PRAGMA {schema}.data_version")
+                data_version = cursor.fetchone()[0]
+                if self._data_versions.get(schema) != data_version:
+                    self._data_versions[schema] = data_version
+                    changed.add(schema)
+
+            for key, schema in self._schemas.items():
+                if schema not in changed and key in self._versions:
+                    continue
+                if key in self._logged:
+                    self._versions[key] = ("seq", current_seq(self._conn, DASHBOARD_TABLES[key]))
+                else:
+                    self._versions[key] = ("data_version", self._data_versions[schema])
+
+            self.polls += 1
+            self.changes += bool(changed)
+            self._polled_at = now
+            return dict(self._versions)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._data_versions = {}
+        self._versions = {}
+
+
+def section_version(versions, section):
+    """
+    Version token of a dashboard section: the tokens of the tables it reads.
+
+    Returns:
+        tuple
+    """
+    return tuple(versions[key] for key in DASHBOARD_SECTIONS[section])
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_poller():
+    """The process-wide ChangePoller (created on first use)."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = ChangePoller()
+        return _poller
@@ -0,0 +1,225 @@
+# app/data/migrations.py
+
+import threading
+import time
+
+from app.data.db import connect_database, domain_schema, get_data_dir, is_sharded
+from app.data.schema import (
+    ai_jobs_table_ddl,
+    ai_summaries_table_ddl,
+    catalog_tables_ddl,
+    change_log_tables_ddl,
+    change_log_triggers_drop_ddl,
+    cluster_state_table_ddl,
+    correlation_tables_ddl,
+    cyber_incidents_table_ddl,
+    dataset_profile_tables_ddl,
+    datasets_metadata_table_ddl,
+    execute_ddl,
+    it_tickets_table_ddl,
+    search_index_rebuild_ddl,
+    search_index_tables_ddl,
+    text_clusters_tables_ddl,
+    users_table_ddl,
+)
+from app.data.search import ensure_search_index
+
+
+# ============================================================
+# MIGRATIONS
+# ============================================================
+# Applied in order. PRAGMA user_version of each database file is the
+# number of the last migration applied to it (0 = none), so a current
+# schema costs one header read per file at startup instead of running
+# every CREATE ... IF NOT EXISTS.
+#
+# A migration must be safe to run again (IF NOT EXISTS, column checks):
+# a shard file created later starts at 0 and gets every migration
+# replayed, and in WAL mode a transaction spanning several files is only
+# atomic per file, so after a crash one file can be a step behind - its
+# user_version then still says so and the next start replays the step.
+#
+# Migrations change the schema, so they run on the connection itself
+# rather than through the writer threads (app/data/writer.py).
+
+def _initial_schema(conn):
+    for ddl in (
+        users_table_ddl,
+        cyber_incidents_table_ddl,
+        datasets_metadata_table_ddl,
+        it_tickets_table_ddl,
+        search_index_tables_ddl,
+        text_clusters_tables_ddl,
+        ai_jobs_table_ddl,
+        ai_summaries_table_ddl,
+        change_log_tables_ddl,
+        catalog_tables_ddl,
+        dataset_profile_tables_ddl,
+        correlation_tables_ddl,
+    ):
+        execute_ddl(conn, ddl(conn))
+    # the tables may already hold rows the new FTS triggers never saw
+    execute_ddl(conn, search_index_rebuild_ddl(conn))
+
+
+def _filter_indexes(conn):
+    # dashboard counts (status = 'Open', severity IN (...) GROUP BY status)
+    # and the status / priority / category filters of the pages and exports
+    incidents = domain_schema(conn, "incidents")
+    tickets = domain_schema(conn, "tickets")
+    execute_ddl(conn, f"""
+        CREATE INDEX IF NOT EXISTS {incidents}.idx_cyber_incidents_status
+        ON cyber_incidents (status);
+
+        CREATE INDEX IF NOT EXISTS {incidents}.idx_cyber_incidents_severity_status
+        ON cyber_incidents (severity, status);
+
+        CREATE INDEX IF NOT EXISTS {tickets}.idx_it_tickets_status_priority
+        ON it_tickets (status, priority);
+
+        CREATE INDEX IF NOT EXISTS {tickets}.idx_it_tickets_category
+        ON it_tickets (category);
+    """)
+
+
+def _add_column(conn, domain, table_name, column, declaration):
+    schema = domain_schema(conn, domain)
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA {schema}.table_info({table_name})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {schema}.{table_name} ADD COLUMN {column} {declaration}")
+
+
+def _csv_columns(conn):
+    # the CSVs have both; load_csv_to_table used to drop them
+    _add_column(conn, "incidents", "cyber_incidents", "category", "TEXT")
+    _add_column(conn, "tickets", "it_tickets", "resolution_time_hours", "REAL")
+    # the CDC triggers spell out every column: rebuild them
+    execute_ddl(conn, change_log_triggers_drop_ddl(conn))
+    execute_ddl(conn, change_log_tables_ddl(conn))
+
+
+def _cluster_state(conn):
+    execute_ddl(conn, cluster_state_table_ddl(conn))
+
+
+# (version, description, apply(conn))
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "indexes for the status / severity / priority / category filters", _filter_indexes),
+    (3, "cyber_incidents.category and it_tickets.resolution_time_hours", _csv_columns),
+    (4, "cluster_state (change-log position of the clustering)", _cluster_state),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# ============================================================
+# RUNNING
+# ============================================================
+
+def schema_versions(conn):
+    """
+    PRAGMA user_version of every database file on the connection.
+
+    Returns:
+        dict: schema name -> version
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA database_list")
+    schemas = [row[1] for row in cursor.fetchall() if row[1] != "temp"]
+    versions = {}
+    for schema in schemas:
+        cursor.execute(f"PRAGMA {schema}.user_version")
+        versions[schema] = cursor.fetchone()[0]
+    return versions
+
+
+def pending_migrations(conn):
+    """
+    Migrations the least migrated file on the connection still needs.
+
+    Returns:
+        list of (version, description, apply)
+    """
+    current = min(schema_versions(conn).values())
+    return [m for m in MIGRATIONS if m[0] > current]
+
+
+def migrate(conn, verbose=True):
+    """
+    Bring every database file on the connection to SCHEMA_VERSION.
+
+    Pass a connect_database() connection (no domain): in the sharded
+    layout each domain's objects go to its attached shard and the rest to
+    the catalog. All pending migrations run in one transaction; if one
+    fails, nothing is applied and the error is raised. (With WAL files
+    that transaction is atomic per file, see MIGRATIONS above.)
+
+    Returns:
+        dict: from_version, to_version, applied [(version, description, ms)],
+        seconds
+    """
+    start = time.perf_counter()
+    versions = schema_versions(conn)
+    current = min(versions.values())
+    pending = [m for m in MIGRATIONS if m[0] > current]
+    report = {"from_version": current, "to_version": current, "applied": [], "seconds": 0.0}
+    if not pending:
+        return report
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        for version, description, apply in pending:
+            step = time.perf_counter()
+            apply(conn)
+            ms = (time.perf_counter() - step) * 1000
+            report["applied"].append((version, description, round(ms, 1)))
+            if verbose:
+                print(f"   {version:>3}  {description}  ({ms:.1f} ms)")
+        for schema in versions:
+            cursor.execute(f"PRAGMA {schema}.user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    report["to_version"] = SCHEMA_VERSION
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    if verbose:
+        print(f"✅ Schema migrated from version {current} to {SCHEMA_VERSION} "
+              f"in {report['seconds'] * 1000:.1f} ms")
+    return report
+
+
+_migrated = set()           # (data dir, sharded) this process brought up to date
+_migrated_lock = threading.Lock()
+
+
+def ensure_schema():
+    """
+    migrate() the current data folder once per process. Every page that
+    reads the database calls it first, so a session that opens a page URL
+    directly (not through Home) still gets the current schema.
+
+    The FTS indexes are checked against their tables here too (one
+    COUNT(*) per table and index, once per process); after that the
+    triggers keep them current, so searches never re-check.
+
+    Returns:
+        bool: True if this call ran migrate()
+    """
+    data_dir = get_data_dir()
+    key = (data_dir, is_sharded(data_dir))
+    with _migrated_lock:
+        if key in _migrated:
+            return False
+        conn = connect_database()
+        try:
+            migrate(conn)
+            ensure_search_index(conn)
+        finally:
+            conn.close()
+        _migrated.add(key)
+        return True
@@ -0,0 +1,128 @@
+# app/data/models.py
+
+from typing import NamedTuple, Optional
+
+
+# ============================================================
+# RECORD MODELS
+# ============================================================
+# NamedTuples: one tuple per row (no per-instance __dict__), fields by
+# name, and still indexable like the raw rows they replace (user[2]).
+# Field order is the table's column order.
+
+class User(NamedTuple):
+    id: int
+    username: str
+    password_hash: str
+    role: Optional[str] = "user"
+
+
+class Incident(NamedTuple):
+    id: int
+    date: Optional[str]
+    incident_type: Optional[str]
+    severity: Optional[str]
+    status: Optional[str]
+    description: Optional[str]
+    reported_by: Optional[str] = None
+    created_at: Optional[str] = None
+    category: Optional[str] = None
+
+
+class Ticket(NamedTuple):
+    id: int
+    ticket_id: str
+    priority: Optional[str]
+    status: Optional[str]
+    category: Optional[str]
+    subject: str
+    description: Optional[str] = None
+    created_date: Optional[str] = None
+    resolved_date: Optional[str] = None
+    assigned_to: Optional[str] = None
+    created_at: Optional[str] = None
+    resolution_time_hours: Optional[float] = None
+
+
+class DatasetMeta(NamedTuple):
+    id: int
+    dataset_name: str
+    category: Optional[str] = None
+    source: Optional[str] = None
+    last_updated: Optional[str] = None
+    record_count: Optional[int] = None
+    file_size_mb: Optional[float] = None
+    created_at: Optional[str] = None
+
+
+# Model -> table it is read from
+MODEL_TABLES = {
+    User: "users",
+    Incident: "cyber_incidents",
+    Ticket: "it_tickets",
+    DatasetMeta: "datasets_metadata",
+}
+
+
+# ============================================================
+# ROW FACTORIES
+# ============================================================
+
+def _positional_factory(model):
+    """Row factory for queries that select exactly model._fields, in order."""
+    make = model._make
+    return lambda cursor, row: make(row)
+
+
+# ============================================================
+# FETCHING
+# ============================================================
+
+def select_columns(model):
+    return ", ".join(model._fields)
+
+
+def fetch_one(conn, model, where, params=()):
+    """
+    First row of the model's table matching `where`, or None.
+
+    Returns:
+        model instance or None
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = _positional_factory(model)
+    cursor.execute(
+        f"SELECT {select_columns(model)} FROM {MODEL_TABLES[model]} WHERE {where} LIMIT 1",
+        params,
+    )
+    return cursor.fetchone()
+
+
+def iter_models(conn, model, where=None, params=(), order_by="id", batch_size=1000):
+    """
+    Stream rows of the model's table as model instances.
+
+    Rows are fetched `batch_size` at a time, so memory stays flat however
+    large the table is. The query's read transaction stays open until the
+    iterator is exhausted or closed.
+
+    Yields:
+        model instances
+    """
+    query = f"SELECT {select_columns(model)} FROM {MODEL_TABLES[model]}"
+    if where:
+        query += f" WHERE {where}"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+
+    cursor = conn.cursor()
+    cursor.row_factory = _positional_factory(model)
+    cursor.execute(query, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cursor.close()
@@ -0,0 +1,377 @@
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from app.data.db import ARCHIVE_FILE, get_data_dir, table_exists, table_schema
+from app.data.writer import get_writer, write, write_bulk
+
+
+PARQUET_DIR = "archive"          # data/archive/<table>/*.parquet
+
+# Per-table retention policy:
+#   statuses          rows in one of these statuses ...
+#   closed_after_days ... are archived once they are this many days old
+#   max_age_days      any row older than this is archived (None = never)
+#   age_expr          SQL expression giving the row's age reference date
+RETENTION_POLICIES = {
+    "cyber_incidents": {
+        "statuses": ("Closed", "Resolved"),
+        "closed_after_days": 365,
+        "max_age_days": None,
+        "age_expr": "COALESCE(date, created_at)",
+    },
+    "it_tickets": {
+        "statuses": ("Closed", "Resolved"),
+        "closed_after_days": 180,
+        "max_age_days": None,
+        "age_expr": "COALESCE(resolved_date, created_date, created_at)",
+    },
+}
+
+# Derived rows that go away with the row they were computed from:
+# base table -> [(derived table, column holding the row's id, also keyed by source_table)]
+_DERIVED_TABLES = {
+    "cyber_incidents": [
+        ("text_clusters", "row_id", True),
+        ("lsh_buckets", "row_id", True),
+        ("ai_summaries", "row_id", True),
+        ("incident_ticket_links", "incident_id", False),
+    ],
+    "it_tickets": [
+        ("text_clusters", "row_id", True),
+        ("lsh_buckets", "row_id", True),
+        ("ai_summaries", "row_id", True),
+        ("incident_ticket_links", "ticket_id", False),
+    ],
+}
+
+
+def _policy_where(policy, as_of):
+    """
+    WHERE clause (and params) selecting the rows a policy archives.
+
+    Dates are compared as ISO strings, which matches how the CSV loaders
+    and CURRENT_TIMESTAMP store them.
+    """
+    conditions, params = [], []
+    if policy.get("statuses") and policy.get("closed_after_days") is not None:
+        cutoff = as_of - timedelta(days=policy["closed_after_days"])
+        marks = ", ".join("?" for _ in policy["statuses"])
+        conditions.append(f"(status IN ({marks}) AND {policy['age_expr']} < ?)")
+        params += [*policy["statuses"], cutoff.strftime("%Y-%m-%d %H:%M:%S")]
+    if policy.get("max_age_days") is not None:
+        cutoff = as_of - timedelta(days=policy["max_age_days"])
+        conditions.append(f"{policy['age_expr']} < ?")
+        params.append(cutoff.strftime("%Y-%m-%d %H:%M:%S"))
+    if not conditions:
+        return "0", []
+    return " OR ".join(conditions), params
+
+
+# ============================================================
+# DRY RUN
+# ============================================================
+
+def plan_retention(conn, table_name, policy=None, as_of=None):
+    """
+    Report what a retention run would archive, without changing anything.
+
+    Returns:
+        dict: total_rows, rows_to_archive, by_status, oldest, newest
+    """
+    policy = policy or RETENTION_POLICIES[table_name]
+    as_of = as_of or datetime.now(timezone.utc).replace(tzinfo=None)
+    where, params = _policy_where(policy, as_of)
+    schema = table_schema(conn, table_name)
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {schema}.{table_name}")
+    total = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT status, COUNT(*), MIN({policy['age_expr']}), MAX({policy['age_expr']}) "
+        f"FROM {schema}.{table_name} WHERE {where} GROUP BY status ORDER BY status",
+        params,
+    )
+    rows = cursor.fetchall()
+    return {
+        "total_rows": total,
+        "rows_to_archive": sum(r[1] for r in rows),
+        "by_status": {r[0]: r[1] for r in rows},
+        "oldest": min((r[2] for r in rows if r[2]), default=None),
+        "newest": max((r[3] for r in rows if r[3]), default=None),
+    }
+
+
+# ============================================================
+# ARCHIVE TARGETS
+# ============================================================
+
+def _load_ids(conn, ids):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _retention_ids (id INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM _retention_ids")
+    cursor.executemany("INSERT INTO _retention_ids (id) VALUES (?)", [(i,) for i in ids])
+
+
+def _archive_table_ddl(conn, schema, table_name):
+    """Same columns as the hot table plus archived_at; id stays the key."""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA {schema}.table_info({table_name})")
+    columns = [
+        f"{name} INTEGER PRIMARY KEY" if name == "id" else f"{name} {col_type}"
+        for _, name, col_type, *_ in cursor.fetchall()
+    ]
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table_name} "
+        f"({', '.join(columns)}, archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+
+
+def _copy_to_archive(conn, table_name, create_sql, columns, rows):
+    """
+    Writer command (archive.db): upsert the rows and count how many of
+    their ids the archive now holds.
+    """
+    cursor = conn.cursor()
+    cursor.execute(create_sql)
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO {table_name} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})",
+        rows,
+    )
+    _load_ids(conn, [row[columns.index("id")] for row in rows])
+    cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE id IN (SELECT id FROM _retention_ids)")
+    return cursor.fetchone()[0]
+
+
+def _fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_parquet(df, out_dir, table_name):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet archiving needs pyarrow (pip install pyarrow)") from e
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = out_dir / f"{table_name}-{stamp}-{int(df['id'].min())}-{int(df['id'].max())}.parquet"
+    tmp_path = path.with_suffix(".parquet.tmp")
+    df = df.assign(archived_at=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression="zstd")
+    _fsync(tmp_path)
+    tmp_path.replace(path)   # only complete files are ever visible
+    if os.name == "posix":
+        _fsync(out_dir)      # ... and the rename survives a crash
+    if pq.read_metadata(path).num_rows != len(df):
+        raise RuntimeError(f"{path.name}: Parquet file does not hold the {len(df)} archived rows")
+    return path
+
+
+# ============================================================
+# ARCHIVING
+# ============================================================
+
+def _delete_rows(conn, table_name, column, ids, source_table=None):
+    """Writer command: delete the rows whose `column` is one of `ids`."""
+    _load_ids(conn, ids)
+    condition = f"{column} IN (SELECT id FROM _retention_ids)"
+    if source_table is None:
+        cursor = conn.execute(f"DELETE FROM {table_name} WHERE {condition}")
+    else:
+        cursor = conn.execute(
+            f"DELETE FROM {table_name} WHERE source_table = ? AND {condition}", (source_table,)
+        )
+    return cursor.rowcount
+
+
+def archive_table(conn, table_name, target="sqlite", policy=None, as_of=None,
+                  batch_size=5000, data_dir=None):
+    """
+    Move rows selected by the table's retention policy out of the hot table.
+
+    target="sqlite": rows go to the same table name in data/archive.db.
+    target="parquet": each batch becomes a zstd-compressed Parquet file
+    in data/archive/<table>/.
+
+    Each batch is copied, checked and only then deleted: the copy is
+    committed (archive.db) or fsynced (Parquet) and must hold every id of
+    the batch, then the derived rows (clusters, summaries, links) and
+    finally the hot rows are deleted, each through the writer of its
+    file. The files are never written in one transaction, so a crash
+    can leave a batch in both places - never in neither. Running again
+    archives it again (the archive.db copy is an upsert; read_archive()
+    keeps the newest Parquet copy of an id) and finishes the deletes.
+
+    FTS triggers keep the search index in sync.
+
+    Returns:
+        dict: archived, batches, seconds, files
+    """
+    policy = policy or RETENTION_POLICIES[table_name]
+    as_of = as_of or datetime.now(timezone.utc).replace(tzinfo=None)
+    data_dir = Path(data_dir or get_data_dir())
+    where, params = _policy_where(policy, as_of)
+    schema = table_schema(conn, table_name)
+
+    if target == "sqlite":
+        archive_writer = get_writer((data_dir / ARCHIVE_FILE).resolve())
+        create_sql = _archive_table_ddl(conn, schema, table_name)
+    elif target != "parquet":
+        raise ValueError(f"Unknown archive target '{target}' (expected 'sqlite' or 'parquet')")
+
+    derived = [d for d in _DERIVED_TABLES.get(table_name, ()) if table_exists(conn, d[0])]
+    cursor = conn.cursor()
+
+    archived = batches = 0
+    files = []
+    start = time.perf_counter()
+    last_id = -1
+    query = f"SELECT * FROM {schema}.{table_name} WHERE id > ? AND ({where}) ORDER BY id LIMIT ?"
+    while True:
+        # 1 - copy (committed / fsynced before anything is deleted)
+        if target == "parquet":
+            df = pd.read_sql_query(query, conn, params=(last_id, *params, batch_size))
+            if df.empty:
+                break
+            ids = df["id"].tolist()
+            files.append(str(_write_parquet(df, data_dir / PARQUET_DIR / table_name, table_name)))
+        else:
+            cursor.execute(query, (last_id, *params, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            columns = [d[0] for d in cursor.description]
+            ids = [row[columns.index("id")] for row in rows]
+            copied = archive_writer.execute(_copy_to_archive, table_name, create_sql, columns, rows)
+            if copied != len(ids):
+                raise RuntimeError(
+                    f"{table_name}: archive.db holds {copied} of the {len(ids)} rows of the "
+                    f"batch starting at id {ids[0]}; nothing was deleted"
+                )
+        last_id = ids[-1]
+
+        # 2 - derived rows, then the rows themselves
+        for derived_table, column, keyed in derived:
+            write(conn, derived_table, _delete_rows, derived_table, column, ids,
+                  table_name if keyed else None)
+        write_bulk(conn, table_name, _delete_rows, table_name, "id", ids)
+
+        archived += len(ids)
+        batches += 1
+
+    return {
+        "archived": archived,
+        "batches": batches,
+        "seconds": round(time.perf_counter() - start, 3),
+        "files": files,
+    }
+
+
+# ============================================================
+# COMPACTION
+# ============================================================
+
+def _file_stats(cursor, schema):
+    cursor.execute(f"PRAGMA {schema}.page_size")
+    page_size = cursor.fetchone()[0]
+    cursor.execute(f"PRAGMA {schema}.page_count")
+    pages = cursor.fetchone()[0]
+    cursor.execute(f"PRAGMA {schema}.freelist_count")
+    free = cursor.fetchone()[0]
+    return {"size_bytes": pages * page_size, "free_bytes": free * page_size}
+
+
+def _optimize(conn, table_name, fts_table, incremental):
+    """Writer command: free pages, merge FTS segments, refresh statistics."""
+    cursor = conn.cursor()
+    if incremental:
+        cursor.execute("PRAGMA incremental_vacuum")
+        cursor.fetchall()
+    if fts_table is not None:
+        # merge the FTS index segments left behind by the deletes
+        cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('optimize')")
+    cursor.execute(f"ANALYZE {table_name}")
+
+
+def compact_table(conn, table_name):
+    """
+    Give freed pages back to the filesystem and refresh planner statistics.
+
+    Uses PRAGMA incremental_vacuum. A database created without
+    auto_vacuum=INCREMENTAL is converted once with a full VACUUM; later
+    runs only pay for the pages that were freed.
+
+    Returns:
+        dict: schema, converted, before, after
+    """
+    schema = table_schema(conn, table_name)
+    cursor = conn.cursor()
+    before = _file_stats(cursor, schema)
+
+    cursor.execute(f"PRAGMA {schema}.auto_vacuum")
+    converted = cursor.fetchone()[0] != 2
+    if converted:
+        # VACUUM cannot run inside a transaction, so not on the writer
+        # thread either; a one-off conversion the writer waits out
+        cursor.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+        cursor.execute(f"VACUUM {schema}")
+
+    fts_table = f"{table_name}_fts"
+    write_bulk(conn, table_name, _optimize, table_name,
+               fts_table if table_exists(conn, fts_table) else None, not converted)
+    return {
+        "schema": schema,
+        "converted": converted,
+        "before": before,
+        "after": _file_stats(cursor, schema),
+    }
+
+
+# ============================================================
+# READING THE ARCHIVE
+# ============================================================
+
+def read_archive(table_name, target="sqlite", where=None, params=(), data_dir=None):
+    """
+    Query archived rows.
+
+    target="sqlite" reads data/archive.db (`where` is an SQL condition);
+    target="parquet" reads every Parquet file of the table (`where` is a
+    pandas query string).
+
+    Returns:
+        pandas.DataFrame (empty if nothing was archived yet)
+    """
+    data_dir = Path(data_dir or get_data_dir())
+    if target == "parquet":
+        folder = data_dir / PARQUET_DIR / table_name
+        files = sorted(folder.glob("*.parquet")) if folder.exists() else []
+        if not files:
+            return pd.DataFrame()
+        df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+        # a batch archived again after an interrupted run: keep its newest copy
+        df = df.drop_duplicates("id", keep="last").reset_index(drop=True)
+        return df.query(where) if where else df
+
+    path = data_dir / ARCHIVE_FILE
+    if not path.exists():
+        return pd.DataFrame()
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        if not table_exists(conn, table_name):
+            return pd.DataFrame()
+        query = f"SELECT * FROM {table_name}" + (f" WHERE {where}" if where else "")
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
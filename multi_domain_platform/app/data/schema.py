@@ -1,25 +1,61 @@
-def create_users_table(conn):
-    """Create users table."""
+import sqlite3
+
+from app.data.db import domain_schema
+
+
+# ============================================================
+# DDL
+# ============================================================
+# Each *_ddl(conn) returns the CREATE statements of a group of objects,
+# qualified for the connection's layout (domain_schema); create_*(conn)
+# runs one group on its own and commits. migrations.py runs them inside
+# its single migration transaction instead.
+
+def execute_ddl(conn, script):
+    """
+    Run a DDL script one statement at a time, without committing
+    (executescript would COMMIT any open transaction first).
+    """
     cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            cursor.execute(statement)
+            statement = ""
+    if statement.strip():
+        cursor.execute(statement)
+
+
+def users_table_ddl(conn):
+    """
+    Create the users table.
+    """
+    schema = domain_schema(conn, "users")
+    return f"""
+        CREATE TABLE IF NOT EXISTS {schema}.users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT NOT NULL UNIQUE,
             password_hash TEXT NOT NULL,
             role TEXT DEFAULT 'user'
         );
-    """)
+    """
+
+
+def create_users_table(conn):
+    """Run users_table_ddl and commit."""
+    execute_ddl(conn, users_table_ddl(conn))
     conn.commit()
     print("Created users table (if not exists).")
 
 
-def create_cyber_incidents_table(conn):
+def cyber_incidents_table_ddl(conn):
     """
     Create the cyber_incidents table.
     """
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS cyber_incidents (
+    schema = domain_schema(conn, "incidents")
+    return f"""
+        CREATE TABLE IF NOT EXISTS {schema}.cyber_incidents (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             date TEXT,
             incident_type TEXT,
@@ -30,18 +66,23 @@ def create_cyber_incidents_table(conn):
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (reported_by) REFERENCES users(username)
         );
-    """)
+    """
+
+
+def create_cyber_incidents_table(conn):
+    """Run cyber_incidents_table_ddl and commit."""
+    execute_ddl(conn, cyber_incidents_table_ddl(conn))
     conn.commit()
     print("Created cyber_incidents table (if not exists).")
 
 
-def create_datasets_metadata_table(conn):
+def datasets_metadata_table_ddl(conn):
     """
     Create the datasets_metadata table.
     """
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS datasets_metadata (
+    schema = domain_schema(conn, "datasets")
+    return f"""
+        CREATE TABLE IF NOT EXISTS {schema}.datasets_metadata (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             dataset_name TEXT NOT NULL,
             category TEXT,
@@ -51,18 +92,23 @@ def create_datasets_metadata_table(conn):
             file_size_mb REAL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
-    """)
+    """
+
+
+def create_datasets_metadata_table(conn):
+    """Run datasets_metadata_table_ddl and commit."""
+    execute_ddl(conn, datasets_metadata_table_ddl(conn))
     conn.commit()
     print("Created datasets_metadata table (if not exists).")
 
 
-def create_it_tickets_table(conn):
+def it_tickets_table_ddl(conn):
     """
     Create the it_tickets table.
     """
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS it_tickets (
+    schema = domain_schema(conn, "tickets")
+    return f"""
+        CREATE TABLE IF NOT EXISTS {schema}.it_tickets (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             ticket_id TEXT UNIQUE NOT NULL,
             priority TEXT,
@@ -76,14 +122,415 @@ def create_it_tickets_table(conn):
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (assigned_to) REFERENCES users(username)
         );
-    """)
+    """
+
+
+def create_it_tickets_table(conn):
+    """Run it_tickets_table_ddl and commit."""
+    execute_ddl(conn, it_tickets_table_ddl(conn))
     conn.commit()
     print("Created it_tickets table (if not exists).")
 
 
-def create_all_tables(conn):
-    """Create all database tables."""
-    create_users_table(conn)
-    create_cyber_incidents_table(conn)
-    create_datasets_metadata_table(conn)
-    create_it_tickets_table(conn)
\ No newline at end of file
+def search_index_tables_ddl(conn):
+    """
+    Create the FTS5 full-text indexes over incident and ticket text.
+
+    Both indexes are external-content tables: they store only the
+    inverted index and read the text back from the base table, so the
+    descriptions are not duplicated on disk. Triggers keep them in sync
+    with every INSERT / UPDATE / DELETE on the base tables. Each index is
+    created next to its base table (same shard in the sharded layout).
+    """
+    incidents = domain_schema(conn, "incidents")
+    tickets = domain_schema(conn, "tickets")
+    return f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {incidents}.cyber_incidents_fts USING fts5(
+            incident_type,
+            description,
+            content='cyber_incidents',
+            content_rowid='id',
+            tokenize='porter unicode61'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS {incidents}.cyber_incidents_fts_ai
+        AFTER INSERT ON cyber_incidents BEGIN
+            INSERT INTO cyber_incidents_fts (rowid, incident_type, description)
+            VALUES (new.id, new.incident_type, new.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {incidents}.cyber_incidents_fts_ad
+        AFTER DELETE ON cyber_incidents BEGIN
+            INSERT INTO cyber_incidents_fts (cyber_incidents_fts, rowid, incident_type, description)
+            VALUES ('delete', old.id, old.incident_type, old.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {incidents}.cyber_incidents_fts_au
+        AFTER UPDATE OF incident_type, description ON cyber_incidents BEGIN
+            INSERT INTO cyber_incidents_fts (cyber_incidents_fts, rowid, incident_type, description)
+            VALUES ('delete', old.id, old.incident_type, old.description);
+            INSERT INTO cyber_incidents_fts (rowid, incident_type, description)
+            VALUES (new.id, new.incident_type, new.description);
+        END;
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS {tickets}.it_tickets_fts USING fts5(
+            subject,
+            description,
+            content='it_tickets',
+            content_rowid='id',
+            tokenize='porter unicode61'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS {tickets}.it_tickets_fts_ai
+        AFTER INSERT ON it_tickets BEGIN
+            INSERT INTO it_tickets_fts (rowid, subject, description)
+            VALUES (new.id, new.subject, new.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {tickets}.it_tickets_fts_ad
+        AFTER DELETE ON it_tickets BEGIN
+            INSERT INTO it_tickets_fts (it_tickets_fts, rowid, subject, description)
+            VALUES ('delete', old.id, old.subject, old.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {tickets}.it_tickets_fts_au
+        AFTER UPDATE OF subject, description ON it_tickets BEGIN
+            INSERT INTO it_tickets_fts (it_tickets_fts, rowid, subject, description)
+            VALUES ('delete', old.id, old.subject, old.description);
+            INSERT INTO it_tickets_fts (rowid, subject, description)
+            VALUES (new.id, new.subject, new.description);
+        END;
+    """
+
+
+def search_index_rebuild_ddl(conn):
+    """
+    Re-index every row of the base tables into their FTS5 indexes (the
+    triggers only cover rows written after they exist).
+    """
+    incidents = domain_schema(conn, "incidents")
+    tickets = domain_schema(conn, "tickets")
+    return f"""
+        INSERT INTO {incidents}.cyber_incidents_fts (cyber_incidents_fts) VALUES ('rebuild');
+        INSERT INTO {tickets}.it_tickets_fts (it_tickets_fts) VALUES ('rebuild');
+    """
+
+
+def create_search_index_tables(conn):
+    """Run search_index_tables_ddl and commit."""
+    execute_ddl(conn, search_index_tables_ddl(conn))
+    conn.commit()
+    print("Created search index tables (if not exists).")
+
+
+def text_clusters_tables_ddl(conn):
+    """
+    Create the tables used by the near-duplicate clustering pipeline.
+
+    text_clusters keeps one row per clustered incident / ticket with its
+    MinHash signature; lsh_buckets is the banded LSH index used to find
+    candidate neighbours when new rows are clustered incrementally.
+    """
+    return """
+        CREATE TABLE IF NOT EXISTS text_clusters (
+            source_table TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            cluster_id INTEGER NOT NULL,
+            signature BLOB NOT NULL,
+            PRIMARY KEY (source_table, row_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_text_clusters_cluster
+        ON text_clusters (source_table, cluster_id);
+
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            source_table TEXT NOT NULL,
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            row_id INTEGER NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_lsh_buckets_lookup
+        ON lsh_buckets (source_table, band, bucket);
+    """
+
+
+def create_text_clusters_tables(conn):
+    """Run text_clusters_tables_ddl and commit."""
+    execute_ddl(conn, text_clusters_tables_ddl(conn))
+    conn.commit()
+    print("Created text_clusters tables (if not exists).")
+
+
+def cluster_state_table_ddl(conn):
+    """
+    Create cluster_state: per source table, the change-log seq up to
+    which updates and deletes were re-clustered.
+    """
+    return """
+        CREATE TABLE IF NOT EXISTS cluster_state (
+            source_table TEXT PRIMARY KEY,
+            cdc_seq INTEGER NOT NULL
+        );
+    """
+
+
+def create_cluster_state_table(conn):
+    """Run cluster_state_table_ddl and commit."""
+    execute_ddl(conn, cluster_state_table_ddl(conn))
+    conn.commit()
+    print("Created cluster_state table (if not exists).")
+
+
+def ai_jobs_table_ddl(conn):
+    """
+    Create the ai_jobs table used by the background AI job queue.
+    """
+    return """
+        CREATE TABLE IF NOT EXISTS ai_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users(username)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_ai_jobs_user_status
+        ON ai_jobs (username, status);
+    """
+
+
+def create_ai_jobs_table(conn):
+    """Run ai_jobs_table_ddl and commit."""
+    execute_ddl(conn, ai_jobs_table_ddl(conn))
+    conn.commit()
+    print("Created ai_jobs table (if not exists).")
+
+
+def ai_summaries_table_ddl(conn):
+    """
+    Create the ai_summaries table filled by the batch summarization CLI.
+
+    One row per summarized incident / ticket; a row's presence is also the
+    pipeline's checkpoint, so an interrupted run resumes where it stopped.
+    """
+    return """
+        CREATE TABLE IF NOT EXISTS ai_summaries (
+            source_table TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            summary TEXT,
+            category TEXT,
+            backend TEXT,
+            model TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source_table, row_id)
+        );
+    """
+
+
+def create_ai_summaries_table(conn):
+    """Run ai_summaries_table_ddl and commit."""
+    execute_ddl(conn, ai_summaries_table_ddl(conn))
+    conn.commit()
+    print("Created ai_summaries table (if not exists).")
+
+
+def change_log_tables_ddl(conn):
+    """
+    Create the change-data-capture logs for cyber_incidents and it_tickets.
+
+    Triggers append one row per INSERT / UPDATE / DELETE to
+    <table>_changes with the old and new row as JSON. seq is
+    AUTOINCREMENT, so it only ever grows and consumers can resume from the
+    last seq they processed. The log lives next to its table (same shard).
+
+    The JSON is built from the table's columns at creation time; drop and
+    recreate the triggers after adding columns (change_log_triggers_drop_ddl).
+    """
+    cursor = conn.cursor()
+    script = ""
+    for table_name, domain in (("cyber_incidents", "incidents"), ("it_tickets", "tickets")):
+        schema = domain_schema(conn, domain)
+        cursor.execute(f"PRAGMA {schema}.table_info({table_name})")
+        columns = [row[1] for row in cursor.fetchall()]
+        old_json = "json_object(" + ", ".join(f"'{c}', old.{c}" for c in columns) + ")"
+        new_json = "json_object(" + ", ".join(f"'{c}', new.{c}" for c in columns) + ")"
+
+        script += f"""
+            CREATE TABLE IF NOT EXISTS {schema}.{table_name}_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                op TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                old TEXT,
+                new TEXT,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TRIGGER IF NOT EXISTS {schema}.{table_name}_cdc_ai
+            AFTER INSERT ON {table_name} BEGIN
+                INSERT INTO {table_name}_changes (op, row_id, new)
+                VALUES ('I', new.id, {new_json});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {schema}.{table_name}_cdc_au
+            AFTER UPDATE ON {table_name} BEGIN
+                INSERT INTO {table_name}_changes (op, row_id, old, new)
+                VALUES ('U', new.id, {old_json}, {new_json});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {schema}.{table_name}_cdc_ad
+            AFTER DELETE ON {table_name} BEGIN
+                INSERT INTO {table_name}_changes (op, row_id, old)
+                VALUES ('D', old.id, {old_json});
+            END;
+        """
+    return script
+
+
+def change_log_triggers_drop_ddl(conn):
+    """Drop the CDC triggers (the logs stay), to rebuild them with new columns."""
+    script = ""
+    for table_name, domain in (("cyber_incidents", "incidents"), ("it_tickets", "tickets")):
+        schema = domain_schema(conn, domain)
+        for suffix in ("ai", "au", "ad"):
+            script += f"DROP TRIGGER IF EXISTS {schema}.{table_name}_cdc_{suffix};\n"
+    return script
+
+
+def create_change_log_tables(conn):
+    """Run change_log_tables_ddl and commit."""
+    execute_ddl(conn, change_log_tables_ddl(conn))
+    conn.commit()
+    print("Created change log tables (if not exists).")
+
+
+def catalog_tables_ddl(conn):
+    """
+    Create the tables used by the dataset catalog scanner.
+
+    catalog_roots lists the data directories to scan; catalog_files keeps
+    one row per scanned file (size + mtime to skip unchanged files, the
+    computed counts and hash, and the datasets_metadata row it feeds).
+    Both live in the catalog database.
+    """
+    return """
+        CREATE TABLE IF NOT EXISTS catalog_roots (
+            path TEXT PRIMARY KEY,
+            category TEXT,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS catalog_files (
+            path TEXT PRIMARY KEY,
+            root TEXT NOT NULL,
+            dataset_id INTEGER,
+            format TEXT,
+            size_bytes INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            record_count INTEGER,
+            column_count INTEGER,
+            columns TEXT,
+            sha256 TEXT,
+            error TEXT,
+            scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_catalog_files_root
+        ON catalog_files (root);
+    """
+
+
+def create_catalog_tables(conn):
+    """Run catalog_tables_ddl and commit."""
+    execute_ddl(conn, catalog_tables_ddl(conn))
+    conn.commit()
+    print("Created catalog tables (if not exists).")
+
+
+def dataset_profile_tables_ddl(conn):
+    """
+    Create the tables filled by the streaming column profiler.
+
+    dataset_profiles has one row per profiled dataset (datasets_metadata.id)
+    with the hash of the file that was profiled; column_profiles one row
+    per column with its statistics and sketches' results.
+    """
+    return """
+        CREATE TABLE IF NOT EXISTS dataset_profiles (
+            dataset_id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            sha256 TEXT,
+            row_count INTEGER,
+            column_count INTEGER,
+            chunks INTEGER,
+            seconds REAL,
+            profiled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS column_profiles (
+            dataset_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            kind TEXT,
+            non_null_count INTEGER,
+            null_count INTEGER,
+            min_value TEXT,
+            max_value TEXT,
+            mean REAL,
+            variance REAL,
+            distinct_approx INTEGER,
+            top_values TEXT,
+            PRIMARY KEY (dataset_id, position)
+        );
+    """
+
+
+def create_dataset_profile_tables(conn):
+    """Run dataset_profile_tables_ddl and commit."""
+    execute_ddl(conn, dataset_profile_tables_ddl(conn))
+    conn.commit()
+    print("Created dataset profile tables (if not exists).")
+
+
+def correlation_tables_ddl(conn):
+    """
+    Create the tables filled by the incident-to-ticket correlation sweep.
+
+    incident_ticket_links has one row per linked pair (it_tickets.id, not
+    the source ticket number) with its score, the time between them and
+    what they had in common; correlation_state keeps the last incident and
+    ticket ids swept and the settings the links were computed with. Both
+    live in the catalog database (they span two shards).
+    """
+    return """
+        CREATE TABLE IF NOT EXISTS incident_ticket_links (
+            incident_id INTEGER NOT NULL,
+            ticket_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            gap_hours REAL,
+            matched_on TEXT,
+            linked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (incident_id, ticket_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_incident_ticket_links_ticket
+        ON incident_ticket_links (ticket_id);
+
+        CREATE TABLE IF NOT EXISTS correlation_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+
+def create_correlation_tables(conn):
+    """Run correlation_tables_ddl and commit."""
+    execute_ddl(conn, correlation_tables_ddl(conn))
+    conn.commit()
+    print("Created correlation tables (if not exists).")
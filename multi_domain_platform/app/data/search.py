@@ -0,0 +1,152 @@
+# app/data/search.py
+
+import re
+
+import pandas as pd
+
+from app.data.db import table_exists
+from app.data.schema import create_search_index_tables
+from app.data.writer import write_bulk
+
+
+# Base table -> (FTS table, index of the FTS column used for snippets)
+SEARCH_INDEXES = {
+    "cyber_incidents": ("cyber_incidents_fts", 1),  # description
+    "it_tickets": ("it_tickets_fts", 1),            # description
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ============================================================
+# INDEX MAINTENANCE
+# ============================================================
+
+def ensure_search_index(conn):
+    """
+    Create the FTS5 indexes if they are missing and back-fill them.
+
+    The triggers only index rows written *after* they exist, so an index
+    created on a database that already holds data - or left behind by an
+    older version - has fewer documents than its base table. Any index
+    whose document count differs from its table's row count is rebuilt.
+
+    Scans every table and index in full: ensure_schema() runs it once per
+    process, not per search.
+
+    Returns:
+        bool: True if an index had to be created or rebuilt
+    """
+    created = not all(table_exists(conn, fts) for fts, _ in SEARCH_INDEXES.values())
+    if created:
+        create_search_index_tables(conn)
+
+    stale = stale_search_indexes(conn)
+    if stale:
+        rebuild_search_index(conn, stale)
+    return created or bool(stale)
+
+
+def stale_search_indexes(conn):
+    """
+    Base tables whose FTS index does not hold one document per row
+    (counted from the index's docsize table).
+
+    Returns:
+        list[str]
+    """
+    cursor = conn.cursor()
+    stale = []
+    for table_name, (fts_table, _) in SEARCH_INDEXES.items():
+        cursor.execute(f"SELECT COUNT(*) FROM {fts_table}_docsize")
+        indexed = cursor.fetchone()[0]
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+        if cursor.fetchone()[0] != indexed:
+            stale.append(table_name)
+    return stale
+
+
+def _rebuild_index(conn, fts_table):
+    conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+def rebuild_search_index(conn, tables=None):
+    """
+    Rebuild the FTS5 indexes of `tables` (default: both) from the content
+    of their base tables, each in a bulk write on the writer of its file.
+    """
+    for table_name in tables or SEARCH_INDEXES:
+        fts_table, _ = SEARCH_INDEXES[table_name]
+        write_bulk(conn, table_name, _rebuild_index, fts_table)
+
+
+# ============================================================
+# QUERYING
+# ============================================================
+
+def build_match_query(text):
+    """
+    Turn free text from a search box into a safe FTS5 MATCH expression.
+
+    Every word is quoted so FTS5 operators typed by the user are treated
+    as plain text, and the last word becomes a prefix query so results
+    appear while the user is still typing.
+
+    Returns:
+        str: MATCH expression, or "" if the text contains no words
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return ""
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _search(conn, table_name, text, limit, where=None, params=()):
+    fts_table, snippet_idx = SEARCH_INDEXES[table_name]
+    match = build_match_query(text)
+    if not match:
+        return pd.DataFrame()
+    # filters on the base table narrow the matches before ranking / LIMIT
+    filter_sql = f"AND t.id IN (SELECT id FROM {table_name} WHERE {where})" if where else ""
+
+    query = f"""
+        SELECT t.*,
+               snippet({fts_table}, {snippet_idx}, '**', '**', '…', 12) AS snippet,
+               bm25({fts_table}) AS score
+        FROM {fts_table}
+        JOIN {table_name} AS t ON t.id = {fts_table}.rowid
+        WHERE {fts_table} MATCH ? {filter_sql}
+        ORDER BY score
+        LIMIT ?
+    """
+    return pd.read_sql_query(query, conn, params=(match, *params, limit))
+
+
+def search_incidents(conn, text, limit=50, where=None, params=()):
+    """
+    Full-text search over incident type + description, optionally only
+    among the incidents matching an SQL condition (`where`, `params`).
+
+    Results are ranked by BM25 (best match first) and carry a highlighted
+    `snippet` column.
+
+    Returns:
+        pandas.DataFrame
+    """
+    return _search(conn, "cyber_incidents", text, limit, where, params)
+
+
+def search_tickets(conn, text, limit=50, where=None, params=()):
+    """
+    Full-text search over ticket subject + description, optionally only
+    among the tickets matching an SQL condition (`where`, `params`).
+
+    Results are ranked by BM25 (best match first) and carry a highlighted
+    `snippet` column.
+
+    Returns:
+        pandas.DataFrame
+    """
+    return _search(conn, "it_tickets", text, limit, where, params)
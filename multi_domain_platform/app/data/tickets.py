@@ -0,0 +1,36 @@
+from app.data.models import Ticket, fetch_one, iter_models
+
+
+# ============================================================
+# READ TICKETS
+# ============================================================
+
+def get_ticket(conn, ticket_id):
+    """
+    Retrieve one ticket by its ticket_id (the source system's ticket number).
+
+    Returns:
+        Ticket or None
+    """
+    return fetch_one(conn, Ticket, "ticket_id = ?", (ticket_id,))
+
+
+def iter_tickets(conn, status=None, priority=None, batch_size=1000):
+    """
+    Stream tickets (optionally filtered by status / priority), newest id
+    first, without building a DataFrame.
+
+    Yields:
+        Ticket
+    """
+    conditions, params = [], []
+    if status is not None:
+        conditions.append("status = ?")
+        params.append(status)
+    if priority is not None:
+        conditions.append("priority = ?")
+        params.append(priority)
+    yield from iter_models(
+        conn, Ticket, " AND ".join(conditions) or None, params,
+        order_by="id DESC", batch_size=batch_size,
+    )
@@ -1,4 +1,6 @@
 from app.data.db import connect_database
+from app.data.models import User, fetch_one, iter_models
+from app.data.writer import write, write_bulk
 from pathlib import Path
 import sqlite3
 
@@ -8,28 +10,87 @@ DATA_DIR = Path(__file__).resolve().parents[2] / "DATA"
 
 
 def get_user_by_username(username):
-    """Retrieve user by username."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT * FROM users WHERE username = ?",
-        (username,),
-    )
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    """
+    Retrieve user by username.
+
+    Returns:
+        User or None
+    """
+    conn = connect_database("users")
+    try:
+        return fetch_one(conn, User, "username = ?", (username,))
+    finally:
+        conn.close()
 
 
-def insert_user(username, password_hash, role='user'):
-    """Insert new user."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
+def iter_users(role=None, batch_size=1000):
+    """
+    Stream every user (optionally only one role), ordered by id.
+
+    Yields:
+        User
+    """
+    conn = connect_database("users")
+    try:
+        if role is None:
+            yield from iter_models(conn, User, batch_size=batch_size)
+        else:
+            yield from iter_models(conn, User, "role = ?", (role,), batch_size=batch_size)
+    finally:
+        conn.close()
+
+
+def _insert_user(conn, username, password_hash, role):
+    conn.execute(
         "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
         (username, password_hash, role),
     )
-    conn.commit()
-    conn.close()
+
+
+def insert_user(username, password_hash, role='user'):
+    """Insert new user (through the writer thread)."""
+    conn = connect_database("users")
+    try:
+        write(conn, "users", _insert_user, username, password_hash, role)
+    finally:
+        conn.close()
+
+
+def _set_role(conn, username, role):
+    cursor = conn.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
+    return cursor.rowcount
+
+
+def set_user_role(username, role):
+    """
+    Change a user's role (through the writer thread).
+
+    Returns:
+        bool: True if the user exists
+    """
+    conn = connect_database("users")
+    try:
+        return write(conn, "users", _set_role, username, role) > 0
+    finally:
+        conn.close()
+
+
+def _insert_users(conn, users):
+    """INSERT OR IGNORE each (username, password_hash); returns how many were new."""
+    cursor = conn.cursor()
+    migrated_count = 0
+    for username, password_hash in users:
+        try:
+            cursor.execute(
+                "INSERT OR IGNORE INTO users (username, password_hash, role) "
+                "VALUES (?, ?, ?)",
+                (username, password_hash, "user"),
+            )
+            if cursor.rowcount > 0:
+                migrated_count += 1
+        except sqlite3.Error as e:
+            print(f"Error migrating user {username}: {e}")
+    return migrated_count
 
 
 def migrate_users_from_file(filepath=DATA_DIR / "users.txt"):
@@ -41,10 +102,7 @@ def migrate_users_from_file(filepath=DATA_DIR / "users.txt"):
         print("   No users to migrate.")
         return
 
-    conn = connect_database()
-    cursor = conn.cursor()
-    migrated_count = 0
-
+    users = []
     with open(filepath, "r") as f:
         for line in f:
             line = line.strip()
@@ -54,20 +112,11 @@ def migrate_users_from_file(filepath=DATA_DIR / "users.txt"):
             # username,password_hash
             parts = line.split(",")
             if len(parts) >= 2:
-                username = parts[0]
-                password_hash = parts[1]
-
-                try:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO users (username, password_hash, role) "
-                        "VALUES (?, ?, ?)",
-                        (username, password_hash, "user"),
-                    )
-                    if cursor.rowcount > 0:
-                        migrated_count += 1
-                except sqlite3.Error as e:
-                    print(f"Error migrating user {username}: {e}")
-
-    conn.commit()
-    conn.close()
+                users.append((parts[0], parts[1]))
+
+    conn = connect_database("users")
+    try:
+        migrated_count = write_bulk(conn, "users", _insert_users, users)
+    finally:
+        conn.close()
     print(f"✅ Migrated {migrated_count} users from {filepath.name}")
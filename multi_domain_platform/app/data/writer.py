@@ -0,0 +1,362 @@
+# app/data/writer.py
+
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from app.data.db import connect_file, database_file
+
+
+# Most write commands committed together in one transaction
+GROUP_COMMIT_MAX = 256
+
+# Journal mode the writer puts its file in. In WAL mode readers never wait
+# for the writer (nor it for them), so with a single writer per file no
+# connection sees "database is locked". The mode is stored in the file;
+# MDP_JOURNAL_MODE=delete keeps / switches back to the rollback journal.
+JOURNAL_MODE = os.environ.get("MDP_JOURNAL_MODE", "wal")
+
+# SQLITE_BUSY retries: delay = min(MAX_BUSY_BACKOFF, BASE_BUSY_BACKOFF * 2^(attempt-1)) + jitter,
+# until BUSY_DEADLINE seconds have passed
+BASE_BUSY_BACKOFF = 0.005
+MAX_BUSY_BACKOFF = 0.5
+BUSY_DEADLINE = 60.0
+
+
+def _is_busy(error):
+    message = str(error)
+    return "database is locked" in message or "database is busy" in message
+
+
+def _busy_delay(attempt):
+    delay = min(MAX_BUSY_BACKOFF, BASE_BUSY_BACKOFF * 2 ** (attempt - 1))
+    return delay + random.uniform(0, delay / 2)
+
+
+# ============================================================
+# WRITER THREAD
+# ============================================================
+
+class DatabaseWriter:
+    """
+    The only connection that writes to one database file.
+
+    Callers hand it commands - command(conn, *args) -> result - and get a
+    Future back. One thread runs them in arrival order: whatever is queued
+    when it gets to work (up to GROUP_COMMIT_MAX commands) goes into one
+    BEGIN IMMEDIATE ... COMMIT, so a burst of small writes costs one
+    commit instead of one each. Every command runs in its own SAVEPOINT:
+    one that raises is rolled back alone and its Future gets the
+    exception, the rest of the group still commits. Futures resolve only
+    after the COMMIT.
+
+    Bulk commands (submit_bulk: CSV loads, index rebuilds, batch jobs)
+    run in a transaction of their own: the small writes queued around one
+    commit before it starts and right after it ends instead of waiting
+    for its COMMIT.
+
+    The file is switched to JOURNAL_MODE (WAL) first. SQLITE_BUSY - from
+    another process's writer, or from readers during COMMIT with a
+    rollback journal - is retried with jittered exponential backoff up to
+    BUSY_DEADLINE instead of surfacing as "database is locked".
+
+    Commands get the writer's own connection to this one file (nothing
+    attached): they must only touch its tables and must not commit or
+    roll back themselves. A write spanning several files is one command
+    per file, each committed on its own - order them so a crash between
+    two leaves something a re-run repairs.
+
+    Every Future is resolved, whatever fails: a group that breaks (even
+    its ROLLBACK) fails its own futures and the writer continues on a
+    fresh connection; if the thread dies anyway, the queued commands fail
+    and get_writer() starts a new writer.
+    """
+
+    def __init__(self, db_path, group_max=GROUP_COMMIT_MAX):
+        self.db_path = db_path
+        self.group_max = group_max
+        self.commands = 0           # commands run
+        self.commits = 0            # transactions committed
+        self.busy_retries = 0       # SQLITE_BUSY waits
+        self.failure = None         # what stopped the thread, if it died
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"db-writer:{db_path.name}", daemon=True
+        )
+        self._thread.start()
+
+    # ---------- submitting ----------
+
+    def submit(self, command, *args, **kwargs):
+        """
+        Queue command(conn, *args, **kwargs) for the writer thread.
+
+        Returns:
+            concurrent.futures.Future: the command's return value, set
+            once its transaction committed
+        """
+        return self._submit(command, args, kwargs, False)
+
+    def submit_bulk(self, command, *args, **kwargs):
+        """
+        Queue a large command to run in a transaction of its own.
+
+        Returns:
+            concurrent.futures.Future
+        """
+        return self._submit(command, args, kwargs, True)
+
+    def _submit(self, command, args, kwargs, alone):
+        future = Future()
+        self._queue.put((future, command, args, kwargs, alone))
+        if self.failure is not None:
+            self._fail_queued(self.failure)     # queued after the thread died
+        return future
+
+    def execute(self, command, *args, **kwargs):
+        """Run a command on the writer thread and wait for its result."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("A write command cannot wait for another write command")
+        return self.submit(command, *args, **kwargs).result()
+
+    def close(self):
+        """Finish the queued commands, then stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    # ---------- running ----------
+
+    def _connect(self):
+        conn = connect_file(self.db_path)
+        conn.isolation_level = None          # transactions are explicit
+        conn.execute("PRAGMA busy_timeout = 0")
+        try:
+            if JOURNAL_MODE:
+                self._retry_busy(lambda: conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}"),
+                                 time.monotonic())
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _run(self):
+        conn = None
+        try:
+            conn = self._connect()
+            carried = None          # a bulk command that ended the last group
+            while True:
+                item = carried if carried is not None else self._queue.get()
+                carried = None
+                group, stop = [], False
+                while True:
+                    if item is None:
+                        stop = True
+                        break
+                    alone = item[4]
+                    if alone and group:
+                        carried = item
+                        break
+                    if item[0].set_running_or_notify_cancel():
+                        group.append(item)
+                    if alone or len(group) >= self.group_max:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if group:
+                    try:
+                        self._run_group(conn, group)
+                    except Exception as e:
+                        # never leave a caller blocked on a future
+                        for future, *_ in group:
+                            if not future.done():
+                                future.set_exception(e)
+                    if conn.in_transaction:
+                        # a failed ROLLBACK: closing the connection rolls
+                        # back, carry on with a fresh one
+                        conn.close()
+                        conn = None
+                        conn = self._connect()
+                if stop:
+                    return
+        except BaseException as e:
+            # the thread is going away: fail what is queued instead of
+            # leaving it waiting (get_writer() starts a new writer)
+            self.failure = e
+            self._fail_queued(e)
+            raise
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _fail_queued(self, error):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(error)
+
+    def _retry_busy(self, statement, started):
+        attempt = 0
+        while True:
+            try:
+                return statement()
+            except sqlite3.OperationalError as e:
+                attempt += 1
+                if not _is_busy(e) or time.monotonic() - started > BUSY_DEADLINE:
+                    raise
+                self.busy_retries += 1
+                time.sleep(_busy_delay(attempt))
+
+    def _run_command(self, conn, command, args, kwargs, started):
+        def attempt():
+            conn.execute("SAVEPOINT write_command")
+            try:
+                result = command(conn, *args, **kwargs)
+            except BaseException:
+                conn.execute("ROLLBACK TO write_command")
+                conn.execute("RELEASE write_command")
+                raise
+            conn.execute("RELEASE write_command")
+            return result
+
+        return self._retry_busy(attempt, started)
+
+    def _run_group(self, conn, group):
+        started = time.monotonic()
+        try:
+            self._retry_busy(lambda: conn.execute("BEGIN IMMEDIATE"), started)
+        except Exception as e:
+            for future, *_ in group:
+                future.set_exception(e)
+            return
+
+        outcomes = []
+        for future, command, args, kwargs, _ in group:
+            try:
+                outcomes.append((future, self._run_command(conn, command, args, kwargs, started), None))
+            except Exception as e:
+                outcomes.append((future, None, e))
+        self.commands += len(group)
+
+        try:
+            self._retry_busy(lambda: conn.execute("COMMIT"), started)
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass        # _run replaces the connection if still in the transaction
+            for future, *_ in group:
+                future.set_exception(e)
+            return
+        self.commits += 1
+
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def stats(self):
+        """
+        Returns:
+            dict: commands, commits, commands_per_commit, busy_retries, queued
+        """
+        return {
+            "commands": self.commands,
+            "commits": self.commits,
+            "commands_per_commit": round(self.commands / self.commits, 2) if self.commits else 0.0,
+            "busy_retries": self.busy_retries,
+            "queued": self._queue.qsize(),
+        }
+
+
+_writers = {}             # database file -> DatabaseWriter
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path):
+    """
+    Process-wide writer of a database file (started on first use, and
+    again if its thread died).
+    """
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None or writer.failure is not None:
+            writer = _writers[db_path] = DatabaseWriter(db_path)
+        return writer
+
+
+def close_writers():
+    """Stop every writer thread after its queued commands ran."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+# ============================================================
+# ENTRY POINTS
+# ============================================================
+
+def submit_write(conn, table_name, command, *args, **kwargs):
+    """
+    Queue a write to `table_name` on the writer of the file that holds it
+    on this connection (the table's shard in the sharded layout).
+
+    An in-memory database has no other writers: the command runs on
+    `conn` right away and is committed there.
+
+    Returns:
+        concurrent.futures.Future
+    """
+    return _submit_write(conn, table_name, command, args, kwargs, False)
+
+
+def _submit_write(conn, table_name, command, args, kwargs, alone):
+    db_path = database_file(conn, table_name)
+    if db_path is not None:
+        writer = get_writer(db_path)
+        return (writer.submit_bulk if alone else writer.submit)(command, *args, **kwargs)
+
+    future = Future()
+    try:
+        future.set_result(command(conn, *args, **kwargs))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        future.set_exception(e)
+    return future
+
+
+def write(conn, table_name, command, *args, **kwargs):
+    """
+    Run a write command through the single writer and wait for it
+    (see submit_write). `conn` must not have a transaction open on the
+    same file - no uncommitted writes, no unfinished SELECT - or the
+    writer waits for it (rollback journal) or `conn` keeps reading the
+    snapshot from before the write (WAL).
+
+    Returns:
+        whatever the command returned
+    """
+    return _submit_write(conn, table_name, command, args, kwargs, False).result()
+
+
+def write_bulk(conn, table_name, command, *args, **kwargs):
+    """
+    write() for a large command: it gets a transaction of its own so the
+    small writes queued behind it do not wait for its COMMIT.
+
+    Returns:
+        whatever the command returned
+    """
+    return _submit_write(conn, table_name, command, args, kwargs, True).result()
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import re
+from abc import ABC, abstractmethod
+
+from app.services.prompts import estimate_tokens
+
+
+class RateLimited(Exception):
+    """A backend asked us to slow down (HTTP 429)."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ChatBackend(ABC):
+    """
+    Minimal async chat-completion interface used by the batch pipeline.
+
+    Subclasses implement complete(), which returns (text, usage); they
+    raise RateLimited on 429s so the caller can adapt its concurrency.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, messages, model, temperature=0.2):
+        """Returns: (reply text, usage)"""
+
+    async def aclose(self):
+        pass
+
+
+# ============================================================
+# OPENAI
+# ============================================================
+
+class OpenAIBackend(ChatBackend):
+    """Chat completions through openai.AsyncOpenAI (no client-side retries)."""
+
+    name = "openai"
+
+    def __init__(self, api_key=None, base_url=None, timeout=60.0):
+        from openai import AsyncOpenAI
+
+        self._client = AsyncOpenAI(api_key=api_key, base_url=base_url,
+                                   timeout=timeout, max_retries=0)
+
+    async def complete(self, messages, model, temperature=0.2):
+        import openai
+
+        try:
+            resp = await self._client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+            )
+        except openai.RateLimitError as e:
+            retry_after = None
+            if e.response is not None:
+                try:
+                    retry_after = float(e.response.headers.get("retry-after"))
+                except (TypeError, ValueError):
+                    retry_after = None
+            raise RateLimited(str(e), retry_after) from e
+        return resp.choices[0].message.content, resp.usage
+
+    async def aclose(self):
+        await self._client.close()
+
+
+# ============================================================
+# LOCAL STUB
+# ============================================================
+
+_STUB_CATEGORIES = {
+    "Phishing": ("phish", "email", "link", "attachment"),
+    "Malware": ("malware", "virus", "ransom", "trojan"),
+    "Access": ("login", "log in", "password", "locked", "access", "account"),
+    "Network": ("vpn", "network", "wifi", "ddos", "dns"),
+    "Hardware": ("printer", "laptop", "disk", "monitor", "keyboard"),
+    "Misconfiguration": ("misconfig", "config", "setting"),
+}
+
+
+class StubBackend(ChatBackend):
+    """
+    Deterministic offline backend for load-testing the pipeline.
+
+    The answer depends only on the prompt text (keyword category + the
+    first words as summary). `latency` simulates request time and
+    `rate_limit_every` makes every Nth call raise RateLimited, so the
+    adaptive concurrency logic can be exercised without a network.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=0.05, rate_limit_every=0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.calls = 0
+
+    async def complete(self, messages, model, temperature=0.2):
+        self.calls += 1
+        if self.rate_limit_every and self.calls % self.rate_limit_every == 0:
+            raise RateLimited("stub rate limit", retry_after=self.latency)
+
+        text = messages[-1]["content"]
+        # deterministic jitter so requests do not finish in lockstep
+        digest = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        await asyncio.sleep(self.latency * (0.5 + (digest % 1000) / 1000))
+
+        # "field: value" lines -> values only
+        lines = text.rsplit("Record:", 1)[-1].strip().splitlines()
+        record = " ".join(line.split(": ", 1)[-1] for line in lines)
+        lowered = record.lower()
+        category = next(
+            (name for name, words in _STUB_CATEGORIES.items() if any(w in lowered for w in words)),
+            "Other",
+        )
+        words = re.findall(r"\S+", record)
+        summary = " ".join(words[:12]) + ("…" if len(words) > 12 else "")
+        reply = json.dumps({"summary": summary, "category": category}, ensure_ascii=False)
+        usage = {
+            "prompt_tokens": sum(estimate_tokens(m["content"]) for m in messages),
+            "completion_tokens": estimate_tokens(reply),
+        }
+        return reply, usage
+
+
+def get_backend(name, **kwargs):
+    """
+    Build a backend by name ("openai" or "stub").
+
+    Returns:
+        ChatBackend
+    """
+    if name == "openai":
+        return OpenAIBackend(**kwargs)
+    if name == "stub":
+        return StubBackend(**kwargs)
+    raise ValueError(f"Unknown backend '{name}' (expected 'openai' or 'stub')")
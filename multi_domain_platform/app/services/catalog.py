@@ -0,0 +1,360 @@
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from app.data.db import table_exists
+from app.data.schema import create_catalog_tables
+from app.data.writer import write
+
+
+# File extension -> format; anything else under a root is ignored
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+}
+
+# Bytes handed to the newline count / hash per step
+SCAN_CHUNK = 16 * 1024 * 1024
+
+# Scanned files written to the database per transaction
+COMMIT_EVERY = 200
+
+
+# ============================================================
+# SCANNING ONE FILE (runs in the worker processes)
+# ============================================================
+
+def _header_columns(first_line, fmt):
+    text = first_line.decode("utf-8-sig", errors="replace").rstrip("\r\n")
+    if fmt == "jsonl":
+        record = json.loads(text) if text.strip() else {}
+        return list(record) if isinstance(record, dict) else []
+    delimiter = "\t" if fmt == "tsv" else ","
+    return next(csv.reader(io.StringIO(text), delimiter=delimiter), [])
+
+
+def _parquet_shape(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None, None
+    metadata = pq.ParquetFile(path).metadata
+    return metadata.num_rows, metadata.schema.names
+
+
+def _empty_result(path, fmt, error=None):
+    return {
+        "path": path,
+        "format": fmt,
+        "size_bytes": 0,
+        "mtime_ns": 0,
+        "record_count": 0,
+        "column_count": 0,
+        "columns": [],
+        "sha256": hashlib.sha256(b"").hexdigest(),
+        "error": error,
+    }
+
+
+def scan_file(path, fmt):
+    """
+    Measure one data file in a single pass over an mmap of it: newline
+    count, SHA-256 of the content and the header's columns.
+
+    Record counts are lines minus the header for csv / tsv (a quoted field
+    spanning lines counts once per line) and lines for jsonl; Parquet
+    files take them from the file footer when pyarrow is installed.
+
+    Returns:
+        dict: path, format, size_bytes, mtime_ns, record_count,
+        column_count, columns, sha256, error
+    """
+    result = _empty_result(path, fmt)
+    try:
+        st = os.stat(path)           # the file may be gone since the walk
+        result["size_bytes"], result["mtime_ns"] = st.st_size, st.st_mtime_ns
+        if st.st_size == 0:
+            return result
+
+        digest = hashlib.sha256()
+        newlines = 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, len(mm), SCAN_CHUNK):
+                chunk = mm[offset:offset + SCAN_CHUNK]
+                newlines += chunk.count(b"\n")
+                digest.update(chunk)
+            ends_with_newline = mm[-1:] == b"\n"
+            first_end = mm.find(b"\n")
+            first_line = mm[:first_end if first_end >= 0 else min(len(mm), 1024 * 1024)]
+        result["sha256"] = digest.hexdigest()
+
+        if fmt == "parquet":
+            records, columns = _parquet_shape(path)
+        else:
+            lines = newlines + (0 if ends_with_newline else 1)
+            columns = _header_columns(first_line, fmt)
+            records = lines if fmt == "jsonl" else max(lines - 1, 0)
+        result["record_count"] = records
+        result["columns"] = columns or []
+        result["column_count"] = len(columns) if columns is not None else None
+    except (OSError, ValueError, UnicodeError) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+# ============================================================
+# ROOTS
+# ============================================================
+
+def _ensure_tables(conn):
+    if not table_exists(conn, "catalog_files"):
+        create_catalog_tables(conn)
+
+
+def _save_root(conn, path, category):
+    conn.execute(
+        "INSERT INTO catalog_roots (path, category) VALUES (?, ?) "
+        "ON CONFLICT (path) DO UPDATE SET category = excluded.category",
+        (path, category),
+    )
+
+
+def register_root(conn, path, category=None):
+    """
+    Add (or re-categorise) a data directory to scan.
+
+    Returns:
+        str: the absolute path stored
+    """
+    path = str(Path(path).expanduser().resolve())
+    if not Path(path).is_dir():
+        raise ValueError(f"Not a directory: {path}")
+    _ensure_tables(conn)
+    cursor = conn.cursor()
+    write(conn, "catalog_roots", _save_root, path, category)
+    return path
+
+
+def list_roots(conn):
+    """
+    Registered data directories with what the last scan found in them.
+
+    Returns:
+        list of dicts: path, category, files, bytes
+    """
+    _ensure_tables(conn)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT r.path, r.category, COUNT(f.path), COALESCE(SUM(f.size_bytes), 0)
+        FROM catalog_roots r
+        LEFT JOIN catalog_files f ON f.root = r.path
+        GROUP BY r.path
+        ORDER BY r.path
+    """)
+    return [
+        {"path": p, "category": c, "files": n, "bytes": b}
+        for p, c, n, b in cursor.fetchall()
+    ]
+
+
+def _walk(root):
+    """Yield (path, format, size, mtime_ns) of every catalogued file type under root."""
+    stack = [root]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+                continue
+            fmt = FORMATS.get(os.path.splitext(entry.name)[1].lower())
+            if fmt is None or not entry.is_file():
+                continue
+            st = entry.stat()
+            yield entry.path, fmt, st.st_size, st.st_mtime_ns
+
+
+# ============================================================
+# CATALOGUING
+# ============================================================
+
+def _save_datasets(conn, root, category, batch):
+    """
+    Writer command (datasets_metadata): create / update the
+    datasets_metadata row of every scanned file in `batch`
+    [(result, dataset_id or None)].
+
+    Returns:
+        list: the dataset id of each entry (None for files that failed)
+    """
+    cursor = conn.cursor()
+    dataset_ids = []
+    for result, dataset_id in batch:
+        if result["error"] is not None:
+            dataset_ids.append(dataset_id)
+            continue
+        values = (
+            result["record_count"],
+            round(result["size_bytes"] / 1024 / 1024, 3),
+            time.strftime("%Y-%m-%d", time.localtime(result["mtime_ns"] / 1e9)),
+        )
+        if dataset_id is not None:
+            cursor.execute(
+                "UPDATE datasets_metadata SET record_count = ?, file_size_mb = ?, last_updated = ? "
+                "WHERE id = ?",
+                (*values, dataset_id),
+            )
+            if cursor.rowcount == 0:
+                dataset_id = None      # the row was deleted by hand: recreate it
+        if dataset_id is None:
+            cursor.execute(
+                "INSERT INTO datasets_metadata "
+                "(record_count, file_size_mb, last_updated, dataset_name, category, source) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*values, os.path.relpath(result["path"], root), category or "Unknown", root),
+            )
+            dataset_id = cursor.lastrowid
+        dataset_ids.append(dataset_id)
+    return dataset_ids
+
+
+def _save_files(conn, root, batch):
+    """Writer command (catalog_files): upsert the catalog_files row of every scan result."""
+    conn.executemany(
+        """
+        INSERT INTO catalog_files
+            (path, root, dataset_id, format, size_bytes, mtime_ns, record_count,
+             column_count, columns, sha256, error, scanned_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (path) DO UPDATE SET
+            dataset_id = excluded.dataset_id, format = excluded.format,
+            size_bytes = excluded.size_bytes, mtime_ns = excluded.mtime_ns,
+            record_count = excluded.record_count, column_count = excluded.column_count,
+            columns = excluded.columns, sha256 = excluded.sha256,
+            error = excluded.error, scanned_at = excluded.scanned_at
+        """,
+        [
+            (
+                result["path"], root, dataset_id, result["format"], result["size_bytes"],
+                result["mtime_ns"], result["record_count"], result["column_count"],
+                json.dumps(result["columns"]), result["sha256"], result["error"],
+            )
+            for result, dataset_id in batch
+        ],
+    )
+
+
+def _remove_files(conn, paths):
+    conn.executemany("DELETE FROM catalog_files WHERE path = ?", [(p,) for p in paths])
+
+
+def _save(conn, root, category, batch):
+    """
+    Write a batch of scan results: datasets_metadata first, then
+    catalog_files. In the sharded layout they are two files and two
+    transactions; if the scan dies between them, the next scan finds the
+    file missing from catalog_files and reuses its datasets_metadata row
+    (matched on source and dataset_name) instead of adding a second one.
+    """
+    dataset_ids = write(conn, "datasets_metadata", _save_datasets, root, category, batch)
+    write(conn, "catalog_files", _save_files, root,
+          [(result, dataset_id) for (result, _), dataset_id in zip(batch, dataset_ids)])
+
+
+def scan_catalog(conn, roots=None, workers=None, force=False, on_progress=None):
+    """
+    Recatalogue every registered root (or only `roots`).
+
+    Files whose size and mtime match the last scan are skipped unless
+    force=True or that scan failed; the rest are scanned in parallel by a process pool
+    (workers=1 scans in this process). Each file gets a catalog_files row
+    and a datasets_metadata row (created once, then kept up to date).
+    catalog_files rows of files that disappeared are removed; their
+    datasets_metadata rows are kept.
+
+    Returns:
+        dict: files, scanned, skipped, removed, errors, bytes_scanned, seconds
+    """
+    _ensure_tables(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT path, category FROM catalog_roots ORDER BY path")
+    registered = dict(cursor.fetchall())
+    if roots is not None:
+        wanted = {str(Path(r).expanduser().resolve()) for r in roots}
+        registered = {p: c for p, c in registered.items() if p in wanted}
+
+    start = time.perf_counter()
+    stats = {"files": 0, "scanned": 0, "skipped": 0, "removed": 0, "errors": 0, "bytes_scanned": 0}
+
+    for root, category in registered.items():
+        cursor.execute(
+            "SELECT path, size_bytes, mtime_ns, dataset_id, error FROM catalog_files WHERE root = ?",
+            (root,),
+        )
+        known = {path: (size, mtime, dataset_id, error)
+                 for path, size, mtime, dataset_id, error in cursor.fetchall()}
+        # datasets_metadata rows of this root by file (also those whose
+        # catalog_files row was never written)
+        cursor.execute("SELECT dataset_name, id FROM datasets_metadata WHERE source = ?", (root,))
+        dataset_ids = dict(cursor.fetchall())
+
+        todo, seen = [], set()
+        for path, fmt, size, mtime_ns in _walk(root):
+            seen.add(path)
+            previous = known.get(path)
+            if (not force and previous is not None and previous[3] is None
+                    and previous[:2] == (size, mtime_ns)):
+                stats["skipped"] += 1
+                continue
+            todo.append((path, fmt, size))
+        stats["files"] += len(seen)
+
+        gone = [path for path in known if path not in seen]
+        if gone:
+            write(conn, "catalog_files", _remove_files, gone)
+        stats["removed"] += len(gone)
+
+        batch = []
+
+        def record(result, pending):
+            dataset_id = known.get(result["path"], (None,) * 4)[2]
+            if dataset_id is None:
+                dataset_id = dataset_ids.get(os.path.relpath(result["path"], root))
+            batch.append((result, dataset_id))
+            stats["scanned"] += 1
+            stats["errors"] += result["error"] is not None
+            stats["bytes_scanned"] += result["size_bytes"]
+            if len(batch) >= COMMIT_EVERY or not pending:
+                _save(conn, root, category, batch)
+                batch.clear()
+            if on_progress:
+                on_progress(stats)
+
+        if workers == 1 or len(todo) <= 1:
+            for i, (path, fmt, _) in enumerate(todo):
+                record(scan_file(path, fmt), len(todo) - i - 1)
+        else:
+            # largest files first so one huge file does not finish last
+            todo.sort(key=lambda t: t[2], reverse=True)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(scan_file, path, fmt): (path, fmt) for path, fmt, _ in todo}
+                for i, future in enumerate(as_completed(futures)):
+                    try:
+                        result = future.result()
+                    except Exception as e:    # e.g. a worker that died: one file, not the scan
+                        result = _empty_result(*futures[future], f"{type(e).__name__}: {e}")
+                    record(result, len(futures) - i - 1)
+
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return stats
@@ -0,0 +1,453 @@
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from app.data.cdc import (
+    CHANGE_LOGS,
+    ChangeLogTruncated,
+    changes_since,
+    current_seq,
+    register_consumer,
+)
+from app.data.db import table_exists
+from app.data.schema import create_cluster_state_table, create_text_clusters_tables
+from app.data.writer import write_bulk
+
+
+# Text columns that describe each record (joined before shingling)
+CLUSTER_SOURCES = {
+    "cyber_incidents": ["incident_type", "description"],
+    "it_tickets": ["subject", "description"],
+}
+
+NUM_PERM = 64            # MinHash signature length
+BANDS = 16               # LSH bands (BANDS * ROWS_PER_BAND == NUM_PERM)
+ROWS_PER_BAND = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.6
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed: signatures stored in SQLite must stay comparable across runs
+_rng = np.random.default_rng(1510)
+_PERM_A = _rng.integers(1, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+
+# a, b < 2^32 and x < 2^32 (crc32), so a * x + b < 2^64: the uint64
+# arithmetic in minhash_signature cannot wrap before the % _MERSENNE_PRIME
+if int(_PERM_A.max()) * int(_MAX_HASH) + int(_PERM_B.max()) >= 1 << 64:
+    raise ValueError("MinHash coefficients too large for uint64 arithmetic")
+
+_WORD_RE = re.compile(r"[a-z]+|\d+")
+
+
+# ============================================================
+# MINHASH SIGNATURES
+# ============================================================
+
+def shingles(text):
+    """
+    Split text into word-bigram shingles.
+
+    Numbers are collapsed to '#' so "Ticket 0 problem description" and
+    "Ticket 1 problem description" produce the same shingles.
+    """
+    words = ["#" if w.isdigit() else w for w in _WORD_RE.findall((text or "").lower())]
+    if len(words) < 2:
+        return set(words)
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash_signature(text):
+    """
+    Compute the MinHash signature of a piece of text.
+
+    Returns:
+        numpy.ndarray: NUM_PERM uint32 values
+    """
+    tokens = shingles(text)
+    if not tokens:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+
+    hashes = np.fromiter(
+        (zlib.crc32(t.encode("utf-8")) for t in tokens),
+        dtype=np.uint64,
+        count=len(tokens),
+    ) & _MAX_HASH
+    # (a * x + b) mod p for every permutation / shingle pair, min per permutation
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (permuted.min(axis=1) & _MAX_HASH).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """Hash each LSH band of a signature into a bucket number."""
+    bands = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [zlib.crc32(band.tobytes()) for band in bands]
+
+
+# ============================================================
+# INCREMENTAL CLUSTERING
+# ============================================================
+
+def _ensure_cluster_tables(conn):
+    if not table_exists(conn, "text_clusters"):
+        create_text_clusters_tables(conn)
+    if not table_exists(conn, "cluster_state"):
+        create_cluster_state_table(conn)
+
+
+def _load_candidates(conn, table_name, keys):
+    """
+    Fetch already-clustered rows that share at least one LSH bucket
+    with the rows being clustered.
+
+    Returns:
+        dict: (band, bucket) -> list of (row_id, cluster_id, signature)
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _lsh_keys (band INTEGER, bucket INTEGER)")
+    cursor.execute("DELETE FROM _lsh_keys")
+    cursor.executemany("INSERT INTO _lsh_keys (band, bucket) VALUES (?, ?)", keys)
+
+    cursor.execute("""
+        SELECT b.band, b.bucket, c.row_id, c.cluster_id, c.signature
+        FROM _lsh_keys AS k
+        JOIN lsh_buckets AS b
+          ON b.source_table = ? AND b.band = k.band AND b.bucket = k.bucket
+        JOIN text_clusters AS c
+          ON c.source_table = b.source_table AND c.row_id = b.row_id
+    """, (table_name,))
+
+    index = {}
+    for band, bucket, row_id, cluster_id, blob in cursor.fetchall():
+        signature = np.frombuffer(blob, dtype=np.uint32)
+        index.setdefault((band, bucket), []).append((row_id, cluster_id, signature))
+    return index
+
+
+def _store_batch(conn, table_name, rows):
+    """
+    Writer command: assign cluster ids to one batch of
+    (row_id, signature, buckets) and store them. Candidates are read on
+    the writer's connection, so concurrent runs see each other's rows.
+    """
+    keys = {(band, bucket) for _, _, row_buckets in rows for band, bucket in enumerate(row_buckets)}
+    index = _load_candidates(conn, table_name, sorted(keys))
+
+    cluster_rows = []
+    bucket_rows = []
+    for row_id, signature, row_buckets in rows:
+        best_cluster, best_sim = row_id, SIMILARITY_THRESHOLD
+        seen = set()
+        for band, bucket in enumerate(row_buckets):
+            for cand_id, cand_cluster, cand_sig in index.get((band, bucket), ()):
+                if cand_id in seen:
+                    continue
+                seen.add(cand_id)
+                sim = float(np.mean(cand_sig == signature))
+                if sim >= best_sim:
+                    best_cluster, best_sim = cand_cluster, sim
+
+        # make this row visible to the rest of the batch
+        for band, bucket in enumerate(row_buckets):
+            index.setdefault((band, bucket), []).append((row_id, best_cluster, signature))
+            bucket_rows.append((table_name, band, bucket, row_id))
+        cluster_rows.append((table_name, row_id, best_cluster, signature.tobytes()))
+
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT OR REPLACE INTO text_clusters (source_table, row_id, cluster_id, signature) "
+        "VALUES (?, ?, ?, ?)",
+        cluster_rows,
+    )
+    cursor.executemany(
+        "INSERT INTO lsh_buckets (source_table, band, bucket, row_id) VALUES (?, ?, ?, ?)",
+        bucket_rows,
+    )
+
+
+def _cluster_batch(conn, table_name, rows):
+    """Sign one batch of (id, text) rows and have the writer cluster them."""
+    signed = []
+    for row_id, text in rows:
+        signature = minhash_signature(text)
+        signed.append((row_id, signature, band_buckets(signature)))
+    write_bulk(conn, "text_clusters", _store_batch, table_name, signed)
+
+
+def _recluster(conn, table_name, row_ids, signed, seq=None):
+    """
+    Writer command: take `row_ids` (deleted or edited rows) out of their
+    clusters, hand every cluster named after one of them to its smallest
+    remaining member, cluster the edited rows again from their new
+    signatures and, with `seq`, record the change-log position reached.
+    """
+    cursor = conn.cursor()
+    if row_ids:
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _cluster_rows (id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM _cluster_rows")
+        cursor.executemany("INSERT INTO _cluster_rows (id) VALUES (?)", [(i,) for i in row_ids])
+        cursor.execute(
+            "DELETE FROM text_clusters WHERE source_table = ? AND row_id IN (SELECT id FROM _cluster_rows)",
+            (table_name,),
+        )
+        cursor.execute(
+            "DELETE FROM lsh_buckets WHERE source_table = ? AND row_id IN (SELECT id FROM _cluster_rows)",
+            (table_name,),
+        )
+        # new ids are picked first, so renaming one cluster cannot change another's pick
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _cluster_heads (old_id INTEGER PRIMARY KEY, new_id INTEGER)")
+        cursor.execute("DELETE FROM _cluster_heads")
+        cursor.execute("""
+            INSERT INTO _cluster_heads (old_id, new_id)
+            SELECT cluster_id, MIN(row_id) FROM text_clusters
+            WHERE source_table = ? AND cluster_id IN (SELECT id FROM _cluster_rows)
+            GROUP BY cluster_id
+        """, (table_name,))
+        cursor.execute("""
+            UPDATE text_clusters
+            SET cluster_id = (SELECT new_id FROM _cluster_heads WHERE old_id = text_clusters.cluster_id)
+            WHERE source_table = ? AND cluster_id IN (SELECT old_id FROM _cluster_heads)
+        """, (table_name,))
+    if signed:
+        _store_batch(conn, table_name, signed)
+    if seq is not None:
+        cursor.execute(
+            "INSERT OR REPLACE INTO cluster_state (source_table, cdc_seq) VALUES (?, ?)",
+            (table_name, seq),
+        )
+
+
+def _cdc_position(conn, table_name):
+    """Change-log position the clusters of a table are current up to (or None)."""
+    if not table_exists(conn, "cluster_state"):
+        return None
+    cursor = conn.cursor()
+    cursor.execute("SELECT cdc_seq FROM cluster_state WHERE source_table = ?", (table_name,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+register_consumer("text_clusters", _cdc_position)
+
+
+def _apply_changes(conn, table_name, last_id, batch_size):
+    """
+    Re-cluster the already clustered rows (id <= last_id) that were
+    updated or deleted since the last run, from the change log. An edit
+    that leaves the row's signature unchanged (status, priority, ...)
+    costs nothing.
+
+    The first run after upgrading has no log position yet: it starts
+    from the end of the log, drops the clusters of rows that were
+    deleted before and re-heads clusters named after a missing row.
+
+    Returns:
+        int: rows re-clustered or removed
+
+    Raises:
+        ChangeLogTruncated: changes after the stored position were pruned
+    """
+    if not table_exists(conn, CHANGE_LOGS[table_name]):
+        return 0
+    cursor = conn.cursor()
+    cursor.execute("SELECT cdc_seq FROM cluster_state WHERE source_table = ?", (table_name,))
+    row = cursor.fetchone()
+    if row is None:
+        seq = current_seq(conn, table_name)
+        cursor.execute(
+            f"SELECT row_id FROM text_clusters WHERE source_table = ? "
+            f"AND row_id NOT IN (SELECT id FROM {table_name})",
+            (table_name,),
+        )
+        touched = {r[0] for r in cursor.fetchall()}
+        cursor.execute("""
+            SELECT DISTINCT cluster_id FROM text_clusters AS c
+            WHERE source_table = ? AND NOT EXISTS (
+                SELECT 1 FROM text_clusters AS h
+                WHERE h.source_table = c.source_table AND h.row_id = c.cluster_id
+            )
+        """, (table_name,))
+        touched.update(r[0] for r in cursor.fetchall())
+    else:
+        seq, touched = row[0], set()
+        for change in changes_since(conn, table_name, seq):
+            seq = change["seq"]
+            if change["row_id"] <= last_id:
+                touched.add(change["row_id"])
+
+    text_expr = " || ' ' || ".join(f"COALESCE({col}, '')" for col in CLUSTER_SOURCES[table_name])
+    ids = sorted(touched)
+    chunks = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)] or [[]]
+    total = 0
+    for n, chunk in enumerate(chunks):
+        marks = ", ".join("?" for _ in chunk)
+        current, stored = {}, {}
+        if chunk:
+            cursor.execute(f"SELECT id, {text_expr} FROM {table_name} WHERE id IN ({marks})", chunk)
+            current = dict(cursor.fetchall())
+            cursor.execute(
+                f"SELECT row_id, signature FROM text_clusters WHERE source_table = ? AND row_id IN ({marks})",
+                (table_name, *chunk),
+            )
+            stored = dict(cursor.fetchall())
+
+        leaving, signed = [], []
+        for row_id in chunk:
+            if row_id in current:
+                signature = minhash_signature(current[row_id])
+                if stored.get(row_id) == signature.tobytes():
+                    continue
+                signed.append((row_id, signature, band_buckets(signature)))
+            # a deleted row may be gone from text_clusters already (retention)
+            # while its cluster still carries its id
+            leaving.append(row_id)
+
+        last_chunk = n == len(chunks) - 1
+        if leaving or last_chunk:
+            write_bulk(conn, "text_clusters", _recluster, table_name, leaving, signed,
+                       seq if last_chunk else None)
+        total += len(leaving)
+    return total
+
+
+def update_clusters(conn, table_name, batch_size=5000):
+    """
+    Bring the clusters of `table_name` up to date.
+
+    Rows updated or deleted since the last run are taken from the change
+    log (app/data/cdc.py): a deleted row leaves its cluster, an edited
+    one is clustered again, and a cluster whose representative left is
+    handed to its smallest remaining member. If the log was pruned past
+    the stored position, the table is re-clustered from scratch.
+
+    New rows - ids above the last clustered id - are read in
+    keyset-paginated batches (no statement stays open while the writer
+    stores the previous batch). Each joins the cluster of its most
+    similar existing row (estimated Jaccard similarity >=
+    SIMILARITY_THRESHOLD among LSH candidates) or starts a new cluster
+    whose id is its own row id.
+
+    Returns:
+        int: number of rows clustered, re-clustered or removed
+    """
+    text_cols = CLUSTER_SOURCES[table_name]
+    _ensure_cluster_tables(conn)
+
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COALESCE(MAX(row_id), 0) FROM text_clusters WHERE source_table = ?",
+        (table_name,),
+    )
+    last_id = cursor.fetchone()[0]
+
+    try:
+        total = _apply_changes(conn, table_name, last_id, batch_size)
+    except ChangeLogTruncated:
+        return rebuild_clusters(conn, table_name, batch_size)
+
+    text_expr = " || ' ' || ".join(f"COALESCE({col}, '')" for col in text_cols)
+    while True:
+        cursor.execute(
+            f"SELECT id, {text_expr} FROM {table_name} WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        _cluster_batch(conn, table_name, rows)
+        last_id = rows[-1][0]
+        total += len(rows)
+    return total
+
+
+def _clear_clusters(conn, table_name, seq):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM text_clusters WHERE source_table = ?", (table_name,))
+    cursor.execute("DELETE FROM lsh_buckets WHERE source_table = ?", (table_name,))
+    cursor.execute(
+        "INSERT OR REPLACE INTO cluster_state (source_table, cdc_seq) VALUES (?, ?)",
+        (table_name, seq),
+    )
+
+
+def rebuild_clusters(conn, table_name, batch_size=5000):
+    """
+    Drop all stored clusters for a table and recluster it from scratch.
+
+    Returns:
+        int: number of rows clustered
+    """
+    _ensure_cluster_tables(conn)
+    # changes from here on are applied by later update_clusters() calls
+    seq = current_seq(conn, table_name) if table_exists(conn, CHANGE_LOGS[table_name]) else 0
+    write_bulk(conn, "text_clusters", _clear_clusters, table_name, seq)
+    return update_clusters(conn, table_name, batch_size)
+
+
+# ============================================================
+# READING CLUSTERS
+# ============================================================
+
+def get_cluster_ids(conn, table_name):
+    """
+    Return the cluster id of every clustered row.
+
+    Returns:
+        pandas.DataFrame: columns id, cluster_id
+    """
+    return pd.read_sql_query(
+        "SELECT row_id AS id, cluster_id FROM text_clusters WHERE source_table = ?",
+        conn,
+        params=(table_name,),
+    )
+
+
+def get_cluster_representatives(conn, table_name, limit=None):
+    """
+    Return one representative row per cluster (the row that started it)
+    with the cluster size, largest clusters first.
+
+    Returns:
+        pandas.DataFrame
+    """
+    query = f"""
+        SELECT t.*, c.cluster_size
+        FROM (
+            SELECT cluster_id, COUNT(*) AS cluster_size
+            FROM text_clusters
+            WHERE source_table = ?
+            GROUP BY cluster_id
+        ) AS c
+        JOIN {table_name} AS t ON t.id = c.cluster_id
+        ORDER BY c.cluster_size DESC
+    """
+    params = [table_name]
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def collapse_to_representatives(df, clusters):
+    """
+    Keep one row per cluster from an already-filtered DataFrame.
+
+    `clusters` is the output of get_cluster_ids(). Rows that have not been
+    clustered yet are kept as their own cluster. A `cluster_size` column
+    says how many filtered rows each representative stands for.
+
+    Returns:
+        pandas.DataFrame
+    """
+    if df.empty or "id" not in df.columns:
+        return df
+
+    merged = df.merge(clusters, on="id", how="left")
+    merged["cluster_id"] = merged["cluster_id"].fillna(merged["id"]).astype("int64")
+    sizes = merged.groupby("cluster_id")["id"].transform("size")
+    merged = merged.assign(cluster_size=sizes)
+    reps = merged.drop_duplicates("cluster_id", keep="first")
+    return reps.sort_values("cluster_size", ascending=False, kind="stable")
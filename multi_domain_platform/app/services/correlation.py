@@ -0,0 +1,363 @@
+import json
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.data.db import table_exists
+from app.data.schema import create_correlation_tables
+from app.data.writer import write_bulk
+
+
+# Default settings; stored links are recomputed when they change
+CORRELATION_SETTINGS = {
+    "before_hours": 2,         # a ticket may be opened this long before the incident...
+    "after_hours": 72,         # ...or this long after it
+    "min_score": 1.0,          # 1 per shared keyword + category_weight for a category match
+    "category_weight": 2.0,
+    "max_links": 5,            # strongest links kept per incident
+}
+
+# Incident type -> ticket categories the incident typically surfaces as
+CATEGORY_LINKS = {
+    "phishing": ("email", "account", "access"),
+    "malware": ("hardware", "software", "endpoint"),
+    "ddos": ("network",),
+    "unauthorized access": ("account", "access"),
+    "misconfiguration": ("network", "software"),
+}
+
+# Words too generic to link an incident to a ticket
+STOPWORDS = frozenset("""
+    the and for with from this that was were are has have had not but all any can
+    our you your its his her they them their there then than when what which who
+    into onto over under after before about again also been being very more most
+    some such only same other each few per via
+    incident incidents ticket tickets issue issues problem problems description
+    user users request requests please help unknown reported report
+""".split())
+
+# Incidents swept per step: bounds the candidate pairs held in memory
+SWEEP_CHUNK = 20_000
+
+# Table -> (time expression, text expression, category column)
+_SOURCES = {
+    "cyber_incidents": ("COALESCE(date, created_at)", "description", "incident_type"),
+    "it_tickets": (
+        "COALESCE(created_date, created_at)",
+        "COALESCE(subject, '') || ' ' || COALESCE(description, '')",
+        "category",
+    ),
+}
+
+_WORD_RE = re.compile(r"[a-z]{3,}")
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# ============================================================
+# LOADING
+# ============================================================
+
+def _keys(text, category, table_name):
+    """Keywords of a record plus "category:<ticket category>" keys."""
+    text = text if isinstance(text, str) else ""            # NULL -> None / NaN
+    category = category.strip().lower() if isinstance(category, str) else ""
+    keys = set(_WORD_RE.findall(text.lower())) - STOPWORDS
+    if table_name == "cyber_incidents":
+        keys.update(f"category:{c}" for c in CATEGORY_LINKS.get(category, ()))
+    elif category:
+        keys.add(f"category:{category}")
+    return keys
+
+
+def load_records(conn, table_name, where=None, params=()):
+    """
+    Rows of cyber_incidents / it_tickets reduced to what the sweep needs.
+    Rows without a parseable time are left out.
+
+    Returns:
+        pandas.DataFrame: id, ts (epoch seconds), keys (set), sorted by ts
+    """
+    ts_expr, text_expr, category_col = _SOURCES[table_name]
+    query = f"SELECT id, {ts_expr} AS ts, {text_expr} AS text, {category_col} AS category FROM {table_name}"
+    if where:
+        query += f" WHERE {where}"
+    df = pd.read_sql_query(query, conn, params=list(params))
+
+    ts = pd.to_datetime(df["ts"], format="mixed", errors="coerce")
+    df = df[ts.notna()]
+    return pd.DataFrame({
+        "id": df["id"].to_numpy(dtype=np.int64),
+        "ts": (ts[ts.notna()].astype("datetime64[s]").astype("int64")).to_numpy(),
+        "keys": [_keys(t, c, table_name) for t, c in zip(df["text"], df["category"])],
+    }).sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+# ============================================================
+# SORT-MERGE SWEEP
+# ============================================================
+
+def _explode(records):
+    rows, keys = [], []
+    for row, record_keys in enumerate(records["keys"]):
+        rows += [row] * len(record_keys)
+        keys += record_keys
+    return np.asarray(rows, dtype=np.int64), keys
+
+
+def sweep(incidents, tickets, settings=None):
+    """
+    Link incidents to tickets opened within [-before_hours, +after_hours]
+    of them that share keywords or a mapped category.
+
+    Both sides are exploded into (key, time) entries; the ticket entries
+    are sorted once by key then time, packed into one int64 each. Every
+    incident entry's window is then two binary searches into that array
+    (the merge step of a sort-merge join), and the candidate pairs are
+    expanded, scored and reduced with vectorized NumPy, SWEEP_CHUNK
+    incidents at a time. No pair outside a window is ever looked at.
+
+    Returns:
+        pandas.DataFrame: incident_id, ticket_id, score, gap_hours
+        (ticket time - incident time), matched_on; at most max_links rows
+        per incident, strongest first
+    """
+    settings = {**CORRELATION_SETTINGS, **(settings or {})}
+    columns = ["incident_id", "ticket_id", "score", "gap_hours", "matched_on"]
+    if incidents.empty or tickets.empty:
+        return pd.DataFrame(columns=columns)
+
+    before = int(settings["before_hours"] * 3600)
+    after = int(settings["after_hours"] * 3600)
+    origin = min(incidents["ts"].min(), tickets["ts"].min()) - before
+
+    t_rows, t_keys = _explode(tickets)
+    if not t_keys:
+        return pd.DataFrame(columns=columns)
+    codes, uniques = pd.factorize(pd.Index(t_keys, dtype=object))
+    code_of = {key: code for code, key in enumerate(uniques)}
+    weights = np.where(uniques.str.startswith("category:"), settings["category_weight"], 1.0)
+
+    t_ts = tickets["ts"].to_numpy()
+    packed = (codes.astype(np.int64) << 32) | (t_ts[t_rows] - origin)
+    order = np.argsort(packed, kind="stable")
+    packed, t_rows, codes = packed[order], t_rows[order], codes[order]
+
+    found = []
+    for start in range(0, len(incidents), SWEEP_CHUNK):
+        chunk = incidents.iloc[start:start + SWEEP_CHUNK]
+        i_rows, i_keys = _explode(chunk)
+        i_codes = np.array([code_of.get(k, -1) for k in i_keys], dtype=np.int64)
+        keep = i_codes >= 0              # keys no ticket has
+        i_rows, i_codes = i_rows[keep], i_codes[keep]
+        if not len(i_rows):
+            continue
+
+        i_ts = chunk["ts"].to_numpy()[i_rows] - origin
+        lo = np.searchsorted(packed, (i_codes << 32) | (i_ts - before), side="left")
+        hi = np.searchsorted(packed, (i_codes << 32) | (i_ts + after), side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            continue
+
+        # expand every entry's [lo, hi) range into (incident row, ticket entry) pairs
+        pair_inc = np.repeat(i_rows + start, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_entry = np.repeat(lo, counts) + offsets
+
+        pair_key = pair_inc * len(tickets) + t_rows[pair_entry]
+        unique_keys, inverse = np.unique(pair_key, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights[codes[pair_entry]])
+        strong = scores >= settings["min_score"]
+        found.append((unique_keys[strong] // len(tickets), unique_keys[strong] % len(tickets), scores[strong]))
+
+    if not found:
+        return pd.DataFrame(columns=columns)
+    inc_row = np.concatenate([f[0] for f in found])
+    tick_row = np.concatenate([f[1] for f in found])
+    score = np.concatenate([f[2] for f in found])
+
+    inc_ids = incidents["id"].to_numpy()[inc_row]
+    tick_ids = tickets["id"].to_numpy()[tick_row]
+    gap = (t_ts[tick_row] - incidents["ts"].to_numpy()[inc_row]) / 3600.0
+
+    # strongest max_links per incident (score, then closest in time, then ticket id)
+    order = np.lexsort((tick_ids, np.abs(gap), -score, inc_ids))
+    inc_ids, tick_ids, score, gap = inc_ids[order], tick_ids[order], score[order], gap[order]
+    inc_row, tick_row = inc_row[order], tick_row[order]
+    group_start = np.r_[0, np.flatnonzero(np.diff(inc_ids)) + 1]
+    rank = np.arange(len(inc_ids)) - np.repeat(group_start, np.diff(np.r_[group_start, len(inc_ids)]))
+    top = rank < settings["max_links"]
+
+    inc_keys, tick_keys = incidents["keys"].to_numpy(), tickets["keys"].to_numpy()
+    return pd.DataFrame({
+        "incident_id": inc_ids[top],
+        "ticket_id": tick_ids[top],
+        "score": score[top],
+        "gap_hours": np.round(gap[top], 2),
+        "matched_on": [", ".join(sorted(inc_keys[i] & tick_keys[t]))
+                       for i, t in zip(inc_row[top], tick_row[top])],
+    })
+
+
+# ============================================================
+# STORED LINKS (INCREMENTAL)
+# ============================================================
+
+def _ensure_tables(conn):
+    if not table_exists(conn, "incident_ticket_links"):
+        create_correlation_tables(conn)
+
+
+def _time_bounds(ts, before_s, after_s):
+    """SQL text bounds around epoch seconds (one day of slack for date-only values)."""
+    low = pd.Timestamp(int(ts.min()) - before_s - 86400, unit="s").strftime(_TS_FORMAT)
+    high = pd.Timestamp(int(ts.max()) + after_s + 86400, unit="s").strftime(_TS_FORMAT)
+    return low, high
+
+
+def _store_links(conn, links, clear, max_links, state_rows):
+    """
+    Writer command: store one run's links and the new sweep position in
+    one transaction (links and state live in the same file).
+    """
+    cursor = conn.cursor()
+    if clear:
+        cursor.execute("DELETE FROM incident_ticket_links")
+    if links:
+        cursor.executemany(
+            "INSERT OR REPLACE INTO incident_ticket_links "
+            "(incident_id, ticket_id, score, gap_hours, matched_on) VALUES (?, ?, ?, ?, ?)",
+            links,
+        )
+        # new tickets may have pushed old incidents over max_links
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _linked_incidents (id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM _linked_incidents")
+        cursor.executemany("INSERT OR IGNORE INTO _linked_incidents (id) VALUES (?)",
+                           {(int(link[0]),) for link in links})
+        cursor.execute("""
+            DELETE FROM incident_ticket_links WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, ROW_NUMBER() OVER (
+                        PARTITION BY incident_id
+                        ORDER BY score DESC, ABS(gap_hours), ticket_id
+                    ) AS rank
+                    FROM incident_ticket_links
+                    WHERE incident_id IN (SELECT id FROM _linked_incidents)
+                ) WHERE rank > ?
+            )
+        """, (max_links,))
+    cursor.executemany(
+        "INSERT OR REPLACE INTO correlation_state (key, value) VALUES (?, ?)",
+        state_rows,
+    )
+
+
+def update_links(conn, settings=None, rebuild=False):
+    """
+    Link incidents and tickets added since the last run.
+
+    New incidents are swept against the tickets in their time windows, and
+    new tickets against the earlier incidents in theirs, so every pair is
+    considered exactly once over successive runs. Afterwards each affected
+    incident keeps only its max_links strongest links. Changed settings
+    (or rebuild=True) recompute every link. Links of deleted rows are
+    hidden by get_links(); edits to already linked rows need a rebuild.
+
+    Needs a connect_database() connection with both tables (no domain).
+
+    Returns:
+        dict: incidents, tickets (new rows swept), links (written), seconds
+    """
+    settings = {**CORRELATION_SETTINGS, **(settings or {})}
+    start = time.perf_counter()
+    _ensure_tables(conn)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT key, value FROM correlation_state")
+    state = dict(cursor.fetchall())
+    settings_json = json.dumps(settings, sort_keys=True)
+    clear = rebuild or state.get("settings") != settings_json
+    if clear:
+        last_incident = last_ticket = 0
+    else:
+        last_incident = int(state.get("cyber_incidents_last_id", 0))
+        last_ticket = int(state.get("it_tickets_last_id", 0))
+
+    # fix the upper ids first: rows inserted during the run wait for the next one
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM cyber_incidents")
+    max_incident = cursor.fetchone()[0]
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM it_tickets")
+    max_ticket = cursor.fetchone()[0]
+
+    before_s = int(settings["before_hours"] * 3600)
+    after_s = int(settings["after_hours"] * 3600)
+    new_incidents = load_records(conn, "cyber_incidents", "id > ? AND id <= ?", (last_incident, max_incident))
+    new_tickets = load_records(conn, "it_tickets", "id > ? AND id <= ?", (last_ticket, max_ticket))
+
+    links = []
+    if not new_incidents.empty:
+        low, high = _time_bounds(new_incidents["ts"], before_s, after_s)
+        tickets = load_records(
+            conn, "it_tickets", f"id <= ? AND {_SOURCES['it_tickets'][0]} BETWEEN ? AND ?",
+            (max_ticket, low, high),
+        )
+        links.append(sweep(new_incidents, tickets, settings))
+    if not new_tickets.empty and last_incident:
+        # a ticket at t matches incidents in [t - after, t + before]
+        low, high = _time_bounds(new_tickets["ts"], after_s, before_s)
+        incidents = load_records(
+            conn, "cyber_incidents", f"id <= ? AND {_SOURCES['cyber_incidents'][0]} BETWEEN ? AND ?",
+            (last_incident, low, high),
+        )
+        links.append(sweep(incidents, new_tickets, settings))
+
+    links = pd.concat(links, ignore_index=True) if links else pd.DataFrame()
+    state_rows = [("settings", settings_json),
+                  ("cyber_incidents_last_id", str(max_incident)),
+                  ("it_tickets_last_id", str(max_ticket))]
+    write_bulk(conn, "incident_ticket_links", _store_links,
+               links.astype(object).values.tolist() if not links.empty else [],
+               clear, settings["max_links"], state_rows)
+    return {
+        "incidents": len(new_incidents),
+        "tickets": len(new_tickets),
+        "links": len(links),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def get_links(conn, incident_id=None, ticket_id=None, limit=None):
+    """
+    Stored links with both sides' key columns, strongest first
+    (optionally for one incident or one ticket; it_tickets.id).
+
+    Returns:
+        pandas.DataFrame
+    """
+    _ensure_tables(conn)
+    query = """
+        SELECT l.incident_id, i.incident_type, i.severity, i.description AS incident_description,
+               l.ticket_id, t.ticket_id AS ticket_number, t.priority, t.status AS ticket_status,
+               t.subject, t.description AS ticket_description,
+               l.score, l.gap_hours, l.matched_on
+        FROM incident_ticket_links AS l
+        JOIN cyber_incidents AS i ON i.id = l.incident_id
+        JOIN it_tickets AS t ON t.id = l.ticket_id
+    """
+    conditions, params = [], []
+    if incident_id is not None:
+        conditions.append("l.incident_id = ?")
+        params.append(incident_id)
+    if ticket_id is not None:
+        conditions.append("l.ticket_id = ?")
+        params.append(ticket_id)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY l.score DESC, ABS(l.gap_hours), l.ticket_id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return pd.read_sql_query(query, conn, params=params)
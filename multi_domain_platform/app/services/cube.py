@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Table -> dimensions of its cube
+CUBES = {
+    "it_tickets": ("status", "priority", "category"),
+    "cyber_incidents": ("severity", "status", "incident_type"),
+}
+
+# The marginal ("any value") slot of a dimension. None rather than a
+# label, so a real value spelled "All" is still a filter of its own;
+# widgets show it as ALL_LABEL (format_func=option_label).
+ALL = None
+ALL_LABEL = "All"
+UNKNOWN = "Unknown"     # label of NULL / empty values
+
+
+def option_label(value):
+    """Text a filter widget shows for a cube option (ALL -> "All")."""
+    return ALL_LABEL if value is ALL else value
+
+
+class Cube:
+    """
+    Row counts for every combination of a few categorical dimensions,
+    including "All" on any of them.
+
+    Each dimension's labels are integer-coded (sorted); the counts live in
+    a dense array with one extra "All" slot per axis holding the marginal
+    sums. Any filter combination is then a single array lookup, and a
+    chart series is one slice along an axis.
+
+        cube = build_cube(conn, "it_tickets")
+        cube.count(status="Open", priority=ALL)
+        cube.series("status", priority="High")      # label -> count
+        cube.options("category")
+    """
+
+    def __init__(self, dims, labels, counts, built_seconds=0.0):
+        self.dims = tuple(dims)
+        self.labels = {d: list(labels[d]) for d in self.dims}
+        self._codes = {d: {label: i for i, label in enumerate(self.labels[d])} for d in self.dims}
+        self.counts = counts
+        self.built_seconds = built_seconds
+
+    @classmethod
+    def from_groups(cls, groups, dims):
+        """
+        Build from aggregated rows: one row per dimension combination
+        with its row count in an "n" column.
+        """
+        start = time.perf_counter()
+        codes, labels = [], {}
+        for dim in dims:
+            values = groups[dim].fillna(UNKNOWN).astype(str).replace("", UNKNOWN)
+            dim_codes, dim_labels = pd.factorize(values, sort=True)
+            codes.append(dim_codes)
+            labels[dim] = dim_labels.tolist()
+
+        shape = tuple(len(labels[d]) for d in dims)
+        flat = np.ravel_multi_index(codes, shape) if len(groups) else np.zeros(0, dtype=np.int64)
+        counts = np.bincount(
+            flat, weights=groups["n"].to_numpy(dtype=np.int64), minlength=int(np.prod(shape))
+        ).astype(np.int64).reshape(shape)
+
+        # append the "All" slot (marginal sum) to every axis
+        for axis in range(len(dims)):
+            counts = np.concatenate([counts, counts.sum(axis=axis, keepdims=True)], axis=axis)
+        return cls(dims, labels, counts, round(time.perf_counter() - start, 4))
+
+    def _index(self, filters):
+        index = []
+        for dim in self.dims:
+            value = filters.get(dim, ALL)
+            if value is ALL:
+                index.append(len(self.labels[dim]))
+            else:
+                code = self._codes[dim].get(str(value))
+                if code is None:
+                    return None        # a label the data does not contain
+                index.append(code)
+        return index
+
+    def count(self, **filters):
+        """Rows matching the filters (dimension=label; missing or ALL = any)."""
+        index = self._index(filters)
+        return 0 if index is None else int(self.counts[tuple(index)])
+
+    def series(self, dim, **filters):
+        """
+        Counts per label of `dim` under the other filters (a filter on `dim`
+        itself is ignored), largest first, zero counts left out.
+
+        Returns:
+            pandas.Series: label -> count
+        """
+        filters = {d: v for d, v in filters.items() if d != dim}
+        index = self._index(filters)
+        if index is None:
+            return pd.Series(dtype="int64", name="count")
+        axis = self.dims.index(dim)
+        index[axis] = slice(0, len(self.labels[dim]))
+        values = pd.Series(self.counts[tuple(index)], index=self.labels[dim], name="count")
+        values.index.name = dim
+        return values[values > 0].sort_values(ascending=False, kind="stable")
+
+    def options(self, dim):
+        """Sorted labels of a dimension (for filter widgets)."""
+        return list(self.labels[dim])
+
+    @property
+    def total(self):
+        return self.count()
+
+
+def build_cube(conn, table_name, dims=None):
+    """
+    Aggregate a table into a Cube with one GROUP BY in SQLite (only the
+    combinations travel to Python, not the rows).
+
+    Returns:
+        Cube
+    """
+    dims = tuple(dims or CUBES[table_name])
+    columns = ", ".join(dims)
+    groups = pd.read_sql_query(
+        f"SELECT {columns}, COUNT(*) AS n FROM {table_name} GROUP BY {columns}", conn
+    )
+    return Cube.from_groups(groups, dims)
@@ -0,0 +1,310 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.data.db import table_exists
+from app.data.schema import create_dataset_profile_tables
+from app.data.writer import write
+from app.services.sketches import HyperLogLog, TopK, hash_values
+
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_TOP_K = 10
+
+
+# ============================================================
+# PER-COLUMN ACCUMULATOR
+# ============================================================
+
+def _plain(value):
+    """numpy scalars -> Python values (JSON / SQLite friendly)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ColumnProfile:
+    """
+    Statistics of one column, updated chunk by chunk in constant memory.
+
+    Mean and variance use Welford's algorithm in its batched form (Chan et
+    al.): each chunk's count / mean / M2 is merged into the running ones,
+    which stays numerically stable over 100M+ values. Distinct counts come
+    from a HyperLogLog, frequent values from a count-min sketch.
+
+    A column is "numeric" while every non-null value parses as a number;
+    otherwise it is "text" and min / max compare the text values of every
+    chunk, including the ones read while it still looked numeric.
+    """
+
+    def __init__(self, name, top_k=DEFAULT_TOP_K):
+        self.name = name
+        self.non_null = 0
+        self.nulls = 0
+        self.numeric = True
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.num_min = None
+        self.num_max = None
+        self.text_min = None
+        self.text_max = None
+        self.hll = HyperLogLog()
+        self.top = TopK(top_k)
+
+    def update(self, series):
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        self.non_null += len(values)
+        if values.empty:
+            return
+
+        if self.numeric:
+            if pd.api.types.is_bool_dtype(values):
+                numbers = None
+            elif pd.api.types.is_numeric_dtype(values):
+                numbers = values.to_numpy(dtype="float64")
+            else:
+                parsed = pd.to_numeric(values, errors="coerce")
+                numbers = None if parsed.isna().any() else parsed.to_numpy(dtype="float64")
+            if numbers is None:
+                self.numeric = False
+            else:
+                self._merge_moments(numbers)
+
+        # kept for numeric chunks too: a later chunk can still turn the column text
+        text = values.astype(str)
+        chunk_min, chunk_max = text.min(), text.max()
+        self.text_min = chunk_min if self.text_min is None else min(self.text_min, chunk_min)
+        self.text_max = chunk_max if self.text_max is None else max(self.text_max, chunk_max)
+
+        # both sketches only need each distinct value once per chunk
+        counts = values.value_counts(sort=True)
+        hashes = hash_values(counts.index.to_series())
+        self.hll.add_hashes(hashes)
+        self.top.add_counts(counts.index, hashes, counts.to_numpy())
+
+    def _merge_moments(self, x):
+        n_b = x.size
+        mean_b = float(x.mean())
+        m2_b = float(((x - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+        chunk_min, chunk_max = float(x.min()), float(x.max())
+        self.num_min = chunk_min if self.num_min is None else min(self.num_min, chunk_min)
+        self.num_max = chunk_max if self.num_max is None else max(self.num_max, chunk_max)
+
+    def result(self):
+        """
+        Returns:
+            dict: kind, non_null_count, null_count, min_value, max_value,
+            mean, variance (sample), distinct_approx, top_values
+        """
+        numeric = self.numeric and self.n > 0
+        return {
+            "kind": "numeric" if numeric else "text",
+            "non_null_count": self.non_null,
+            "null_count": self.nulls,
+            "min_value": self.num_min if numeric else self.text_min,
+            "max_value": self.num_max if numeric else self.text_max,
+            "mean": self.mean if numeric else None,
+            "variance": self.m2 / (self.n - 1) if numeric and self.n > 1 else None,
+            "distinct_approx": min(self.hll.count(), self.non_null),
+            "top_values": [[_plain(v), c] for v, c in self.top.items()],
+        }
+
+
+# ============================================================
+# READING DATASETS IN CHUNKS
+# ============================================================
+
+def read_chunks(path, fmt, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Yield a file as DataFrames of at most `chunk_rows` rows.
+    """
+    if fmt in ("csv", "tsv"):
+        yield from pd.read_csv(path, sep="\t" if fmt == "tsv" else ",", chunksize=chunk_rows)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_rows)
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Profiling Parquet files needs pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Cannot profile format '{fmt}'")
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+def profile_file(path, fmt, chunk_rows=DEFAULT_CHUNK_ROWS, top_k=DEFAULT_TOP_K):
+    """
+    Profile every column of a file, reading it chunk by chunk.
+
+    Returns:
+        dict: row_count, chunks, columns (list of (name, ColumnProfile.result()))
+    """
+    profiles = {}
+    rows = chunks = 0
+    try:
+        chunk_iter = read_chunks(path, fmt, chunk_rows)
+        first = next(chunk_iter, None)
+    except pd.errors.EmptyDataError:      # empty file / header only without columns
+        first = None
+    if first is None:
+        return {"row_count": 0, "chunks": 0, "columns": []}
+
+    for chunk in _prepend(first, chunk_iter):
+        for name in chunk.columns:
+            if name not in profiles:
+                profile = profiles[name] = ColumnProfile(str(name), top_k)
+                profile.nulls += rows          # column missing from earlier chunks
+            profiles[name].update(chunk[name])
+        for name, profile in profiles.items():
+            if name not in chunk.columns:
+                profile.nulls += len(chunk)
+        rows += len(chunk)
+        chunks += 1
+    return {
+        "row_count": rows,
+        "chunks": chunks,
+        "columns": [(profile.name, profile.result()) for profile in profiles.values()],
+    }
+
+
+# ============================================================
+# PERSISTENCE
+# ============================================================
+
+def _ensure_tables(conn):
+    if not table_exists(conn, "column_profiles"):
+        create_dataset_profile_tables(conn)
+
+
+def _save_profile(conn, dataset_id, path, sha256, result, seconds):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM column_profiles WHERE dataset_id = ?", (dataset_id,))
+    cursor.executemany(
+        """
+        INSERT INTO column_profiles
+            (dataset_id, position, column_name, kind, non_null_count, null_count,
+             min_value, max_value, mean, variance, distinct_approx, top_values)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                dataset_id, position, name, c["kind"], c["non_null_count"], c["null_count"],
+                None if c["min_value"] is None else str(c["min_value"]),
+                None if c["max_value"] is None else str(c["max_value"]),
+                c["mean"], c["variance"], c["distinct_approx"], json.dumps(c["top_values"], default=str),
+            )
+            for position, (name, c) in enumerate(result["columns"])
+        ],
+    )
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO dataset_profiles
+            (dataset_id, path, sha256, row_count, column_count, chunks, seconds, profiled_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """,
+        (dataset_id, path, sha256, result["row_count"], len(result["columns"]),
+         result["chunks"], seconds),
+    )
+
+
+def profile_dataset(conn, dataset_id, chunk_rows=DEFAULT_CHUNK_ROWS, top_k=DEFAULT_TOP_K, force=False):
+    """
+    Profile one catalogued dataset and store the result.
+
+    The file comes from catalog_files (run the catalog scanner first). A
+    dataset whose file hash matches its stored profile is skipped unless
+    force=True.
+
+    Returns:
+        dict: dataset_id, path, status ("profiled" / "unchanged"),
+        row_count, column_count, seconds
+    """
+    _ensure_tables(conn)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT path, format, sha256 FROM catalog_files WHERE dataset_id = ? AND error IS NULL",
+        (dataset_id,),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Dataset {dataset_id} has no scanned file in the catalog")
+    path, fmt, sha256 = row
+
+    cursor.execute(
+        "SELECT sha256, row_count, column_count, seconds FROM dataset_profiles WHERE dataset_id = ?",
+        (dataset_id,),
+    )
+    existing = cursor.fetchone()
+    if existing and not force and existing[0] == sha256:
+        return {
+            "dataset_id": dataset_id, "path": path, "status": "unchanged",
+            "row_count": existing[1], "column_count": existing[2], "seconds": existing[3],
+        }
+
+    start = time.perf_counter()
+    result = profile_file(path, fmt, chunk_rows, top_k)
+    seconds = round(time.perf_counter() - start, 3)
+
+    write(conn, "dataset_profiles", _save_profile, dataset_id, path, sha256, result, seconds)
+    return {
+        "dataset_id": dataset_id, "path": path, "status": "profiled",
+        "row_count": result["row_count"], "column_count": len(result["columns"]),
+        "seconds": seconds,
+    }
+
+
+def profile_catalog(conn, chunk_rows=DEFAULT_CHUNK_ROWS, top_k=DEFAULT_TOP_K, force=False,
+                    on_dataset=None):
+    """
+    Profile every catalogued dataset (unchanged ones are skipped).
+
+    Returns:
+        list of profile_dataset() results (errors as {"dataset_id", "path", "error"})
+    """
+    _ensure_tables(conn)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT dataset_id, path FROM catalog_files "
+        "WHERE dataset_id IS NOT NULL AND error IS NULL ORDER BY dataset_id"
+    )
+    results = []
+    for dataset_id, path in cursor.fetchall():
+        try:
+            outcome = profile_dataset(conn, dataset_id, chunk_rows, top_k, force)
+        except Exception as e:       # one unreadable file must not stop the run
+            outcome = {"dataset_id": dataset_id, "path": path, "error": f"{type(e).__name__}: {e}"}
+        results.append(outcome)
+        if on_dataset:
+            on_dataset(outcome)
+    return results
+
+
+def get_column_profiles(conn, dataset_id):
+    """
+    Stored column statistics of a dataset, in column order.
+
+    Returns:
+        pandas.DataFrame (empty if the dataset was never profiled)
+    """
+    _ensure_tables(conn)
+    return pd.read_sql_query(
+        "SELECT column_name, kind, non_null_count, null_count, min_value, max_value, "
+        "mean, variance, distinct_approx, top_values "
+        "FROM column_profiles WHERE dataset_id = ? ORDER BY position",
+        conn,
+        params=(dataset_id,),
+    )
@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Most points a chart is drawn with; a series (or zoomed range) with fewer
+# is drawn as-is. MDP_CHART_POINTS sets the default for everyone.
+DEFAULT_POINT_BUDGET = int(os.environ.get("MDP_CHART_POINTS", "1000"))
+POINT_BUDGETS = tuple(sorted({500, 1000, 2000, 5000, DEFAULT_POINT_BUDGET}))
+
+# lttb     Largest-Triangle-Three-Buckets: keeps the visual shape of a line
+# minmax   lowest and highest point of every bucket: keeps every spike
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+# ============================================================
+# POINT SELECTION
+# ============================================================
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the n_out points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last point are always kept; the points in between are
+    split into n_out - 2 equal buckets and each bucket keeps the point
+    forming the largest triangle with the point kept from the previous
+    bucket and the average of the next one. Bucket edges and averages are
+    computed for all buckets at once; only the choice of the anchor walks
+    the buckets in order, as the algorithm requires.
+
+    x must be ascending (ties are fine); neither array may hold NaN.
+
+    Returns:
+        numpy.ndarray of int64 (ascending)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets [edges[k], edges[k + 1]) over points 1 .. n - 2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / sizes
+    # the third corner of bucket k: the next bucket's average (the last
+    # point for the last bucket)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for k in range(n_out - 2):
+        lo, hi = edges[k], edges[k + 1]
+        ax, ay = x[a], y[a]
+        # twice the triangle area; the factor does not change the argmax
+        area = np.abs((ax - next_x[k]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[k] - ay))
+        a = lo + int(area.argmax())
+        out[k + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out):
+    """
+    Indices of the lowest and highest point of every bucket, plus the
+    first and last point: at most n_out points, no spike lost. Fully
+    vectorized: the series is padded to (n_out - 2) // 2 equal buckets
+    and reshaped into one row per bucket.
+
+    y may not hold NaN.
+
+    Returns:
+        numpy.ndarray of int64 (ascending)
+    """
+    n = len(y)
+    buckets = (n_out - 2) // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+
+    size = -(-n // buckets)
+    # pad with the last value: a padded min / max stands for the last point
+    padded = np.concatenate([y, np.full(buckets * size - n, y[-1])])
+    grid = padded.reshape(buckets, size)
+    start = np.arange(buckets, dtype=np.int64) * size
+    picked = np.concatenate([[0, n - 1], start + grid.argmin(axis=1), start + grid.argmax(axis=1)])
+    return np.unique(np.minimum(picked, n - 1))
+
+
+# ============================================================
+# SERIES
+# ============================================================
+
+def _x_values(index):
+    """Index as float64 x coordinates (timestamps as ns since the first one)."""
+    if isinstance(index, pd.DatetimeIndex):
+        ns = index.asi8
+        return (ns - ns[0]).astype(np.float64)
+    if pd.api.types.is_numeric_dtype(index):
+        return np.asarray(index, dtype=np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def zoom(series, start=None, end=None):
+    """
+    The part of a series (ascending index) with start <= index < end;
+    None leaves that side open. A slice, not a copy.
+    """
+    index = series.index
+    lo = 0 if start is None else index.searchsorted(start, side="left")
+    hi = len(index) if end is None else index.searchsorted(end, side="left")
+    return series.iloc[lo:hi]
+
+
+def downsample(series, budget=DEFAULT_POINT_BUDGET, method="lttb"):
+    """
+    At most `budget` points of a numeric series (ascending index) chosen
+    for drawing it: the points a chart needs to look the same, so what
+    goes to the browser stays bounded however long the history is.
+    NaN values are dropped first.
+
+    Returns:
+        pandas.Series (the series itself when it already fits)
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    if series.hasnans:
+        series = series.dropna()
+    if len(series) <= budget:
+        return series
+
+    y = series.to_numpy(dtype=np.float64)
+    if method == "minmax":
+        keep = minmax_indices(y, budget)
+    else:
+        keep = lttb_indices(_x_values(series.index), y, budget)
+    return series.iloc[keep]
@@ -0,0 +1,204 @@
+import csv
+import io
+import json
+import tempfile
+import time
+import zlib
+
+from app.data.db import connect_database
+from app.services.cube import ALL, UNKNOWN
+
+
+# Domain -> table that can be exported
+EXPORT_TABLES = {
+    "tickets": "it_tickets",
+    "incidents": "cyber_incidents",
+}
+
+# Format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "ndjson": ("application/x-ndjson", ".ndjson"),
+}
+
+# Rows fetched from the cursor (and encoded) per step
+FETCH_ROWS = 5000
+
+GZIP_LEVEL = 6
+
+
+# ============================================================
+# QUERY
+# ============================================================
+
+def filter_clause(filters):
+    """
+    WHERE clause for page filters: {column: label}, with labels as the
+    cube gives them (ALL = no filter, UNKNOWN = NULL / empty).
+
+    Returns:
+        tuple: (where string or None, params list)
+    """
+    conditions, params = [], []
+    for column, value in (filters or {}).items():
+        if value is ALL:
+            continue
+        if value == UNKNOWN:
+            conditions.append(f"({column} IS NULL OR {column} IN ('', ?))")
+        else:
+            conditions.append(f"{column} = ?")
+        params.append(value)
+    return " AND ".join(conditions) or None, params
+
+
+def _batches(cursor, batch_size, stats):
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            stats["rows"] += len(rows)
+            yield rows
+    finally:
+        cursor.close()
+
+
+def query_batches(conn, table_name, filters=None, order_by="id DESC", batch_size=FETCH_ROWS,
+                  stats=None):
+    """
+    Run the filtered export query; rows stay in SQLite until fetched.
+
+    Returns:
+        tuple: (column names, iterator of row lists of at most batch_size)
+    """
+    if table_name not in EXPORT_TABLES.values():
+        raise ValueError(f"Cannot export table '{table_name}'")
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    unknown = set(filters or {}) - {row[1] for row in cursor.fetchall()}
+    if unknown:
+        raise ValueError(f"No column {', '.join(sorted(unknown))} in {table_name}")
+
+    where, params = filter_clause(filters)
+    query = f"SELECT * FROM {table_name}"
+    if where:
+        query += f" WHERE {where}"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    cursor.execute(query, params)
+    columns = [d[0] for d in cursor.description]
+    return columns, _batches(cursor, batch_size, stats if stats is not None else {"rows": 0})
+
+
+# ============================================================
+# ENCODERS (iterators of bytes)
+# ============================================================
+
+def csv_chunks(columns, batches):
+    """Header line, then one encoded chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")    # header of an empty result
+
+
+def ndjson_chunks(columns, batches):
+    """One JSON object per row and line."""
+    encode = json.JSONEncoder(ensure_ascii=False, default=str).encode
+    for rows in batches:
+        yield "".join(encode(dict(zip(columns, row))) + "\n" for row in rows).encode("utf-8")
+
+
+def gzip_chunks(chunks, level=GZIP_LEVEL):
+    """Compress a stream of bytes into a gzip stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+_ENCODERS = {"csv": csv_chunks, "ndjson": ndjson_chunks}
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+
+def stream_export(conn, table_name, fmt="csv", filters=None, compress=False,
+                  batch_size=FETCH_ROWS, stats=None):
+    """
+    Filtered rows of a table as a stream of encoded bytes.
+
+    Memory stays at about one batch whatever the number of rows; the
+    query's read transaction stays open until the stream is consumed.
+    `stats` (a dict) gets the number of rows under "rows".
+
+        for chunk in stream_export(conn, "it_tickets", "ndjson", {"status": "Open"}):
+            out.write(chunk)
+
+    Yields:
+        bytes
+    """
+    if fmt not in _ENCODERS:
+        raise ValueError(f"Unknown export format '{fmt}' (choose from {', '.join(_ENCODERS)})")
+    if stats is not None:
+        stats["rows"] = 0
+    columns, batches = query_batches(conn, table_name, filters, batch_size=batch_size, stats=stats)
+    chunks = _ENCODERS[fmt](columns, batches)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_to_file(conn, table_name, out, fmt="csv", filters=None, compress=False,
+                   batch_size=FETCH_ROWS):
+    """
+    Write an export to a binary file object.
+
+    Returns:
+        dict: rows, bytes, seconds
+    """
+    stats = {"rows": 0}
+    written = 0
+    start = time.perf_counter()
+    for chunk in stream_export(conn, table_name, fmt, filters, compress, batch_size, stats):
+        out.write(chunk)
+        written += len(chunk)
+    return {"rows": stats["rows"], "bytes": written, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def export_to_tempfile(domain, fmt="csv", filters=None, compress=False):
+    """
+    Export a domain's table to an anonymous temporary file on disk,
+    opened and rewound (for download buttons: the rows never sit in
+    memory as a DataFrame or one big string).
+
+    Returns:
+        file object
+    """
+    out = tempfile.TemporaryFile()
+    conn = connect_database(domain)
+    try:
+        export_to_file(conn, EXPORT_TABLES[domain], out, fmt, filters, compress)
+    except BaseException:
+        out.close()
+        raise
+    finally:
+        conn.close()
+    out.seek(0)
+    return out
+
+
+def export_file_name(table_name, fmt, compress=False):
+    """e.g. it_tickets-20240105-1432.csv.gz"""
+    return f"{table_name}-{time.strftime('%Y%m%d-%H%M')}{EXPORT_FORMATS[fmt][1]}" + (".gz" if compress else "")
+
+
+def export_mime(fmt, compress=False):
+    return "application/gzip" if compress else EXPORT_FORMATS[fmt][0]
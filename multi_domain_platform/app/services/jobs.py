@@ -0,0 +1,293 @@
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.data.db import connect_database
+from app.data.schema import create_ai_jobs_table
+from app.data.writer import write
+
+
+MAX_WORKERS = int(os.environ.get("MDP_AI_WORKERS", "4"))
+
+# Per-user quotas
+MAX_ACTIVE_JOBS_PER_USER = 2      # queued + running at the same time
+MAX_JOBS_PER_USER_PER_DAY = 50
+
+# Retries: delay = min(MAX_BACKOFF, BASE_BACKOFF * 2^(attempt-1)) + jitter
+MAX_ATTEMPTS = 4
+BASE_BACKOFF = 2.0
+MAX_BACKOFF = 60.0
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class QuotaExceeded(Exception):
+    """Raised when a user already has too many AI jobs."""
+
+
+class RetryableJobError(Exception):
+    """Raise from a handler to request another attempt with backoff."""
+
+
+_handlers = {}            # kind -> (handler, retryable exception types)
+
+
+def register_handler(kind, handler, retry_on=()):
+    """
+    Register the function that runs jobs of a given kind.
+
+    handler(payload: dict) -> str is called on a worker thread. Exceptions
+    of the types in `retry_on` (and RetryableJobError) are retried with
+    exponential backoff; anything else fails the job immediately.
+    """
+    _handlers[kind] = (handler, (RetryableJobError,) + tuple(retry_on))
+
+
+def _backoff_delay(attempt):
+    delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (attempt - 1))
+    return delay + random.uniform(0, delay / 2)
+
+
+_JOB_COLUMNS = "id, username, kind, status, attempts, result, error, created_at, updated_at"
+
+
+def _row_to_job(row):
+    if row is None:
+        return None
+    return dict(zip(_JOB_COLUMNS.split(", "), row))
+
+
+def _insert_job(conn, username, kind, payload):
+    """Quota checks + INSERT in one writer transaction, so they cannot race."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM ai_jobs WHERE username = ? AND status IN (?, ?)",
+        (username, *ACTIVE_STATUSES),
+    )
+    if cursor.fetchone()[0] >= MAX_ACTIVE_JOBS_PER_USER:
+        raise QuotaExceeded(
+            f"You already have {MAX_ACTIVE_JOBS_PER_USER} AI jobs in progress."
+        )
+
+    cursor.execute(
+        "SELECT COUNT(*) FROM ai_jobs "
+        "WHERE username = ? AND created_at >= datetime('now', '-1 day')",
+        (username,),
+    )
+    if cursor.fetchone()[0] >= MAX_JOBS_PER_USER_PER_DAY:
+        raise QuotaExceeded(
+            f"Daily limit of {MAX_JOBS_PER_USER_PER_DAY} AI jobs reached."
+        )
+
+    cursor.execute(
+        "INSERT INTO ai_jobs (username, kind, payload) VALUES (?, ?, ?)",
+        (username, kind, json.dumps(payload)),
+    )
+    return cursor.lastrowid
+
+
+def _claim_job(conn, job_id):
+    """queued -> running (0 rows if another worker already took it)."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE ai_jobs SET status = 'running', attempts = attempts + 1, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'queued'",
+        (job_id,),
+    )
+    return cursor.rowcount
+
+
+def _requeue_job(conn, job_id, error):
+    conn.execute(
+        "UPDATE ai_jobs SET status = 'queued', error = ?, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (error, job_id),
+    )
+
+
+def _finish_job(conn, job_id, status, result=None, error=None):
+    conn.execute(
+        "UPDATE ai_jobs SET status = ?, result = ?, error = ?, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (status, result, error, job_id),
+    )
+
+
+def _requeue_interrupted(conn):
+    """running -> queued for jobs of a previous process; returns every queued id."""
+    cursor = conn.cursor()
+    cursor.execute("UPDATE ai_jobs SET status = 'queued' WHERE status = 'running'")
+    cursor.execute("SELECT id FROM ai_jobs WHERE status = 'queued' ORDER BY id")
+    return [row[0] for row in cursor.fetchall()]
+
+
+# ============================================================
+# JOB QUEUE
+# ============================================================
+
+class JobQueue:
+    """
+    SQLite-backed AI job queue run by a bounded worker pool.
+
+    Jobs are rows in ai_jobs, so a page can poll them from any session and
+    queued work survives a restart (recover() re-submits it). Every
+    database call opens its own short-lived connection because workers
+    run on pool threads; every write goes through the catalog's writer
+    thread (app/data/writer.py).
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-job")
+
+        conn = connect_database("catalog")
+        create_ai_jobs_table(conn)
+        conn.close()
+        self.recover()
+
+    # ---------- submitting ----------
+
+    def enqueue(self, username, kind, payload):
+        """
+        Store a new job and hand it to the worker pool.
+
+        Returns:
+            int: job id
+
+        Raises:
+            QuotaExceeded: if the user is over a quota
+        """
+        conn = connect_database("catalog")
+        try:
+            job_id = write(conn, "ai_jobs", _insert_job, username, kind, payload)
+        finally:
+            conn.close()
+
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _schedule_retry(self, job_id, delay):
+        timer = threading.Timer(delay, lambda: self._executor.submit(self._run, job_id))
+        timer.daemon = True
+        timer.start()
+
+    # ---------- running ----------
+
+    def _run(self, job_id):
+        conn = connect_database("catalog")
+        try:
+            if write(conn, "ai_jobs", _claim_job, job_id) == 0:
+                return
+
+            cursor = conn.cursor()
+            cursor.execute("SELECT kind, payload, attempts FROM ai_jobs WHERE id = ?", (job_id,))
+            kind, payload, attempts = cursor.fetchone()
+
+            if kind not in _handlers:
+                self._store(conn, job_id, _finish_job, "failed",
+                            error=f"No handler registered for '{kind}'")
+                return
+
+            handler, retry_on = _handlers[kind]
+            try:
+                result = handler(json.loads(payload))
+            except retry_on as e:
+                if attempts < MAX_ATTEMPTS:
+                    if self._store(conn, job_id, _requeue_job, f"Attempt {attempts} failed: {e}"):
+                        self._schedule_retry(job_id, _backoff_delay(attempts))
+                else:
+                    self._store(conn, job_id, _finish_job, "failed",
+                                error=f"Gave up after {attempts} attempts: {e}")
+            except Exception as e:
+                self._store(conn, job_id, _finish_job, "failed", error=str(e))
+            else:
+                self._store(conn, job_id, _finish_job, "done", result=result)
+        except Exception as e:
+            # raised outside the handler (claim, reading the job): nothing
+            # would see it in the executor's future
+            print(f"❌ AI job {job_id}: {e}")
+            self._store(conn, job_id, _finish_job, "failed", error=f"Job runner error: {e}")
+        finally:
+            conn.close()
+
+    def _store(self, conn, job_id, command, *args, **kwargs):
+        """
+        Write a job's outcome. If that write fails (still busy after the
+        writer's retries, a result SQLite cannot store) the job is marked
+        failed instead, so it does not stay 'running' and hold a slot of
+        the user's quota; if even that fails the error is printed and
+        recover() re-queues the job at the next start.
+
+        Returns:
+            bool: True if the outcome itself was stored
+        """
+        try:
+            write(conn, "ai_jobs", command, job_id, *args, **kwargs)
+            return True
+        except Exception as e:
+            reason = f"Could not store the job outcome: {e}"
+        print(f"❌ AI job {job_id}: {reason}")
+        try:
+            write(conn, "ai_jobs", _finish_job, job_id, "failed", error=reason)
+        except Exception as e:
+            print(f"❌ AI job {job_id}: could not mark it failed either: {e}")
+        return False
+
+    def recover(self):
+        """
+        Re-submit jobs left queued or running by a previous server process.
+
+        Returns:
+            int: number of jobs re-submitted
+        """
+        conn = connect_database("catalog")
+        try:
+            job_ids = write(conn, "ai_jobs", _requeue_interrupted)
+        finally:
+            conn.close()
+
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id)
+        return len(job_ids)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide JobQueue (shared by every Streamlit session)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+# ============================================================
+# READING JOBS
+# ============================================================
+
+def get_job(job_id):
+    """Return a job as a dict (None if it does not exist)."""
+    conn = connect_database("catalog")
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {_JOB_COLUMNS} FROM ai_jobs WHERE id = ?", (job_id,))
+    job = _row_to_job(cursor.fetchone())
+    conn.close()
+    return job
+
+
+def get_latest_job(username, kind):
+    """Return the user's most recent job of a kind (None if there is none)."""
+    conn = connect_database("catalog")
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT {_JOB_COLUMNS} FROM ai_jobs WHERE username = ? AND kind = ? "
+        "ORDER BY id DESC LIMIT 1",
+        (username, kind),
+    )
+    job = _row_to_job(cursor.fetchone())
+    conn.close()
+    return job
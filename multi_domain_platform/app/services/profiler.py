@@ -0,0 +1,207 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+
+# Samples kept per (page, section) for the rolling histograms
+ROLLING_WINDOW = 200
+
+# Histogram bucket upper edges in milliseconds (last bucket is open-ended)
+BUCKET_EDGES_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+PROFILE_DIR = Path(__file__).resolve().parents[2] / "data" / "profiles"
+
+_history_lock = threading.Lock()
+_history = {}   # (page, section) -> deque of (wall_ms, cpu_ms)
+
+
+def _remember(page, section, wall_ms, cpu_ms):
+    with _history_lock:
+        samples = _history.get((page, section))
+        if samples is None:
+            samples = _history[(page, section)] = deque(maxlen=ROLLING_WINDOW)
+        samples.append((wall_ms, cpu_ms))
+
+
+def section_histograms(page):
+    """
+    Rolling timing summary for every section of a page (all sessions).
+
+    Returns:
+        dict: section -> {runs, wall_p50_ms, wall_p95_ms, cpu_p50_ms, histogram}
+        where histogram maps "<= edge ms" labels to run counts.
+    """
+    with _history_lock:
+        snapshot = {s: list(v) for (p, s), v in _history.items() if p == page}
+
+    labels = [f"<= {e} ms" for e in BUCKET_EDGES_MS] + [f"> {BUCKET_EDGES_MS[-1]} ms"]
+    out = {}
+    for section, samples in snapshot.items():
+        wall = np.array([w for w, _ in samples])
+        cpu = np.array([c for _, c in samples])
+        counts = np.bincount(np.searchsorted(BUCKET_EDGES_MS, wall), minlength=len(labels))
+        out[section] = {
+            "runs": len(samples),
+            "wall_p50_ms": round(float(np.percentile(wall, 50)), 2),
+            "wall_p95_ms": round(float(np.percentile(wall, 95)), 2),
+            "cpu_p50_ms": round(float(np.percentile(cpu, 50)), 2),
+            "histogram": {label: int(n) for label, n in zip(labels, counts)},
+        }
+    return out
+
+
+class PageProfiler:
+    """
+    Times named sections of one Streamlit script run.
+
+        prof = PageProfiler("Dashboard")
+        with prof.section("sql: dashboard bundle"):
+            ...
+        render_debug_panel(prof)    # calls prof.finish()
+
+    Wall time uses perf_counter; CPU time uses thread_time, because every
+    Streamlit session runs its script in its own thread. Sections can be
+    nested ("charts/severity"). A page that ends its run early (st.stop(),
+    st.rerun(), st.switch_page()) calls finish() first, so cProfile is not
+    left enabled. With cprofile=True (or MDP_PROFILE=cprofile) the whole
+    run is also recorded with cProfile and dumped to data/profiles/.
+    """
+
+    def __init__(self, page, cprofile=False):
+        self.page = page
+        self.sections = []          # (name, wall_ms, cpu_ms) in run order
+        self._stack = []
+        self._started = (time.perf_counter(), time.thread_time())
+        self.total = None
+        self.profile_path = None
+        self.profile_text = None
+
+        self._cprofile = None
+        if cprofile or os.environ.get("MDP_PROFILE") == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def section(self, name):
+        self._stack.append(name)
+        full_name = "/".join(self._stack)
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - wall0) * 1000.0
+            cpu_ms = (time.thread_time() - cpu0) * 1000.0
+            self._stack.pop()
+            self.sections.append((full_name, wall_ms, cpu_ms))
+            _remember(self.page, full_name, wall_ms, cpu_ms)
+
+    def finish(self):
+        """Stop timing the run and (if enabled) write the cProfile dump."""
+        if self.total is not None:
+            return
+        wall0, cpu0 = self._started
+        wall_ms = (time.perf_counter() - wall0) * 1000.0
+        cpu_ms = (time.thread_time() - cpu0) * 1000.0
+        self.total = (wall_ms, cpu_ms)
+        _remember(self.page, "(total)", wall_ms, cpu_ms)
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            slug = self.page.lower().replace(" ", "_")
+            self.profile_path = PROFILE_DIR / f"{slug}-{stamp}.prof"
+            self._cprofile.dump_stats(str(self.profile_path))
+
+            buf = io.StringIO()
+            pstats.Stats(self._cprofile, stream=buf).sort_stats("cumulative").print_stats(25)
+            self.profile_text = buf.getvalue()
+
+    def to_dict(self):
+        """This run's timings plus the rolling histograms for the page."""
+        return {
+            "page": self.page,
+            "run": {
+                "sections": [
+                    {"section": name, "wall_ms": round(w, 3), "cpu_ms": round(c, 3)}
+                    for name, w, c in self.sections
+                ],
+                "total_wall_ms": round(self.total[0], 3) if self.total else None,
+                "total_cpu_ms": round(self.total[1], 3) if self.total else None,
+                "cprofile_dump": str(self.profile_path) if self.profile_path else None,
+            },
+            "rolling": section_histograms(self.page),
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+
+def _request_cprofile(page):
+    import streamlit as st
+
+    st.session_state[f"cprofile_{page}"] = True
+
+
+def render_debug_panel(profiler):
+    """
+    Show the profiler results in a collapsed expander at the bottom of a
+    page, with a JSON download and a button recording the next run with
+    cProfile (the page reads st.session_state.pop(f"cprofile_{page}")).
+    """
+    import streamlit as st
+    import pandas as pd
+
+    profiler.finish()
+    data = profiler.to_dict()
+
+    with st.expander("🐞 Debug: page render profile", expanded=False):
+        wall_ms, cpu_ms = profiler.total
+        st.caption(f"This run: {wall_ms:.1f} ms wall, {cpu_ms:.1f} ms CPU")
+
+        if profiler.sections:
+            st.dataframe(
+                pd.DataFrame(data["run"]["sections"]),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        rolling = data["rolling"]
+        if rolling:
+            st.write("**Rolling stats (last runs, all sessions)**")
+            summary = pd.DataFrame([
+                {"section": s, **{k: v for k, v in r.items() if k != "histogram"}}
+                for s, r in rolling.items()
+            ])
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+
+            section = st.selectbox("Histogram for section", list(rolling.keys()))
+            st.bar_chart(pd.Series(rolling[section]["histogram"]))
+
+        # one-shot: the page pops the flag, so only the next run is recorded
+        st.button(
+            "Record cProfile on the next rerun",
+            key=f"cprofile_button_{profiler.page}",
+            on_click=_request_cprofile,
+            args=(profiler.page,),
+            help="Writes a .prof file to data/profiles/ (open with snakeviz or pstats).",
+        )
+        if profiler.profile_text:
+            st.caption(f"cProfile dump: {profiler.profile_path}")
+            st.text(profiler.profile_text)
+
+        st.download_button(
+            "Download profile (JSON)",
+            data=profiler.to_json(),
+            file_name=f"{profiler.page.lower().replace(' ', '_')}_profile.json",
+            mime="application/json",
+        )
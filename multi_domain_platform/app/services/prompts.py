@@ -0,0 +1,274 @@
+import math
+import string
+import threading
+
+
+# ============================================================
+# TOKEN ESTIMATES
+# ============================================================
+
+_encoding = None
+
+
+def estimate_tokens(text):
+    """
+    Token count for `text`.
+
+    Uses tiktoken (o200k_base, the gpt-4o tokenizer) when it is installed,
+    otherwise the usual ~4 characters per token approximation.
+
+    Returns:
+        int
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+# ============================================================
+# TEMPLATES
+# ============================================================
+
+class PromptTemplate:
+    """
+    A versioned (system, user) prompt pair, compiled once at import.
+
+    The system message has no variables and the user template keeps its
+    static text in front of the first {placeholder}, so every request with
+    the same template starts with the same bytes. OpenAI caches prompt
+    prefixes of 1024+ tokens automatically; stable prefixes are what make
+    those cache hits possible.
+    """
+
+    def __init__(self, name, version, system, user="{input}"):
+        self.name = name
+        self.version = version
+        self.system = _normalize(system)
+        self.user = _normalize(user)
+
+        # compile: [(literal, field_name or None), ...]
+        self._parts = []
+        self.fields = []
+        for literal, field, spec, conversion in string.Formatter().parse(self.user):
+            if spec or conversion:
+                raise ValueError(f"{self.id}: format specs are not supported ({{{field}}})")
+            self._parts.append((literal, field))
+            if field is not None and field not in self.fields:
+                self.fields.append(field)
+
+        first_literal = self._parts[0][0] if self._parts else ""
+        self.static_prefix = self.system + "\n" + first_literal
+        self.prefix_tokens = estimate_tokens(self.static_prefix)
+
+    @property
+    def id(self):
+        return f"{self.name}@v{self.version}"
+
+    def render_user(self, **values):
+        missing = [f for f in self.fields if f not in values]
+        if missing:
+            raise KeyError(f"{self.id}: missing prompt variables {missing}")
+        return "".join(
+            literal + ("" if field is None else str(values[field]))
+            for literal, field in self._parts
+        )
+
+    def messages(self, **values):
+        """
+        Chat messages for one request: static system first, data last.
+
+        Returns:
+            list of {"role", "content"} dicts
+        """
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.render_user(**values)},
+        ]
+
+
+def _normalize(text):
+    # byte-stable: one newline style, no trailing spaces
+    lines = text.replace("\r\n", "\n").strip("\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines)
+
+
+_registry = {}       # name -> {version: PromptTemplate}
+
+
+def register_prompt(name, version, system, user="{input}"):
+    """
+    Add a prompt version to the registry.
+
+    Versions are immutable: change a prompt by registering a new version,
+    so cached prefixes and recorded stats stay attributable.
+
+    Returns:
+        PromptTemplate
+    """
+    template = PromptTemplate(name, version, system, user)
+    versions = _registry.setdefault(name, {})
+    existing = versions.get(version)
+    if existing is not None and (existing.system, existing.user) != (template.system, template.user):
+        raise ValueError(f"Prompt {template.id} is already registered with different text")
+    versions.setdefault(version, template)
+    return versions[version]
+
+
+def get_prompt(name, version=None):
+    """
+    Look up a prompt (latest version unless `version` is given).
+
+    Returns:
+        PromptTemplate
+    """
+    versions = _registry.get(name)
+    if not versions:
+        raise KeyError(f"Unknown prompt '{name}'")
+    if version is None:
+        version = max(versions)
+    return versions[version]
+
+
+def list_prompts():
+    """All registered templates, sorted by name and version."""
+    return [t for name in sorted(_registry) for _, t in sorted(_registry[name].items())]
+
+
+# ============================================================
+# USAGE / PREFIX-CACHE STATS
+# ============================================================
+
+_usage_lock = threading.Lock()
+_usage = {}          # template id -> counters
+
+
+def _usage_value(usage, key, default=0):
+    if usage is None:
+        return default
+    if isinstance(usage, dict):
+        return usage.get(key) or default
+    return getattr(usage, key, None) or default
+
+
+def record_usage(template, usage):
+    """
+    Record the token usage of one completion made with `template`.
+
+    `usage` is the API's usage object (or a dict with the same keys);
+    cached_tokens comes from usage.prompt_tokens_details.
+    """
+    details = _usage_value(usage, "prompt_tokens_details", None)
+    cached = _usage_value(details, "cached_tokens")
+    with _usage_lock:
+        stats = _usage.setdefault(template.id, {
+            "requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+        })
+        stats["requests"] += 1
+        stats["prompt_tokens"] += _usage_value(usage, "prompt_tokens")
+        stats["cached_tokens"] += cached
+        stats["completion_tokens"] += _usage_value(usage, "completion_tokens")
+
+
+def get_prompt_stats():
+    """
+    Per-template token counters since process start.
+
+    Returns:
+        list of dicts: prompt, prefix_tokens, requests, prompt_tokens,
+        cached_tokens, completion_tokens, cache_hit_ratio
+    """
+    with _usage_lock:
+        snapshot = {k: dict(v) for k, v in _usage.items()}
+
+    rows = []
+    for template in list_prompts():
+        stats = snapshot.get(template.id, {
+            "requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+        })
+        rows.append({
+            "prompt": template.id,
+            "prefix_tokens": template.prefix_tokens,
+            **stats,
+            "cache_hit_ratio": (round(stats["cached_tokens"] / stats["prompt_tokens"], 3)
+                                if stats["prompt_tokens"] else None),
+        })
+    return rows
+
+
+def reset_prompt_stats():
+    with _usage_lock:
+        _usage.clear()
+
+
+# ============================================================
+# PROMPTS
+# ============================================================
+
+GENERAL_ASSISTANT = register_prompt("general_assistant", 1, "You are a helpful assistant.")
+
+ASSISTANT_PROMPTS = {
+    "Cybersecurity": register_prompt("assistant_cybersecurity", 1, """
+You are a cybersecurity expert assistant.
+- Analyze incidents and threats
+- Provide technical guidance
+- Explain attack vectors and mitigations
+- Use standard terminology (MITRE ATT&CK, CVE when relevant)
+- Prioritize actionable recommendations
+Tone: Professional, technical
+Format: Clear, structured responses
+"""),
+    "Data Science": register_prompt("assistant_data_science", 1, """
+You are a data science expert assistant.
+- Help with analysis, visualization, and statistical insights
+- Explain methods clearly and suggest next steps
+Tone: Helpful, analytical
+Format: Clear, structured responses
+"""),
+    "IT Operations": register_prompt("assistant_it_operations", 1, """
+You are an IT operations expert assistant.
+- Troubleshoot issues, optimize systems, and manage tickets
+- Provide step-by-step troubleshooting
+Tone: Professional, practical
+Format: Clear, actionable responses
+"""),
+}
+
+TICKET_TRIAGE = register_prompt("ticket_triage", 1, system="""
+You are an IT Operations assistant.
+You help triage tickets, identify patterns, and recommend practical actions.
+Be concise and actionable. Use bullet points.
+If data is missing, say what’s missing.
+
+You receive filtered tickets as CSV, one row per group of near-duplicate
+tickets (cluster_size = how many tickets the row stands for), followed by
+the user's question.
+
+Return:
+1) Summary of common issues
+2) Top priorities + why
+3) Recommended actions (step-by-step)
+4) Missing data that would help
+""", user="""
+Filtered tickets (CSV):
+{tickets_csv}
+
+User question:
+{question}
+""")
+
+RECORD_SUMMARY = register_prompt("record_summary", 1, system="""
+You summarize IT and security records for an operations dashboard.
+Reply with JSON only: {"summary": <one sentence, at most 25 words>, "category": <one of the allowed categories>}.
+""", user="""
+Allowed categories: {categories}
+
+Record:
+{record}
+""")
@@ -0,0 +1,389 @@
+import json
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.data.cdc import (
+    CHANGE_LOGS,
+    ChangeLogTruncated,
+    changes_since,
+    current_seq,
+    register_consumer,
+)
+from app.data.db import get_data_dir, table_exists
+
+
+# Columns each record is described by: free text (word unigrams + bigrams)
+# and categorical fields (one "column=value" feature each)
+SIMILARITY_SOURCES = {
+    "cyber_incidents": {"text": ["description"], "fields": ["incident_type", "severity"]},
+    "it_tickets": {"text": ["subject", "description"], "fields": ["category", "priority"]},
+}
+
+DIM = 128                # hashed feature dimensions (power of two; bytes scanned per query)
+FIELD_WEIGHT = 2.0       # weight of a categorical feature vs one text token
+BLOCK_ROWS = 262_144     # rows multiplied per step of a search
+BATCH_ROWS = 50_000      # rows read / vectorized per step of an update
+
+_WORD_RE = re.compile(r"[a-z]+|\d+")
+
+# one index update at a time per process (the files are rewritten in place)
+_update_lock = threading.Lock()
+
+
+# ============================================================
+# FEATURE VECTORS
+# ============================================================
+
+def _features(text, fields):
+    words = ["#" if w.isdigit() else w for w in _WORD_RE.findall((text or "").lower())]
+    tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return tokens, [f"{name}={str(value).lower()}" for name, value in fields if value not in (None, "")]
+
+
+def vectorize(texts, field_values, field_names, dim=DIM):
+    """
+    Hashed feature vectors (the "hashing trick"): every token is hashed to
+    one of `dim` columns with a +/-1 sign, counts are log-scaled and each
+    row is L2-normalised, so a dot product is the cosine similarity.
+
+    No vocabulary is fitted, so vectors of new rows are comparable with
+    the stored ones and the index can grow by appending.
+
+    Returns:
+        numpy.ndarray: float32 (len(texts), dim)
+    """
+    rows, tokens, weights = [], [], []
+    for i, (text, values) in enumerate(zip(texts, field_values)):
+        words, fields = _features(text, zip(field_names, values))
+        tokens += words
+        tokens += fields
+        rows += [i] * (len(words) + len(fields))
+        weights += [1.0] * len(words) + [FIELD_WEIGHT] * len(fields)
+
+    n = len(texts)
+    if not tokens:
+        return np.zeros((n, dim), dtype=np.float32)
+    hashes = pd.util.hash_array(np.array(tokens, dtype=object), categorize=True)
+    columns = (hashes & np.uint64(dim - 1)).astype(np.int64)
+    signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+    flat = np.asarray(rows, dtype=np.int64) * dim + columns
+    vectors = np.bincount(flat, weights=signs * np.asarray(weights), minlength=n * dim).reshape(n, dim)
+
+    vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors.astype(np.float32)
+
+
+def vectorize_records(table_name, records, dim=DIM):
+    """Vectors of row dicts (e.g. CDC images) of a table."""
+    source = SIMILARITY_SOURCES[table_name]
+    texts = [" ".join(str(r.get(c) or "") for c in source["text"]) for r in records]
+    values = [[r.get(c) for c in source["fields"]] for r in records]
+    return vectorize(texts, values, source["fields"], dim)
+
+
+# ============================================================
+# INDEX FILES
+# ============================================================
+# data/vectors/<table>.f32   float32 matrix, one row per record (row-major)
+# data/vectors/<table>.ids   int64 record ids, ascending, same order
+# data/vectors/<table>.json  dim, rows, cdc_seq (change log position applied)
+
+def _paths(table_name):
+    folder = get_data_dir() / "vectors"
+    return folder / f"{table_name}.f32", folder / f"{table_name}.ids", folder / f"{table_name}.json"
+
+
+def _read_meta(table_name):
+    meta_path = _paths(table_name)[2]
+    return json.loads(meta_path.read_text()) if meta_path.exists() else None
+
+
+def _write_meta(table_name, meta):
+    meta_path = _paths(table_name)[2]
+    tmp = meta_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(meta))
+    tmp.replace(meta_path)        # atomic: readers see the old or the new meta
+
+
+def _cdc_position(conn, table_name):
+    """Change-log position the stored vectors are current up to (or None)."""
+    meta = _read_meta(table_name)
+    # an empty index takes the current position on its next update
+    return meta["cdc_seq"] if meta and meta["rows"] else None
+
+
+register_consumer("vectors", _cdc_position)
+
+
+class VectorIndex:
+    """
+    Read-only view of a table's stored vectors (memory-mapped: only the
+    pages a search touches are read, and the OS shares them between
+    processes).
+
+        index = open_index("cyber_incidents")
+        index.search(index.vector(42), k=10, exclude=[42])
+    """
+
+    def __init__(self, table_name, ids, vectors, meta):
+        self.table_name = table_name
+        self.ids = ids
+        self.vectors = vectors
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vector(self, row_id):
+        """Stored vector of a record (None if it is not indexed)."""
+        pos = int(np.searchsorted(self.ids, row_id))
+        if pos == len(self.ids) or self.ids[pos] != row_id:
+            return None
+        return np.asarray(self.vectors[pos])
+
+    def search(self, queries, k=10, exclude=()):
+        """
+        Top-k cosine search for one query vector or a (q, dim) batch.
+
+        The matrix is multiplied BLOCK_ROWS rows at a time (one matrix
+        product per block for the whole batch) and only each block's
+        top k survive, so memory stays at a block of scores.
+
+        Returns:
+            list of (row_id, score), best first, per query (a single list
+            for a single query vector); rows scoring <= 0 are left out
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+        exclude = np.asarray(list(exclude), dtype=np.int64)
+        k_block = k + len(exclude)
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_pos = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self.ids), BLOCK_ROWS):
+            scores = queries @ np.asarray(self.vectors[start:start + BLOCK_ROWS]).T
+            if scores.shape[1] > k_block:
+                top = np.argpartition(-scores, k_block - 1, axis=1)[:, :k_block]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_pos = np.concatenate([best_pos, top + start], axis=1)
+
+        results = []
+        for scores, positions in zip(best_scores, best_pos):
+            order = np.argsort(-scores, kind="stable")
+            hits = []
+            for i in order:
+                row_id = int(self.ids[positions[i]])
+                if scores[i] <= 0 or len(hits) == k:
+                    break
+                if row_id not in exclude:
+                    hits.append((row_id, float(scores[i])))
+            results.append(hits)
+        return results[0] if single else results
+
+
+def open_index(table_name):
+    """
+    Memory-map a table's stored vectors.
+
+    Returns:
+        VectorIndex, or None if update_index() was never run for the table
+    """
+    meta = _read_meta(table_name)
+    if meta is None or meta["rows"] == 0:
+        return None
+    vectors_path, ids_path, _ = _paths(table_name)
+    rows, dim = meta["rows"], meta["dim"]
+    ids = np.memmap(ids_path, dtype=np.int64, mode="r", shape=(rows,))
+    vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(rows, dim))
+    return VectorIndex(table_name, ids, vectors, meta)
+
+
+# ============================================================
+# BUILDING / UPDATING
+# ============================================================
+
+def _apply_changes(conn, table_name, meta):
+    """
+    Re-vectorize updated rows and zero deleted ones in place, from the
+    change log. Inserts are left to the append step.
+
+    Returns:
+        int: rows rewritten
+    """
+    if not table_exists(conn, CHANGE_LOGS[table_name]):
+        return 0
+    if meta["rows"] == 0:
+        meta["cdc_seq"] = current_seq(conn, table_name)
+        return 0
+    seq = meta["cdc_seq"]
+    vectors_path, ids_path, _ = _paths(table_name)
+    ids = np.fromfile(ids_path, dtype=np.int64, count=meta["rows"])
+
+    latest = {}     # row id -> newest image (None = deleted)
+    for change in changes_since(conn, table_name, seq):
+        seq = change["seq"]
+        if change["op"] == "U":
+            latest[change["row_id"]] = change["new"]
+        elif change["op"] == "D":
+            latest[change["row_id"]] = None
+    meta["cdc_seq"] = seq
+
+    positions = np.searchsorted(ids, list(latest))
+    found = [(pos, row_id) for pos, row_id in zip(positions, latest)
+             if pos < len(ids) and ids[pos] == row_id]
+    if not found:
+        return 0
+    vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(meta["rows"], meta["dim"]))
+    updated = [(pos, latest[row_id]) for pos, row_id in found if latest[row_id] is not None]
+    if updated:
+        vectors[[pos for pos, _ in updated]] = vectorize_records(
+            table_name, [image for _, image in updated], meta["dim"]
+        )
+    for pos, row_id in found:
+        if latest[row_id] is None:
+            vectors[pos] = 0.0        # a zero vector never scores above 0
+    vectors.flush()
+    del vectors
+    return len(found)
+
+
+def update_index(conn, table_name, dim=None, rebuild=False, batch_size=BATCH_ROWS):
+    """
+    Bring a table's vector file up to date.
+
+    New rows (id above the last indexed id) are vectorized in batches and
+    appended to the files; rows updated or deleted since the last run are
+    rewritten in place from the change log (app/data/cdc.py). If the log
+    was pruned past the index's position, or rebuild=True, or `dim`
+    differs from the stored index's, the index is built again from
+    scratch (dim=None keeps the stored dimensions, DIM for a new index).
+
+    Returns:
+        dict: appended, rewritten, rows, seconds
+    """
+    start = time.perf_counter()
+    source = SIMILARITY_SOURCES[table_name]
+    vectors_path, ids_path, _ = _paths(table_name)
+    vectors_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with _update_lock:
+        meta = _read_meta(table_name)
+        dim = dim or (meta["dim"] if meta else DIM)
+        if dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        if rebuild or meta is None or meta["dim"] != dim:
+            meta = None
+
+        rewritten = 0
+        if meta is not None:
+            try:
+                rewritten = _apply_changes(conn, table_name, meta)
+            except ChangeLogTruncated:
+                meta = None
+        if meta is None:
+            has_log = table_exists(conn, CHANGE_LOGS[table_name])
+            meta = {"dim": dim, "rows": 0, "cdc_seq": current_seq(conn, table_name) if has_log else 0}
+            # new files rather than truncating: indexes already mapped by
+            # readers keep the old (unlinked) ones until they reopen
+            _write_meta(table_name, meta)
+            for path in (vectors_path, ids_path):
+                path.unlink(missing_ok=True)
+                path.write_bytes(b"")
+
+        last_id = 0
+        if meta["rows"]:
+            last_id = int(np.fromfile(ids_path, dtype=np.int64, offset=8 * (meta["rows"] - 1), count=1)[0])
+
+        columns = ", ".join(source["text"] + source["fields"])
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT id, {columns} FROM {table_name} WHERE id > ? ORDER BY id", (last_id,))
+        n_text = len(source["text"])
+        appended = 0
+        with open(vectors_path, "r+b") as vf, open(ids_path, "r+b") as idf:
+            # drop anything past the rows the meta vouches for (an interrupted run)
+            vf.truncate(meta["rows"] * dim * 4)
+            idf.truncate(meta["rows"] * 8)
+            vf.seek(0, 2)
+            idf.seek(0, 2)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                texts = [" ".join(str(v or "") for v in r[1:1 + n_text]) for r in rows]
+                vectors = vectorize(texts, [r[1 + n_text:] for r in rows], source["fields"], dim)
+                vf.write(vectors.tobytes())
+                idf.write(np.array([r[0] for r in rows], dtype=np.int64).tobytes())
+                appended += len(rows)
+            vf.flush()
+            idf.flush()
+        cursor.close()
+
+        meta["rows"] += appended
+        _write_meta(table_name, meta)
+
+    return {
+        "appended": appended,
+        "rewritten": rewritten,
+        "rows": meta["rows"],
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _fetch_hits(conn, table_name, hits):
+    if not hits:
+        return pd.DataFrame()
+    scores = dict(hits)
+    placeholders = ", ".join("?" for _ in hits)
+    df = pd.read_sql_query(
+        f"SELECT * FROM {table_name} WHERE id IN ({placeholders})", conn, params=list(scores)
+    )
+    df.insert(0, "similarity", df["id"].map(scores).round(3))
+    return df.sort_values("similarity", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def similar_records(conn, table_name, row_id, k=10, index=None):
+    """
+    The k stored records most similar to record `row_id` (itself excluded).
+
+    Returns:
+        pandas.DataFrame: the records with a `similarity` column (cosine),
+        most similar first (empty if the record is not indexed)
+    """
+    index = index or open_index(table_name)
+    vector = index.vector(row_id) if index is not None else None
+    if vector is None or not vector.any():
+        return pd.DataFrame()
+    return _fetch_hits(conn, table_name, index.search(vector, k, exclude=[row_id]))
+
+
+def similar_to_text(conn, table_name, text, k=10, fields=None, index=None):
+    """
+    The k stored records most similar to a free-text description
+    (optionally with categorical values, e.g. {"severity": "High"}).
+
+    Returns:
+        pandas.DataFrame (as similar_records)
+    """
+    index = index or open_index(table_name)
+    if index is None:
+        return pd.DataFrame()
+    record = dict(fields or {})
+    record[SIMILARITY_SOURCES[table_name]["text"][0]] = text
+    vector = vectorize_records(table_name, [record], index.meta["dim"])[0]
+    if not vector.any():
+        return pd.DataFrame()
+    return _fetch_hits(conn, table_name, index.search(vector, k))
@@ -0,0 +1,117 @@
+import time
+
+
+class StreamRenderer:
+    """
+    Render a streamed chat completion into a Streamlit placeholder without
+    re-rendering the whole reply on every token.
+
+    Deltas are buffered and the placeholder is only updated when
+    `flush_interval` seconds have passed or `flush_chars` new characters
+    have arrived, so a long answer costs a bounded number of markdown
+    renders instead of one per token.
+
+    Create it right before sending the request so time-to-first-token
+    includes the request round trip.
+    """
+
+    def __init__(self, placeholder, flush_interval=0.08, flush_chars=400, cursor=" ▌"):
+        self.placeholder = placeholder
+        self.flush_interval = flush_interval
+        self.flush_chars = flush_chars
+        self.cursor = cursor
+
+        self._parts = []
+        self._pending_chars = 0
+        self._started = time.perf_counter()
+        self._first_token_at = None
+        self._last_flush = self._started
+        self._finished_at = None
+
+        self.chunks = 0
+        self.chars = 0
+        self.flushes = 0
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def feed(self, delta):
+        """Add one streamed delta; flush if the time or size cadence is due."""
+        if not delta:
+            return
+        now = time.perf_counter()
+        if self._first_token_at is None:
+            self._first_token_at = now
+
+        self._parts.append(delta)
+        self.chunks += 1
+        self.chars += len(delta)
+        self._pending_chars += len(delta)
+
+        if (now - self._last_flush >= self.flush_interval
+                or self._pending_chars >= self.flush_chars):
+            self._flush(now, self.cursor)
+
+    def _flush(self, now, suffix=""):
+        # keep a single part so later joins only copy the new tail once
+        text = "".join(self._parts)
+        self._parts = [text]
+        self.placeholder.markdown(text + suffix)
+        self._pending_chars = 0
+        self._last_flush = now
+        self.flushes += 1
+
+    def close(self):
+        """Render the final text (without the cursor) and stop the clock."""
+        now = time.perf_counter()
+        self._finished_at = now
+        self._flush(now)
+        return self.text
+
+    def stats(self):
+        """
+        Timing stats for the response.
+
+        Chunks are counted as tokens: the chat completions API streams
+        roughly one token per chunk.
+
+        Returns:
+            dict: ttft_ms, total_ms, tokens, chars, tokens_per_sec, flushes
+        """
+        end = self._finished_at or time.perf_counter()
+        ttft = (self._first_token_at - self._started) if self._first_token_at else None
+        gen_time = (end - self._first_token_at) if self._first_token_at else 0.0
+        return {
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "total_ms": round((end - self._started) * 1000, 1),
+            "tokens": self.chunks,
+            "chars": self.chars,
+            "tokens_per_sec": round(self.chunks / gen_time, 1) if gen_time > 0 else None,
+            "flushes": self.flushes,
+        }
+
+
+def render_chat_stream(stream, renderer):
+    """
+    Consume an OpenAI chat.completions stream through a StreamRenderer.
+
+    The API's usage object (only sent when the request had
+    stream_options={"include_usage": True}) is returned as stats["usage"].
+
+    Returns:
+        (reply: str, stats: dict)
+    """
+    usage = None
+    for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta and getattr(delta, "content", None):
+            renderer.feed(delta.content)
+    reply = renderer.close()
+    stats = renderer.stats()
+    stats["usage"] = usage
+    return reply, stats
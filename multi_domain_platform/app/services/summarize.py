@@ -0,0 +1,225 @@
+import asyncio
+import json
+import random
+import time
+
+from app.data.writer import write
+from app.services.ai_backends import RateLimited
+from app.services.prompts import RECORD_SUMMARY, record_usage
+
+
+# Columns sent to the model for each source table
+SUMMARY_SOURCES = {
+    "cyber_incidents": ["incident_type", "severity", "status", "description"],
+    "it_tickets": ["priority", "category", "subject", "description"],
+}
+
+CATEGORIES = {
+    "cyber_incidents": ["Phishing", "Malware", "Access", "Network", "Misconfiguration", "Other"],
+    "it_tickets": ["Access", "Network", "Hardware", "Software", "Other"],
+}
+
+MAX_ATTEMPTS = 6          # per record, rate-limit retries included
+
+
+# ============================================================
+# ADAPTIVE CONCURRENCY (AIMD)
+# ============================================================
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts to rate limiting.
+
+    Additive increase: every success raises the limit by 1/limit (about +1
+    per "window" of requests), up to max_concurrency.
+    Multiplicative decrease: a 429 halves the limit (never below 1) and
+    pauses new requests for the server's retry-after, if it sent one.
+    """
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._cond = asyncio.Condition()
+        self._paused_until = 0.0
+
+    async def acquire(self):
+        async with self._cond:
+            while self.in_flight >= int(self.limit):
+                await self._cond.wait()
+            self.in_flight += 1
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    async def release(self, rate_limited=False, retry_after=None):
+        async with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self.limit = max(1.0, self.limit / 2)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+# ============================================================
+# PIPELINE
+# ============================================================
+
+def build_record_text(row, columns):
+    return "\n".join(f"{col}: {row[col]}" for col in columns if row[col] not in (None, ""))
+
+
+def parse_reply(reply, categories):
+    """
+    Parse the model's JSON reply.
+
+    Falls back to using the raw text as summary when the model did not
+    return valid JSON, and to "Other" for unknown categories.
+
+    Returns:
+        (summary, category)
+    """
+    text = (reply or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+        summary = str(data.get("summary", "")).strip()
+        category = str(data.get("category", "")).strip()
+    except (ValueError, AttributeError):
+        summary, category = text, ""
+    if category not in categories:
+        category = "Other"
+    return summary[:500], category
+
+
+def get_pending_rows(conn, table_name, after_id=0, limit=100):
+    """
+    Rows of a table that have no summary yet, in id order.
+
+    Returns:
+        list of dict (id + the SUMMARY_SOURCES columns)
+    """
+    columns = SUMMARY_SOURCES[table_name]
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT t.id, {", ".join("t." + c for c in columns)}
+        FROM {table_name} t
+        LEFT JOIN ai_summaries s ON s.source_table = ? AND s.row_id = t.id
+        WHERE s.row_id IS NULL AND t.id > ?
+        ORDER BY t.id
+        LIMIT ?
+        """,
+        (table_name, after_id, limit),
+    )
+    names = ["id"] + columns
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def count_pending(conn, table_name):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT COUNT(*) FROM {table_name} t
+        LEFT JOIN ai_summaries s ON s.source_table = ? AND s.row_id = t.id
+        WHERE s.row_id IS NULL
+        """,
+        (table_name,),
+    )
+    return cursor.fetchone()[0]
+
+
+async def _summarize_row(backend, limiter, table_name, row, model, temperature):
+    categories = CATEGORIES[table_name]
+    messages = RECORD_SUMMARY.messages(
+        categories=", ".join(categories),
+        record=build_record_text(row, SUMMARY_SOURCES[table_name]),
+    )
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        await limiter.acquire()
+        try:
+            reply, usage = await backend.complete(messages, model, temperature)
+        except RateLimited as e:
+            await limiter.release(rate_limited=True, retry_after=e.retry_after)
+            # backoff on top of the shared pause, with jitter
+            await asyncio.sleep(min(30.0, 0.5 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0))
+            continue
+        except Exception as e:
+            await limiter.release()
+            return row["id"], None, f"{type(e).__name__}: {e}"
+        await limiter.release()
+        record_usage(RECORD_SUMMARY, usage)
+        return row["id"], parse_reply(reply, categories), None
+
+    return row["id"], None, f"still rate limited after {MAX_ATTEMPTS} attempts"
+
+
+def _save_summaries(conn, rows):
+    conn.executemany(
+        "INSERT OR REPLACE INTO ai_summaries "
+        "(source_table, row_id, summary, category, backend, model) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+async def summarize_table(conn, table_name, backend, model, concurrency=8,
+                          batch_size=100, limit=None, temperature=0.2, on_batch=None):
+    """
+    Summarize every row of `table_name` that has no ai_summaries entry yet.
+
+    Rows are read in id-ordered batches; each batch is sent to the backend
+    with at most `concurrency` requests in flight (lowered automatically on
+    rate limiting) and committed as soon as it finishes. Committed rows are
+    the checkpoint: an interrupted run resumes with the next unsummarized
+    row. Rows that fail are skipped for this run and retried on the next.
+    The ai_summaries table must exist (create_ai_summaries_table).
+
+    Returns:
+        dict: done, failed, rate_limited, elapsed_s, rows_per_sec, final_limit
+    """
+    limiter = AdaptiveLimiter(concurrency)
+    done = failed = 0
+    last_id = 0
+    start = time.perf_counter()
+
+    while limit is None or done + failed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - done - failed)
+        rows = get_pending_rows(conn, table_name, last_id, size)
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        results = await asyncio.gather(*(
+            _summarize_row(backend, limiter, table_name, row, model, temperature)
+            for row in rows
+        ))
+
+        ok = [
+            (table_name, row_id, parsed[0], parsed[1], backend.name, model)
+            for row_id, parsed, _ in results if parsed is not None
+        ]
+        write(conn, "ai_summaries", _save_summaries, ok)
+
+        done += len(ok)
+        errors = [(row_id, err) for row_id, parsed, err in results if parsed is None]
+        failed += len(errors)
+        if on_batch:
+            on_batch(done, failed, limiter, errors)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "done": done,
+        "failed": failed,
+        "rate_limited": limiter.rate_limited,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": round(done / elapsed, 1) if elapsed > 0 else None,
+        "final_limit": round(limiter.limit, 2),
+    }
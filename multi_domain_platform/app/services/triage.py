@@ -0,0 +1,74 @@
+import os
+
+import openai
+from openai import OpenAI
+
+from app.services.jobs import register_handler
+from app.services.prompts import get_prompt, record_usage
+
+
+TRIAGE_JOB = "ticket_triage"
+
+# Transient API failures worth retrying with backoff
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def get_openai_key():
+    """
+    Read the OpenAI key from the environment or Streamlit secrets.
+
+    Returns:
+        str | None
+    """
+    key = os.environ.get("OPENAI_API_KEY")
+    if key:
+        return key
+    try:
+        import streamlit as st
+        return st.secrets.get("OPENAI_API_KEY", None)
+    except Exception:
+        return None
+
+
+def run_triage(payload):
+    """
+    Job handler: run one ticket-triage completion.
+
+    payload keys: model, temperature, prompt, prompt_version, variables
+    (jobs queued before the prompt registry carry system_prompt and
+    user_prompt instead)
+
+    Returns:
+        str: the model's answer (markdown)
+    """
+    api_key = get_openai_key()
+    if not api_key:
+        raise RuntimeError("Missing OPENAI_API_KEY.")
+
+    template = None
+    if "prompt" in payload:
+        template = get_prompt(payload["prompt"], payload.get("prompt_version"))
+        messages = template.messages(**payload["variables"])
+    else:
+        messages = [
+            {"role": "system", "content": payload["system_prompt"]},
+            {"role": "user", "content": payload["user_prompt"]},
+        ]
+
+    client = OpenAI(api_key=api_key, max_retries=0)  # the job queue does the retrying
+    resp = client.chat.completions.create(
+        model=payload["model"],
+        messages=messages,
+        temperature=payload.get("temperature", 0.4),
+    )
+    if template is not None:
+        record_usage(template, resp.usage)
+    return resp.choices[0].message.content
+
+
+register_handler(TRIAGE_JOB, run_triage, retry_on=RETRYABLE_ERRORS)
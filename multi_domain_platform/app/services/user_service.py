@@ -37,8 +37,7 @@ def login_user(username, password):
     if not user:
         return False, "User not found."
 
-    # user row = (id, username, password_hash, role)
-    stored_hash = user[2]
+    stored_hash = user.password_hash
 
     if bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8")):
         return True, "Login successful!"
@@ -6,23 +6,31 @@ ROOT = Path(__file__).resolve().parents[2]  # -> multi_domain_platform/
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from app.data.migrations import ensure_schema
+from app.data.users import get_user_by_username
+from app.services.user_service import login_user, register_user
+
 st.set_page_config(
     page_title="Login / Register",
     page_icon="🔑",
     layout="centered"
 )
 
-# ---------- Initialise session state ----------
-if "users" not in st.session_state:
-    # Very simple in memory "database": {username: password}
-    st.session_state.users = {}
 
+# ---------- Database schema (once per server process) ----------
+ensure_schema()
+
+# ---------- Initialise session state ----------
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 
 if "username" not in st.session_state:
     st.session_state.username = ""
 
+# role of the authenticated user (users table), checked by the admin pages
+if "role" not in st.session_state:
+    st.session_state.role = None
+
 st.title("🔐 Welcome")
 
 # ---------- If already logged in ----------
@@ -55,16 +63,19 @@ with tab_login:
     )
 
     if st.button("Log in", type="primary"):
-        users = st.session_state.users
+        # bcrypt check against the users table
+        success, _ = login_user(login_username, login_password)
 
-        if login_username in users and users[login_username] == login_password:
+        if success:
             st.session_state.logged_in = True
             st.session_state.username = login_username
+            st.session_state.role = get_user_by_username(login_username).role
             st.success(f"Welcome back, {login_username}! 🎉")
 
             # Redirect to dashboard
             st.switch_page("pages/1_Dashboard.py")
         else:
+            # same message for unknown users and wrong passwords
             st.error("Invalid username or password.")
 
 
@@ -94,10 +105,11 @@ with tab_register:
             st.warning("Please fill in all fields.")
         elif new_password != confirm_password:
             st.error("Passwords do not match.")
-        elif new_username in st.session_state.users:
-            st.error("Username already exists. Choose another one.")
         else:
-            # Save user in memory
-            st.session_state.users[new_username] = new_password
-            st.success("Account created! You can now log in.")
-            st.info("Tip: go to the Login tab and sign in.")
+            # always role "user"; admins are promoted with scripts.set_role
+            success, message = register_user(new_username, new_password)
+            if success:
+                st.success("Account created! You can now log in.")
+                st.info("Tip: go to the Login tab and sign in.")
+            else:
+                st.error(message)
@@ -1,7 +1,26 @@
-import streamlit as st
+import os
+from datetime import timedelta
+from functools import partial
+
 import pandas as pd
+import streamlit as st
+
+from app.data.db import connect_database, table_exists
+from app.data.analytics import get_dashboard_bundle, get_incident_timeline
+from app.data.live import REFRESH_INTERVALS, get_poller, section_version
+from app.data.migrations import ensure_schema
+from app.data.search import search_incidents
+from app.services.correlation import get_links, update_links
+from app.services.cube import ALL, build_cube, option_label
+from app.services.downsample import DEFAULT_POINT_BUDGET, DOWNSAMPLING_METHODS, POINT_BUDGETS, downsample, zoom
+from app.services.export import EXPORT_FORMATS, export_file_name, export_mime, export_to_tempfile
+from app.services.profiler import PageProfiler, render_debug_panel
+from app.services.similarity import open_index, similar_records, similar_to_text, update_index
+
 
-from app.data.db import connect_database
+# The schema is brought up to date once per process, whichever page a
+# session opens first
+ensure_schema()
 
 
 # -----------------------------
@@ -23,203 +42,394 @@ st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 st.title("📊 Dashboard")
 st.caption("Overview of incidents, datasets, and IT tickets from the SQLite database.")
 
+prof = PageProfiler("Dashboard", cprofile=st.session_state.pop("cprofile_Dashboard", False))
+
 
 # -----------------------------
-# Helpers (robust to schema changes)
+# Auto-refresh settings
 # -----------------------------
-def table_exists(conn, table_name: str) -> bool:
-    q = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
-    return pd.read_sql_query(q, conn, params=(table_name,)).shape[0] > 0
-
-def get_columns(conn, table_name: str) -> list[str]:
+# Wallboards can open the page as /Dashboard?refresh=10; MDP_DASHBOARD_REFRESH
+# sets the default for everyone (0 / unset = off)
+default_refresh = st.query_params.get("refresh", os.environ.get("MDP_DASHBOARD_REFRESH", "0"))
+try:
+    default_refresh = int(default_refresh)
+except ValueError:
+    default_refresh = 0
+
+with st.sidebar:
+    st.subheader("Live refresh")
+    auto_refresh = st.toggle("Auto-refresh", value=default_refresh > 0, key="dashboard_auto_refresh")
+    refresh_every = st.selectbox(
+        "Check for changes every (seconds)",
+        REFRESH_INTERVALS,
+        index=REFRESH_INTERVALS.index(default_refresh) if default_refresh in REFRESH_INTERVALS else 1,
+        disabled=not auto_refresh,
+        key="dashboard_refresh_every",
+    )
+
+    st.subheader("Charts")
+    point_budget = st.selectbox(
+        "Points per trend chart",
+        POINT_BUDGETS,
+        index=POINT_BUDGETS.index(DEFAULT_POINT_BUDGET),
+        key="chart_point_budget",
+    )
+    downsampling = st.selectbox(
+        "Downsampling",
+        DOWNSAMPLING_METHODS,
+        help="lttb keeps the shape of the line, minmax keeps every spike",
+        key="chart_downsampling",
+    )
+
+live_fragments = auto_refresh and hasattr(st, "fragment")
+
+
+def live(render):
+    """Re-run a tile group on its own every `refresh_every` seconds."""
+    if live_fragments:
+        return st.fragment(run_every=refresh_every)(render)
+    return render
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def load_section(section, version):
+    """
+    Query one dashboard section. `version` is only part of the cache key:
+    every session shares the result until one of the section's tables
+    changes.
+    """
+    conn = connect_database()
     try:
-        df = pd.read_sql_query(f"PRAGMA table_info({table_name})", conn)
-        return df["name"].tolist()
-    except Exception:
-        return []
+        return get_dashboard_bundle(conn, sections=(section,))
+    finally:
+        conn.close()
 
-def row_count(conn, table_name: str) -> int:
-    try:
-        df = pd.read_sql_query(f"SELECT COUNT(*) AS n FROM {table_name}", conn)
-        return int(df.loc[0, "n"])
-    except Exception:
-        return 0
-
-def value_counts(conn, table_name: str, col: str) -> pd.DataFrame:
-    # returns DataFrame with columns: col, count
-    q = f"""
-        SELECT {col} AS value, COUNT(*) AS count
-        FROM {table_name}
-        GROUP BY {col}
-        ORDER BY count DESC
+
+def section_data(section):
+    """
+    Cached data of a section, or None (with an error shown) if it failed.
     """
-    return pd.read_sql_query(q, conn)
+    poller = get_poller()
+    try:
+        with prof.section(f"sql: {section}"):
+            return load_section(section, section_version(poller.versions(), section))
+    except Exception as e:
+        st.error(f"Could not load dashboard data: {e}")
+        return None
 
 
 # -----------------------------
-# Load data / compute KPIs
+# KPI row
 # -----------------------------
-conn = connect_database()
+@live
+def kpi_tiles():
+    data = section_data("kpis")
+    if data is None:
+        return
+    counts = data["counts"]
+    with prof.section("render: kpis"):
+        c1, c2, c3, c4, c5 = st.columns(5)
+        c1.metric("Users", counts["users"])
+        c2.metric("Incidents", counts["incidents"])
+        c3.metric("Open Incidents", data["open_incidents"])
+        c4.metric("High/Critical", data["high_crit_incidents"])
+        c5.metric("IT Tickets", counts["tickets"])
+    if live_fragments:
+        poller = get_poller()
+        st.caption(
+            f"🔄 Live: checking every {refresh_every}s "
+            f"({poller.polls} database checks, {poller.changes} with changes, across all screens)"
+        )
 
-# Table names you already use
-tables = {
-    "users": "users",
-    "incidents": "cyber_incidents",
-    "datasets": "datasets_metadata",
-    "tickets": "it_tickets"
-}
 
-# Counts (safe even if table missing)
-users_n = row_count(conn, tables["users"]) if table_exists(conn, tables["users"]) else 0
-incidents_n = row_count(conn, tables["incidents"]) if table_exists(conn, tables["incidents"]) else 0
-datasets_n = row_count(conn, tables["datasets"]) if table_exists(conn, tables["datasets"]) else 0
-tickets_n = row_count(conn, tables["tickets"]) if table_exists(conn, tables["tickets"]) else 0
+kpi_tiles()
 
-# Incident-specific metrics (only if columns exist)
-inc_cols = get_columns(conn, tables["incidents"])
-has_status = "status" in inc_cols
-has_severity = "severity" in inc_cols
+st.divider()
 
-open_incidents = 0
-high_crit_incidents = 0
 
-if table_exists(conn, tables["incidents"]) and has_status:
+# -----------------------------
+# Charts (Incidents by severity/status)
+# -----------------------------
+@live
+def incident_charts():
+    data = section_data("incident_charts")
+    if data is None:
+        return
+    left, right = st.columns([1, 1])
+    with prof.section("charts"):
+        with left:
+            st.subheader("Incidents by Severity")
+            sev_df = data["severity_counts"]
+            if sev_df is not None:
+                sev_df = sev_df.set_index("value")
+                st.bar_chart(sev_df["count"])
+                with st.expander("View severity counts"):
+                    st.dataframe(sev_df.reset_index(), use_container_width=True)
+            else:
+                st.info("Severity data not available (missing table or column).")
+
+        with right:
+            st.subheader("Incidents by Status")
+            status_df = data["status_counts"]
+            if status_df is not None:
+                status_df = status_df.set_index("value")
+                st.bar_chart(status_df["count"])
+                with st.expander("View status counts"):
+                    st.dataframe(status_df.reset_index(), use_container_width=True)
+            else:
+                st.info("Status data not available (missing table or column).")
+
+
+incident_charts()
+
+
+# -----------------------------
+# Incident trend (hourly counts, downsampled to the point budget)
+# -----------------------------
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_incident_timeline(version):
+    """Full-resolution hourly counts, one copy per incidents version for every session."""
+    conn = connect_database("incidents")
     try:
-        df_open = pd.read_sql_query(
-            f"SELECT COUNT(*) AS n FROM {tables['incidents']} WHERE status = ?",
-            conn,
-            params=("Open",)
-        )
-        open_incidents = int(df_open.loc[0, "n"])
-    except Exception:
-        open_incidents = 0
+        return get_incident_timeline(conn)
+    finally:
+        conn.close()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def incident_timeline_points(version, start, end, budget, method):
+    """The points drawn for one zoom range (start .. end, whole days)."""
+    visible = zoom(load_incident_timeline(version), pd.Timestamp(start), pd.Timestamp(end + timedelta(days=1)))
+    return downsample(visible, budget, method), len(visible)
+
 
-if table_exists(conn, tables["incidents"]) and has_severity:
+@live
+def incident_trend():
+    st.subheader("Incidents over Time")
+    version = get_poller().versions()["incidents"]
     try:
-        df_hc = pd.read_sql_query(
-            f"""
-            SELECT COUNT(*) AS n
-            FROM {tables['incidents']}
-            WHERE severity IN ('High', 'Critical')
-            """,
-            conn
+        with prof.section("sql: incident timeline"):
+            timeline = load_incident_timeline(version)
+    except Exception as e:
+        st.error(f"Could not load the incident timeline: {e}")
+        return
+    if timeline is None or timeline.empty:
+        st.info("No incident timestamps to chart.")
+        return
+
+    start, end = timeline.index[0].date(), timeline.index[-1].date()
+    if start < end:
+        start, end = st.slider(
+            "Time range", min_value=start, max_value=end, value=(start, end), key="incident_trend_range"
         )
-        high_crit_incidents = int(df_hc.loc[0, "n"])
-    except Exception:
-        high_crit_incidents = 0
+    with prof.section("downsample: incident timeline"):
+        points, hours = incident_timeline_points(version, start, end, point_budget, downsampling)
+    with prof.section("render: incident timeline"):
+        st.line_chart(points)
+    st.caption(f"{len(points):,} of {hours:,} hourly points drawn ({downsampling})")
 
 
-# -----------------------------
-# KPI row
-# -----------------------------
-c1, c2, c3, c4, c5 = st.columns(5)
-c1.metric("Users", users_n)
-c2.metric("Incidents", incidents_n)
-c3.metric("Open Incidents", open_incidents)
-c4.metric("High/Critical", high_crit_incidents)
-c5.metric("IT Tickets", tickets_n)
+incident_trend()
 
 st.divider()
 
-left, right = st.columns([1, 1])
-
 # -----------------------------
-# Charts (Incidents by severity/status)
+# Incident search (FTS5)
 # -----------------------------
-with left:
-    st.subheader("Incidents by Severity")
-    if table_exists(conn, tables["incidents"]) and has_severity:
-        try:
-            sev_df = value_counts(conn, tables["incidents"], "severity")
-            sev_df = sev_df.set_index("value")
-            st.bar_chart(sev_df["count"])
-            with st.expander("View severity counts"):
-                st.dataframe(sev_df.reset_index(), use_container_width=True)
-        except Exception as e:
-            st.warning(f"Could not load severity chart: {e}")
-    else:
-        st.info("Severity data not available (missing table or column).")
+st.subheader("Search Incidents")
 
-with right:
-    st.subheader("Incidents by Status")
-    if table_exists(conn, tables["incidents"]) and has_status:
-        try:
-            status_df = value_counts(conn, tables["incidents"], "status")
-            status_df = status_df.set_index("value")
-            st.bar_chart(status_df["count"])
-            with st.expander("View status counts"):
-                st.dataframe(status_df.reset_index(), use_container_width=True)
-        except Exception as e:
-            st.warning(f"Could not load status chart: {e}")
-    else:
-        st.info("Status data not available (missing table or column).")
+incident_query = st.text_input(
+    "Search incident descriptions",
+    placeholder="e.g. phishing, ransomware, misconfig...",
+    key="incident_search"
+)
+
+if incident_query.strip():
+    conn = connect_database()
+    try:
+        if table_exists(conn, "cyber_incidents"):
+            with prof.section("sql: search"):
+                hits = search_incidents(conn, incident_query, limit=50)
+            st.caption(f"{len(hits)} best matches (ranked by relevance)")
+            if not hits.empty:
+                with prof.section("render: search results"):
+                    st.dataframe(hits.drop(columns=["score"]), use_container_width=True, hide_index=True)
+        else:
+            st.info("No incidents table found.")
+    except Exception as e:
+        st.warning(f"Search failed: {e}")
+    finally:
+        conn.close()
 
 st.divider()
 
 # -----------------------------
 # Recent incidents table
 # -----------------------------
-st.subheader("Recent Incidents")
+@live
+def recent_incidents():
+    st.subheader("Recent Incidents")
+    data = section_data("recent_incidents")
+    if data is None:
+        return
+    with prof.section("render: recent incidents"):
+        if data["recent_incidents"] is not None:
+            st.dataframe(data["recent_incidents"], use_container_width=True, hide_index=True)
+        else:
+            st.info("No incidents table found.")
+
 
-if table_exists(conn, tables["incidents"]):
-    # Prefer created_at, fallback to id desc
-    order_col = "created_at" if "created_at" in inc_cols else "id"
+recent_incidents()
+
+
+# -----------------------------
+# Incident export
+# -----------------------------
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_incident_cube(version):
+    conn = connect_database("incidents")
     try:
-        recent = pd.read_sql_query(
-            f"""
-            SELECT *
-            FROM {tables['incidents']}
-            ORDER BY {order_col} DESC
-            LIMIT 10
-            """,
-            conn
-        )
-        st.dataframe(recent, use_container_width=True, hide_index=True)
+        return build_cube(conn, "cyber_incidents")
+    finally:
+        conn.close()
+
+
+with st.expander("⬇️ Export incidents"):
+    try:
+        with prof.section("cube: incident options"):
+            incident_cube = load_incident_cube(get_poller().versions()["incidents"])
     except Exception as e:
-        st.warning(f"Could not load recent incidents: {e}")
-else:
-    st.info("No incidents table found.")
+        st.info(f"Export unavailable: {e}")
+    else:
+        e1, e2, e3, e4 = st.columns(4)
+        export_filters = {
+            "severity": e1.selectbox("Severity", [ALL] + incident_cube.options("severity"),
+                                     format_func=option_label, key="incident_export_severity"),
+            "status": e2.selectbox("Status", [ALL] + incident_cube.options("status"),
+                                   format_func=option_label, key="incident_export_status"),
+        }
+        export_format = e3.selectbox("Format", list(EXPORT_FORMATS), key="incident_export_format")
+        export_gzip = e4.checkbox("gzip", key="incident_export_gzip")
+
+        st.caption(f"{incident_cube.count(**export_filters):,} incidents match.")
+        # streamed from the filtered query to a temp file only on click
+        st.download_button(
+            "Download",
+            data=partial(export_to_tempfile, "incidents", export_format, export_filters, export_gzip),
+            file_name=export_file_name("cyber_incidents", export_format, export_gzip),
+            mime=export_mime(export_format, export_gzip),
+            on_click="ignore",
+        )
 
-st.divider()
 
 # -----------------------------
-# Datasets + Tickets quick preview
+# Similar incidents
 # -----------------------------
-colA, colB = st.columns(2)
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_incident_index(version):
+    """
+    Vectors of every incident (memory-mapped). A new incidents version
+    only appends new rows / rewrites changed ones before mapping again.
+    """
+    conn = connect_database("incidents")
+    try:
+        update_index(conn, "cyber_incidents")
+    finally:
+        conn.close()
+    return open_index("cyber_incidents")
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def refresh_links(incidents_version, tickets_version):
+    """Sweep incidents / tickets added since the last run (once per data change)."""
+    conn = connect_database()
+    try:
+        return update_links(conn)
+    finally:
+        conn.close()
+
 
-with colA:
-    st.subheader("Datasets (preview)")
-    if table_exists(conn, tables["datasets"]):
-        ds_cols = get_columns(conn, tables["datasets"])
-        order_col = "upload_date" if "upload_date" in ds_cols else ("created_at" if "created_at" in ds_cols else "id")
+st.subheader("Similar Incidents")
+s1, s2, s3 = st.columns([1, 2, 1])
+similar_id = s1.number_input("Incident ID", min_value=1, step=1, value=None, key="similar_incident_id")
+similar_text = s2.text_input("…or describe an incident", key="similar_incident_text",
+                             placeholder="e.g. phishing email asking for credentials")
+similar_k = s3.slider("Results", 5, 25, 10, step=5, key="similar_incident_k")
+
+if similar_id is not None or similar_text.strip():
+    try:
+        with prof.section("vectors: load index"):
+            incident_index = load_incident_index(get_poller().versions()["incidents"])
+        conn = connect_database("incidents")
         try:
-            ds = pd.read_sql_query(
-                f"SELECT * FROM {tables['datasets']} ORDER BY {order_col} DESC LIMIT 5",
-                conn
-            )
-            st.dataframe(ds, use_container_width=True, hide_index=True)
-        except Exception as e:
-            st.warning(f"Could not load datasets preview: {e}")
+            with prof.section("vectors: top-k"):
+                if similar_id is not None:
+                    similar = similar_records(conn, "cyber_incidents", int(similar_id), similar_k,
+                                              index=incident_index)
+                else:
+                    similar = similar_to_text(conn, "cyber_incidents", similar_text, similar_k,
+                                              index=incident_index)
+        finally:
+            conn.close()
+    except Exception as e:
+        st.error(f"Similarity search failed: {e}")
     else:
-        st.info("No datasets_metadata table found.")
-
-with colB:
-    st.subheader("IT Tickets (preview)")
-    if table_exists(conn, tables["tickets"]):
-        t_cols = get_columns(conn, tables["tickets"])
-        order_col = "created_at" if "created_at" in t_cols else ("created_date" if "created_date" in t_cols else "id")
+        if similar.empty:
+            st.info("No similar incidents found (unknown incident ID or nothing in common).")
+        else:
+            st.dataframe(similar, use_container_width=True, hide_index=True)
+
+if similar_id is not None:
+    st.markdown(f"**IT tickets linked to incident #{int(similar_id)}** "
+                "(opened around the same time, sharing keywords or a category)")
+    try:
+        versions = get_poller().versions()
+        with prof.section("correlation: update links"):
+            refresh_links(versions["incidents"], versions["tickets"])
+        conn = connect_database()
         try:
-            t = pd.read_sql_query(
-                f"SELECT * FROM {tables['tickets']} ORDER BY {order_col} DESC LIMIT 5",
-                conn
-            )
-            st.dataframe(t, use_container_width=True, hide_index=True)
-        except Exception as e:
-            st.warning(f"Could not load tickets preview: {e}")
+            with prof.section("sql: linked tickets"):
+                linked = get_links(conn, incident_id=int(similar_id))
+        finally:
+            conn.close()
+    except Exception as e:
+        st.error(f"Could not load linked tickets: {e}")
     else:
-        st.info("No it_tickets table found.")
+        if linked.empty:
+            st.info("No linked tickets.")
+        else:
+            st.dataframe(linked, use_container_width=True, hide_index=True)
+
+st.divider()
 
-conn.close()
+
+# -----------------------------
+# Datasets + Tickets quick preview
+# -----------------------------
+@live
+def previews():
+    data = section_data("previews")
+    if data is None:
+        return
+    with prof.section("render: previews"):
+        colA, colB = st.columns(2)
+
+        with colA:
+            st.subheader("Datasets (preview)")
+            if data["datasets_preview"] is not None:
+                st.dataframe(data["datasets_preview"], use_container_width=True, hide_index=True)
+            else:
+                st.info("No datasets_metadata table found.")
+
+        with colB:
+            st.subheader("IT Tickets (preview)")
+            if data["tickets_preview"] is not None:
+                st.dataframe(data["tickets_preview"], use_container_width=True, hide_index=True)
+            else:
+                st.info("No it_tickets table found.")
+
+
+previews()
 
 # -----------------------------
 # Logout button
@@ -228,5 +438,9 @@ st.divider()
 if st.button("Log out"):
     st.session_state.logged_in = False
     st.session_state.username = ""
+    st.session_state.role = None
     st.success("Logged out.")
-    st.switch_page("Home.py")
\ No newline at end of file
+    prof.finish()   # the run ends here, before the debug panel
+    st.switch_page("Home.py")
+
+render_debug_panel(prof)
\ No newline at end of file
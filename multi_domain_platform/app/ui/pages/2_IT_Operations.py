@@ -1,4 +1,6 @@
 import sys
+from datetime import timedelta
+from functools import partial
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[3]  # -> multi_domain_platform/
@@ -8,8 +10,28 @@ if str(ROOT) not in sys.path:
 import streamlit as st
 import pandas as pd
 
+from app.data.analytics import get_ticket_resolution_series
 from app.data.db import connect_database
-from openai import OpenAI
+from app.data.live import get_poller
+from app.data.migrations import ensure_schema
+from app.data.search import search_tickets
+from app.services.cube import ALL, UNKNOWN, build_cube, option_label
+from app.services.downsample import DEFAULT_POINT_BUDGET, DOWNSAMPLING_METHODS, POINT_BUDGETS, downsample, zoom
+from app.services.export import EXPORT_FORMATS, export_file_name, export_mime, export_to_tempfile, filter_clause
+from app.services.clustering import update_clusters, get_cluster_ids, collapse_to_representatives
+from app.services.profiler import PageProfiler, render_debug_panel
+from app.services.jobs import ACTIVE_STATUSES, QuotaExceeded, get_job_queue, get_latest_job
+from app.services.prompts import TICKET_TRIAGE
+from app.services.triage import TRIAGE_JOB, get_openai_key
+
+
+# Most search hits listed: the best matches among the filtered tickets
+SEARCH_LIMIT = 500
+
+
+# The schema is brought up to date once per process, whichever page a
+# session opens first
+ensure_schema()
 
 
 st.set_page_config(page_title="IT Operations", page_icon="🧰", layout="wide")
@@ -30,6 +52,8 @@ if not st.session_state.logged_in:
         st.switch_page("Home.py")
     st.stop()
 
+prof = PageProfiler("IT Operations", cprofile=st.session_state.pop("cprofile_IT Operations", False))
+
 
 # ----------------------------
 # Helpers
@@ -43,32 +67,63 @@ def pick_column(df: pd.DataFrame, candidates: list[str]) -> str | None:
             return cols_lower[key]
     return None
 
-def safe_value_counts(df: pd.DataFrame, col: str) -> pd.DataFrame:
-    """Return dataframe: col, count"""
-    vc = df[col].fillna("Unknown").astype(str).value_counts()
-    out = vc.reset_index()
-    out.columns = [col, "count"]  # ensure predictable column names
-    return out
+def cube_labels(series: pd.Series) -> pd.Series:
+    """Values as the cube labels them (NULL / empty -> "Unknown")."""
+    return series.fillna(UNKNOWN).astype(str).replace("", UNKNOWN)
 
-def safe_metric_count(df: pd.DataFrame, col: str | None, value: str) -> int:
-    if not col or col not in df.columns:
-        return 0
-    return int((df[col].fillna("").astype(str) == value).sum())
+# Both loaders are keyed by the tickets table's version (see app/data/live.py):
+# every session shares one copy until the table changes.
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_tickets(version) -> pd.DataFrame:
+    conn = connect_database("tickets")
+    try:
+        return pd.read_sql_query("SELECT * FROM it_tickets", conn)
+    finally:
+        conn.close()
 
-def get_openai_key() -> str | None:
-    
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_ticket_cube(dims: tuple, version):
+    conn = connect_database("tickets")
     try:
-        return st.secrets.get("OPENAI_API_KEY", None)
-    except Exception:
-        return None
+        return build_cube(conn, "it_tickets", dims)
+    finally:
+        conn.close()
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_resolution_series(version):
+    conn = connect_database("tickets")
+    try:
+        return get_ticket_resolution_series(conn)
+    finally:
+        conn.close()
+
+# The points drawn for one zoom range (start .. end, whole days): small, so
+# cached per version, range, point budget and method
+@st.cache_data(show_spinner=False, max_entries=64)
+def resolution_points(version, start, end, budget, method):
+    visible = zoom(load_resolution_series(version), pd.Timestamp(start), pd.Timestamp(end + timedelta(days=1)))
+    return downsample(visible, budget, method), len(visible)
+
+def render_triage_job(job: dict) -> None:
+    """Show the status / result of a background triage job."""
+    if job["status"] in ACTIVE_STATUSES:
+        st.info(f"AI job #{job['id']} is {job['status']} (attempt {max(job['attempts'], 1)})…")
+        if job["error"]:
+            st.caption(f"Retrying after: {job['error']}")
+    elif job["status"] == "done":
+        st.caption(f"AI job #{job['id']} finished at {job['updated_at']}")
+        st.markdown(job["result"])
+    else:
+        st.error(f"AI job #{job['id']} failed: {job['error']}")
 
 
 # ----------------------------
 # Load tickets from DB
 # ----------------------------
-conn = connect_database()
-tickets = pd.read_sql_query("SELECT * FROM it_tickets", conn)
-conn.close()
+tickets_version = get_poller().versions()["tickets"]
+
+with prof.section("sql: load tickets"):
+    tickets = load_tickets(tickets_version)
 
 tickets.columns = [c.strip() for c in tickets.columns]  # clean whitespace
 
@@ -83,35 +138,58 @@ created_col  = pick_column(tickets, ["created_at", "created_date", "date_created
 resolved_col = pick_column(tickets, ["resolved_date", "closed_date", "date_resolved"])
 assigned_col = pick_column(tickets, ["assigned_to", "assignee", "owner"])
 
+# status x priority x category counts for every filter combination
+cube_dims = tuple(c for c in (status_col, priority_col, category_col) if c)
+with prof.section("cube: load"):
+    cube = load_ticket_cube(cube_dims, tickets_version) if cube_dims else None
+
 
 # ----------------------------
 # Sidebar filters
 # ----------------------------
-with st.sidebar:
+with prof.section("cube: filter options"), st.sidebar:
     st.header("Filters")
 
-    status_filter = "All"
-    priority_filter = "All"
-    category_filter = "All"
+    status_filter = ALL
+    priority_filter = ALL
+    category_filter = ALL
 
     if status_col:
-        status_options = ["All"] + sorted(tickets[status_col].dropna().astype(str).unique().tolist())
-        status_filter = st.selectbox("Status", status_options, index=0)
+        status_options = [ALL] + cube.options(status_col)
+        status_filter = st.selectbox("Status", status_options, index=0,
+                                     format_func=option_label)
     else:
         st.warning("No status-like column found.")
 
     if priority_col:
-        priority_options = ["All"] + sorted(tickets[priority_col].dropna().astype(str).unique().tolist())
-        priority_filter = st.selectbox("Priority", priority_options, index=0)
+        priority_options = [ALL] + cube.options(priority_col)
+        priority_filter = st.selectbox("Priority", priority_options, index=0,
+                                       format_func=option_label)
     else:
         st.warning("No priority-like column found.")
 
     if category_col:
-        category_options = ["All"] + sorted(tickets[category_col].dropna().astype(str).unique().tolist())
-        category_filter = st.selectbox("Category", category_options, index=0)
+        category_options = [ALL] + cube.options(category_col)
+        category_filter = st.selectbox("Category", category_options, index=0,
+                                       format_func=option_label)
     else:
         st.info("No category-like column found (optional).")
 
+    st.divider()
+    st.subheader("Charts")
+    point_budget = st.selectbox(
+        "Points per trend chart",
+        POINT_BUDGETS,
+        index=POINT_BUDGETS.index(DEFAULT_POINT_BUDGET),
+        key="chart_point_budget",
+    )
+    downsampling = st.selectbox(
+        "Downsampling",
+        DOWNSAMPLING_METHODS,
+        help="lttb keeps the shape of the line, minmax keeps every spike",
+        key="chart_downsampling",
+    )
+
     st.divider()
     st.write("Logged in as:", st.session_state.username)
 
@@ -129,33 +207,45 @@ with st.sidebar:
         })
 
 
-# Apply filters
-filtered = tickets.copy()
+filters = {
+    col: value
+    for col, value in ((status_col, status_filter), (priority_col, priority_filter),
+                       (category_col, category_filter))
+    if col
+}
 
-if status_col and status_filter != "All":
-    filtered = filtered[filtered[status_col].astype(str) == status_filter]
-if priority_col and priority_filter != "All":
-    filtered = filtered[filtered[priority_col].astype(str) == priority_filter]
-if category_col and category_filter != "All":
-    filtered = filtered[filtered[category_col].astype(str) == category_filter]
+# Apply filters (only the ticket table needs the rows themselves)
+with prof.section("pandas: apply filters"):
+    filtered = tickets
+
+    for col, value in filters.items():
+        if value is not ALL:
+            filtered = filtered[cube_labels(filtered[col]) == value]
 
 
 # ----------------------------
 # KPI row
 # ----------------------------
-c1, c2, c3, c4 = st.columns(4)
+with prof.section("render: kpis"):
+    c1, c2, c3, c4 = st.columns(4)
+
+    c1.metric("Total Tickets (filtered)", cube.count(**filters) if cube else len(filtered))
 
-c1.metric("Total Tickets (filtered)", len(filtered))
+    # common statuses (cube lookups; a status filter other than the one
+    # asked for gives 0, as with the row filter)
+    def status_count(value):
+        if not status_col or filters[status_col] not in (ALL, value):
+            return 0
+        return cube.count(**{**filters, status_col: value})
 
-# common statuses 
-open_n = safe_metric_count(filtered, status_col, "Open")
-inprog_n = safe_metric_count(filtered, status_col, "In Progress")
-resolved_n = safe_metric_count(filtered, status_col, "Resolved")
-closed_n = safe_metric_count(filtered, status_col, "Closed")
+    open_n = status_count("Open")
+    inprog_n = status_count("In Progress")
+    resolved_n = status_count("Resolved")
+    closed_n = status_count("Closed")
 
-c2.metric("Open", open_n)
-c3.metric("In Progress", inprog_n)
-c4.metric("Resolved/Closed", resolved_n + closed_n)
+    c2.metric("Open", open_n)
+    c3.metric("In Progress", inprog_n)
+    c4.metric("Resolved/Closed", resolved_n + closed_n)
 
 st.divider()
 
@@ -163,32 +253,61 @@ st.divider()
 # ----------------------------
 # Charts
 # ----------------------------
-left, right = st.columns(2)
+with prof.section("cube: chart series"):
+    # a chart keeps its own dimension's filter, like value_counts of the filtered rows
+    def chart_series(col):
+        if not col:
+            return None
+        series = cube.series(col, **filters)
+        return series[series.index == filters[col]] if filters[col] is not ALL else series
+
+    status_series = chart_series(status_col)
+    priority_series = chart_series(priority_col)
+    category_series = chart_series(category_col)
+
+with prof.section("render: charts"):
+    left, right = st.columns(2)
+
+    with left:
+        st.subheader("Tickets by Status")
+        if status_series is not None:
+            st.bar_chart(status_series)
+        else:
+            st.info("Status chart unavailable (no status column detected).")
+
+    with right:
+        st.subheader("Tickets by Priority")
+        if priority_series is not None:
+            st.bar_chart(priority_series)
+        else:
+            st.info("Priority chart unavailable (no priority column detected).")
 
-with left:
-    st.subheader("Tickets by Status")
-    if status_col:
-        by_status_df = safe_value_counts(filtered, status_col)
-        series = by_status_df.set_index(status_col)["count"]
-        st.bar_chart(series)
-    else:
-        st.info("Status chart unavailable (no status column detected).")
+    st.divider()
 
-with right:
-    st.subheader("Tickets by Priority")
-    if priority_col:
-        by_priority_df = safe_value_counts(filtered, priority_col)
-        series = by_priority_df.set_index(priority_col)["count"]
-        st.bar_chart(series)
-    else:
-        st.info("Priority chart unavailable (no priority column detected).")
+    if category_series is not None:
+        st.subheader("Tickets by Category")
+        st.bar_chart(category_series)
+        st.divider()
 
-st.divider()
 
-if category_col:
-    st.subheader("Tickets by Category")
-    by_cat_df = safe_value_counts(filtered, category_col)
-    st.bar_chart(by_cat_df.set_index(category_col)["count"])
+# ----------------------------
+# Resolution time trend (all tickets, downsampled to the point budget)
+# ----------------------------
+with prof.section("sql: resolution series"):
+    resolution = load_resolution_series(tickets_version)
+
+if resolution is not None and not resolution.empty:
+    st.subheader("Resolution Time Trend (all tickets)")
+    start, end = resolution.index[0].date(), resolution.index[-1].date()
+    if start < end:
+        start, end = st.slider(
+            "Created between", min_value=start, max_value=end, value=(start, end), key="resolution_trend_range"
+        )
+    with prof.section("downsample: resolution series"):
+        points, total = resolution_points(tickets_version, start, end, point_budget, downsampling)
+    with prof.section("render: resolution trend"):
+        st.line_chart(points, y_label="hours")
+    st.caption(f"{len(points):,} of {total:,} tickets drawn ({downsampling})")
     st.divider()
 
 
@@ -196,7 +315,56 @@ if category_col:
 # Table
 # ----------------------------
 st.subheader("Ticket List (Filtered)")
-st.dataframe(filtered, use_container_width=True, hide_index=True)
+
+ticket_query = st.text_input(
+    "Search ticket subjects and descriptions",
+    placeholder="e.g. vpn, password reset, printer...",
+    key="ticket_search"
+)
+
+if ticket_query.strip():
+    # FTS5 ranks the matches among the tickets the sidebar filters select
+    hits = None
+    with prof.section("sql: search"):
+        conn = connect_database()
+        try:
+            where, params = filter_clause(filters)
+            hits = search_tickets(conn, ticket_query, limit=SEARCH_LIMIT, where=where, params=params)
+        except Exception as e:
+            st.warning(f"Search failed: {e}")
+        finally:
+            conn.close()
+
+    if hits is not None:
+        if hits.empty:
+            filtered = filtered.iloc[0:0]
+        else:
+            rank = {row_id: i for i, row_id in enumerate(hits["id"])}
+            filtered = filtered[filtered["id"].isin(rank)]
+            filtered = filtered.assign(snippet=filtered["id"].map(hits.set_index("id")["snippet"]))
+            filtered = filtered.sort_values("id", key=lambda ids: ids.map(rank))
+        st.caption(f"{len(filtered)} best matching tickets (ranked by relevance, at most {SEARCH_LIMIT})")
+
+with prof.section("render: ticket table"):
+    st.dataframe(filtered, use_container_width=True, hide_index=True)
+
+# Export of the sidebar selection: the query runs with the filters pushed
+# down and is streamed to a temp file only when the button is clicked.
+exp1, exp2, exp3 = st.columns([1, 1, 2])
+with exp1:
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS), key="ticket_export_format")
+with exp2:
+    export_gzip = st.checkbox("gzip", key="ticket_export_gzip")
+with exp3:
+    st.download_button(
+        "⬇️ Download filtered tickets",
+        data=partial(export_to_tempfile, "tickets", export_format, filters, export_gzip),
+        file_name=export_file_name("it_tickets", export_format, export_gzip),
+        mime=export_mime(export_format, export_gzip),
+        on_click="ignore",
+    )
+if ticket_query.strip():
+    st.caption("The export contains every ticket matching the sidebar filters (the search is not applied).")
 
 
 # ----------------------------
@@ -205,7 +373,12 @@ st.dataframe(filtered, use_container_width=True, hide_index=True)
 st.divider()
 st.subheader("🤖 AI-assisted Ticket Triage")
 
-st.write("The AI receives a sample of the filtered tickets and returns a summary + recommended actions.")
+job_queue = get_job_queue()  # starts the worker pool / resumes unfinished jobs
+
+st.write(
+    "Near-duplicate tickets are grouped first; the AI receives one representative per group "
+    "(with the group size) and returns a summary + recommended actions."
+)
 
 default_question = (
     "Summarise the main issues in these tickets and recommend the top 5 actions. "
@@ -216,7 +389,7 @@ question = st.text_area("Question", value=default_question, height=90)
 
 colA, colB = st.columns([1, 1])
 with colA:
-    max_rows = st.slider("Tickets sent to AI (context)", 5, 50, 25, step=5)
+    max_rows = st.slider("Ticket groups sent to AI (context)", 5, 50, 25, step=5)
 with colB:
     model_name = st.selectbox("Model", ["gpt-4o-mini", "gpt-4o"], index=0)
 
@@ -224,14 +397,23 @@ if st.button("Analyze with AI", type="primary"):
     api_key = get_openai_key()
     if not api_key:
         st.error("Missing OPENAI_API_KEY. Add it to `.streamlit/secrets.toml` and restart Streamlit.")
+        prof.finish()   # the run ends here, before the debug panel
         st.stop()
 
-    sample = filtered.head(max_rows).copy()
+    # one row per near-duplicate cluster (new tickets are clustered incrementally)
+    with prof.section("ai: clustering"):
+        conn = connect_database()
+        update_clusters(conn, "it_tickets")
+        clusters = get_cluster_ids(conn, "it_tickets")
+        conn.close()
+
+        sample = collapse_to_representatives(filtered, clusters).head(max_rows).copy()
 
     # build a compact context table with useful columns 
     keep_cols = [c for c in [
         ticketid_col, priority_col, status_col, category_col,
-        subject_col, desc_col, created_col, resolved_col, assigned_col
+        subject_col, desc_col, created_col, resolved_col, assigned_col,
+        "cluster_size"
     ] if c and c in sample.columns]
 
     if keep_cols:
@@ -239,40 +421,39 @@ if st.button("Analyze with AI", type="primary"):
 
     context_csv = sample.to_csv(index=False)
 
-    system_prompt = (
-        "You are an IT Operations assistant.\n"
-        "You help triage tickets, identify patterns, and recommend practical actions.\n"
-        "Be concise and actionable. Use bullet points.\n"
-        "If data is missing, say what’s missing.\n"
-    )
-
-    user_prompt = f"""
-Filtered tickets (CSV):
-{context_csv}
-
-User question:
-{question}
-
-Return:
-1) Summary of common issues
-2) Top priorities + why
-3) Recommended actions (step-by-step)
-4) Missing data that would help
-"""
-
-    client = OpenAI(api_key=api_key)
-
-    with st.spinner("Thinking..."):
-        resp = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.4,
-        )
-
-    st.markdown(resp.choices[0].message.content)
+    # The completion runs on the background worker pool; this script run
+    # returns immediately and the status panel below polls for the result.
+    with prof.section("ai: enqueue"):
+        try:
+            job_queue.enqueue(st.session_state.username, TRIAGE_JOB, {
+                "model": model_name,
+                "temperature": 0.4,
+                "prompt": TICKET_TRIAGE.name,
+                "prompt_version": TICKET_TRIAGE.version,
+                "variables": {"tickets_csv": context_csv, "question": question},
+            })
+        except QuotaExceeded as e:
+            st.warning(str(e))
+
+# Latest job for this user (also resumes after a page reload / new session)
+triage_job = get_latest_job(st.session_state.username, TRIAGE_JOB)
+triage_pending = triage_job is not None and triage_job["status"] in ACTIVE_STATUSES
+
+if triage_pending and hasattr(st, "fragment"):
+    @st.fragment(run_every=2)
+    def triage_status():
+        job = get_latest_job(st.session_state.username, TRIAGE_JOB)
+        if job["status"] in ACTIVE_STATUSES:
+            render_triage_job(job)
+        else:
+            st.rerun()  # full rerun shows the result and stops polling
+
+    triage_status()
+elif triage_job is not None:
+    render_triage_job(triage_job)
+    if triage_pending and st.button("Refresh AI status"):
+        prof.finish()
+        st.rerun()
 
 
 # ----------------------------
@@ -282,4 +463,8 @@ st.divider()
 if st.button("Log out"):
     st.session_state.logged_in = False
     st.session_state.username = ""
-    st.switch_page("Home.py")
\ No newline at end of file
+    st.session_state.role = None
+    prof.finish()
+    st.switch_page("Home.py")
+
+render_debug_panel(prof)
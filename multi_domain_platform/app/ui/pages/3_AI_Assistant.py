@@ -1,6 +1,9 @@
 import streamlit as st
 from openai import OpenAI
 
+from app.services.prompts import ASSISTANT_PROMPTS, record_usage
+from app.services.streaming import StreamRenderer, render_chat_stream
+
 # ----------------------------
 # API key handling
 # ----------------------------
@@ -19,32 +22,6 @@ st.set_page_config(
 st.title("💬 ChatGPT Assistant")
 st.caption("Powered by OpenAI API")
 
-# ----------------------------
-# Domain system prompts (integration-ready)
-# ----------------------------
-SYSTEM_PROMPTS = {
-    "Cybersecurity": """You are a cybersecurity expert assistant.
-- Analyze incidents and threats
-- Provide technical guidance
-- Explain attack vectors and mitigations
-- Use standard terminology (MITRE ATT&CK, CVE when relevant)
-- Prioritize actionable recommendations
-Tone: Professional, technical
-Format: Clear, structured responses""",
-
-    "Data Science": """You are a data science expert assistant.
-- Help with analysis, visualization, and statistical insights
-- Explain methods clearly and suggest next steps
-Tone: Helpful, analytical
-Format: Clear, structured responses""",
-
-    "IT Operations": """You are an IT operations expert assistant.
-- Troubleshoot issues, optimize systems, and manage tickets
-- Provide step-by-step troubleshooting
-Tone: Professional, practical
-Format: Clear, actionable responses"""
-}
-
 # ----------------------------
 # Sidebar controls
 # ----------------------------
@@ -54,7 +31,7 @@ with st.sidebar:
     # Domain selection (this maps to your coursework domains)
     domain = st.selectbox(
         "Domain",
-        list(SYSTEM_PROMPTS.keys()),
+        list(ASSISTANT_PROMPTS.keys()),
         index=0
     )
 
@@ -87,7 +64,7 @@ with st.sidebar:
 # ----------------------------
 if "messages" not in st.session_state:
     st.session_state.messages = [
-        {"role": "system", "content": SYSTEM_PROMPTS[domain]}
+        {"role": "system", "content": ASSISTANT_PROMPTS[domain].system}
     ]
 
 if "last_domain" not in st.session_state:
@@ -96,7 +73,7 @@ if "last_domain" not in st.session_state:
 if domain != st.session_state.last_domain:
     st.session_state.last_domain = domain
     st.session_state.messages = [
-        {"role": "system", "content": SYSTEM_PROMPTS[domain]}
+        {"role": "system", "content": ASSISTANT_PROMPTS[domain].system}
     ]
     st.rerun()
 
@@ -120,24 +97,36 @@ if prompt:
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    # Stream assistant response
+    # Stream assistant response (buffered: the placeholder is redrawn on a
+    # time/size cadence instead of once per token)
     with st.chat_message("assistant"):
         placeholder = st.empty()
-        full_reply = ""
+        renderer = StreamRenderer(placeholder)
 
         with st.spinner("Thinking..."):
             stream = client.chat.completions.create(
                 model=model,
                 messages=st.session_state.messages,
                 temperature=temperature,
-                stream=True
+                stream=True,
+                stream_options={"include_usage": True},
             )
 
-            for chunk in stream:
-                delta = chunk.choices[0].delta
-                if delta and getattr(delta, "content", None):
-                    full_reply += delta.content
-                    placeholder.markdown(full_reply)
+        full_reply, stream_stats = render_chat_stream(stream, renderer)
+
+        usage = stream_stats["usage"]
+        if usage is not None:
+            record_usage(ASSISTANT_PROMPTS[domain], usage)
+
+        if stream_stats["ttft_ms"] is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) or 0
+            st.caption(
+                f"First token after {stream_stats['ttft_ms']:.0f} ms · "
+                f"{stream_stats['tokens']} tokens · "
+                f"{stream_stats['tokens_per_sec'] or 0:.0f} tokens/s"
+                + (f" · {cached}/{usage.prompt_tokens} prompt tokens cached" if usage else "")
+            )
 
         # Save assistant response
         st.session_state.messages.append({"role": "assistant", "content": full_reply})
\ No newline at end of file
@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]  # -> multi_domain_platform/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import streamlit as st
+import pandas as pd
+
+from app.data.instrumentation import (
+    SLOW_QUERY_MS,
+    get_query_stats,
+    get_slow_queries,
+    reset_query_stats,
+)
+from app.services.prompts import get_prompt_stats, reset_prompt_stats
+
+
+st.set_page_config(page_title="Query Stats", page_icon="⏱️", layout="wide")
+st.title("⏱️ Query Stats")
+st.caption(
+    "Per-statement timings recorded by the instrumented SQLite connection "
+    "since this Streamlit server started (all sessions)."
+)
+
+# ----------------------------
+# Auth guard
+# ----------------------------
+if "logged_in" not in st.session_state:
+    st.session_state.logged_in = False
+if "username" not in st.session_state:
+    st.session_state.username = ""
+
+if not st.session_state.logged_in:
+    st.error("You must be logged in to view this page.")
+    if st.button("Go to login page"):
+        st.switch_page("Home.py")
+    st.stop()
+
+# ----------------------------
+# Admin guard: the stats show every session's SQL and prompts. The role
+# is the one Home.py read from the users table at login.
+# ----------------------------
+if st.session_state.get("role") != "admin":
+    st.error("Query stats are only available to administrators.")
+    st.stop()
+
+
+# ----------------------------
+# Aggregate stats
+# ----------------------------
+stats = get_query_stats()
+slow = get_slow_queries()
+
+total_calls = sum(s["calls"] for s in stats)
+total_ms = sum(s["total_ms"] for s in stats)
+total_errors = sum(s["errors"] for s in stats)
+
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Distinct statements", len(stats))
+c2.metric("Calls", total_calls)
+c3.metric("Total SQL time (s)", f"{total_ms / 1000:.2f}")
+c4.metric("Errors", total_errors)
+
+st.divider()
+
+st.subheader("Hot queries")
+if stats:
+    df = pd.DataFrame(stats)
+    df["callers"] = df["callers"].apply(lambda d: ", ".join(f"{k} ({v})" for k, v in d.items()))
+    df = df[[
+        "sql", "calls", "total_ms", "avg_ms", "max_ms", "rows",
+        "vm_steps", "statements", "errors", "last_error", "callers",
+    ]]
+    st.dataframe(
+        df.round({"total_ms": 1, "avg_ms": 2, "max_ms": 2}),
+        use_container_width=True,
+        hide_index=True,
+    )
+else:
+    st.info("No queries recorded yet (or MDP_QUERY_STATS=0).")
+
+st.divider()
+
+st.subheader(f"Slow queries (> {SLOW_QUERY_MS:g} ms)")
+if slow:
+    for entry in slow:
+        label = f"{entry['duration_ms']:.1f} ms · {entry['rows']} rows · {entry['caller']}"
+        with st.expander(label):
+            st.caption(f"Logged at {entry['logged_at']}")
+            st.code(entry["sql"].strip(), language="sql")
+            if entry["plan"]:
+                st.text("EXPLAIN QUERY PLAN\n" + "\n".join(entry["plan"]))
+else:
+    st.info("No slow queries logged.")
+
+st.divider()
+
+st.subheader("AI prompt tokens")
+st.caption(
+    "Prompt / cached tokens reported by the API per prompt template. "
+    "OpenAI only caches prompts whose stable prefix is 1024+ tokens."
+)
+st.dataframe(pd.DataFrame(get_prompt_stats()), use_container_width=True, hide_index=True)
+
+st.divider()
+if st.button("Reset stats"):
+    reset_query_stats()
+    reset_prompt_stats()
+    st.rerun()
@@ -0,0 +1,141 @@
+"""
+Foreground latency while online snapshots run.
+
+A writer thread (insert_incident, one commit each) and a reader thread
+(incidents-by-type query) run for --seconds in three phases:
+
+    baseline    no backup
+    throttled   back-to-back snapshots with the default page batches + sleeps
+    one_step    back-to-back snapshots copying the whole file in one step
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_backup --scale 5 --seconds 5
+    python -m benchmarks.bench_backup --journal-mode wal
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.data.backup import PAGES_PER_STEP, STEP_SLEEP, backup_file
+from app.data.db import CATALOG_FILE, connect_database
+from app.data.migrations import migrate
+from app.data.incidents import load_csv_to_table, insert_incident
+from app.data.analytics import get_incidents_by_type_count
+from benchmarks.report import latency_summary, save_results
+from benchmarks.synthetic import generate_dataset
+
+
+PHASES = {
+    "baseline": None,
+    "throttled": (PAGES_PER_STEP, STEP_SLEEP),
+    "one_step": (-1, 0),
+}
+
+
+def run_phase(db_path, work_dir, seconds, backup_settings):
+    stop = threading.Event()
+    write_samples, read_samples = [], []
+    backups = []
+
+    def writer():
+        conn = connect_database()
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            insert_incident(conn, "2024-11-05", "Benchmark", "Low", "Open", f"Foreground write {i}")
+            write_samples.append(time.perf_counter() - start)
+            i += 1
+        conn.close()
+
+    def reader():
+        conn = connect_database()
+        while not stop.is_set():
+            start = time.perf_counter()
+            get_incidents_by_type_count(conn)
+            read_samples.append(time.perf_counter() - start)
+        conn.close()
+
+    def backup_loop():
+        pages, step_sleep = backup_settings
+        while not stop.is_set():
+            backups.append(backup_file(db_path, work_dir / "snapshot.db", pages, step_sleep))
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    if backup_settings is not None:
+        threads.append(threading.Thread(target=backup_loop))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    result = {
+        "write": {"ops": len(write_samples), "latency": latency_summary(write_samples)},
+        "read": {"ops": len(read_samples), "latency": latency_summary(read_samples)},
+    }
+    if backups:
+        result["backups"] = {
+            "completed": len(backups),
+            "avg_seconds": round(sum(b["seconds"] for b in backups) / len(backups), 3),
+            "restarts": sum(b["restarts"] for b in backups),
+            "single_step_fallbacks": sum(b["single_step"] for b in backups),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Foreground latency during online backups.")
+    parser.add_argument("--scale", type=int, default=5, choices=range(3, 8),
+                        help="10^scale incidents and tickets (default 5)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each phase")
+    parser.add_argument("--journal-mode", choices=["delete", "wal"], default="delete")
+    parser.add_argument("--output", help="result JSON path")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_backup_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+    os.environ["MDP_DB_LAYOUT"] = "single"
+
+    n = 10 ** args.scale
+    paths = generate_dataset(work_dir / "csv", n, n, 10)
+    conn = connect_database()
+    conn.execute(f"PRAGMA journal_mode = {args.journal_mode}")
+    migrate(conn)
+    for table_name in ("cyber_incidents", "it_tickets"):
+        load_csv_to_table(conn, paths[table_name], table_name)
+    conn.close()
+    db_path = work_dir / CATALOG_FILE
+    print(f"Database: {db_path.stat().st_size / 1024 / 1024:.1f} MB")
+
+    results = {
+        "scale": args.scale,
+        "journal_mode": args.journal_mode,
+        "db_bytes": db_path.stat().st_size,
+        "phases": {},
+    }
+    for phase, settings in PHASES.items():
+        results["phases"][phase] = run_phase(db_path, work_dir, args.seconds, settings)
+
+    shutil.rmtree(work_dir)
+    path = save_results("backup", results, args.output)
+
+    for phase, r in results["phases"].items():
+        w, rd = r["write"]["latency"], r["read"]["latency"]
+        line = (f"  {phase:<10} write p50 {w['p50_ms']:>7.2f} p99 {w['p99_ms']:>8.2f} ms   "
+                f"read p50 {rd['p50_ms']:>7.2f} p99 {rd['p99_ms']:>8.2f} ms")
+        if "backups" in r:
+            b = r["backups"]
+            line += (f"   {b['completed']} backups, {b['avg_seconds']:.2f}s avg, "
+                     f"{b['restarts']} restarts, {b['single_step_fallbacks']} fallbacks")
+        print(line)
+    print(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
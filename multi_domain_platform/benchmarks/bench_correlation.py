@@ -0,0 +1,102 @@
+"""
+Incident-to-ticket correlation: the sort-merge sweep vs a nested-loop
+SQL join, plus the cost of an incremental run.
+
+    sweep         update_links(rebuild=True) over every row
+    incremental   update_links() after --new-rows incidents and tickets arrive
+    sql_join      the same time-window join in SQL, keyword match on one
+                  LIKE (SQLite has no index to use, so it compares every
+                  incident with every ticket); only up to --sql-max rows
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_correlation --scale 5
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.data.db import connect_database
+from app.data.incidents import load_csv_to_table
+from app.data.migrations import migrate
+from app.services.correlation import CORRELATION_SETTINGS, update_links
+from benchmarks.report import compare_results, save_results
+from benchmarks.synthetic import generate_dataset
+
+
+def sql_join_seconds(conn, limit):
+    before = CORRELATION_SETTINGS["before_hours"] / 24.0
+    after = CORRELATION_SETTINGS["after_hours"] / 24.0
+    start = time.perf_counter()
+    conn.execute(f"""
+        SELECT COUNT(*)
+        FROM (SELECT * FROM cyber_incidents ORDER BY id LIMIT {limit}) AS i
+        JOIN (SELECT * FROM it_tickets ORDER BY id LIMIT {limit}) AS t
+          ON julianday(COALESCE(t.created_date, t.created_at))
+             BETWEEN julianday(COALESCE(i.date, i.created_at)) - {before}
+                 AND julianday(COALESCE(i.date, i.created_at)) + {after}
+         AND t.description LIKE '%' || substr(i.description, -9) || '%'
+    """).fetchone()
+    return round(time.perf_counter() - start, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Correlation sweep vs nested-loop SQL join.")
+    parser.add_argument("--scale", type=int, default=5, choices=range(3, 8),
+                        help="10^scale incidents and tickets (default 5)")
+    parser.add_argument("--new-rows", type=int, default=1000, help="rows added before the incremental run")
+    parser.add_argument("--sql-max", type=int, default=10_000, help="rows per table for the SQL join")
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_correlation_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+
+    n = 10 ** args.scale
+    paths = generate_dataset(work_dir / "csv", n + args.new_rows, n + args.new_rows, 10)
+    conn = connect_database()
+    migrate(conn)
+
+    # hold back the last --new-rows of each file for the incremental run
+    later = {}
+    for table_name in ("cyber_incidents", "it_tickets"):
+        df = pd.read_csv(paths[table_name])
+        df.iloc[:n].to_csv(work_dir / f"{table_name}_first.csv", index=False)
+        df.iloc[n:].to_csv(work_dir / f"{table_name}_later.csv", index=False)
+        load_csv_to_table(conn, work_dir / f"{table_name}_first.csv", table_name)
+        later[table_name] = work_dir / f"{table_name}_later.csv"
+
+    sweep = update_links(conn, rebuild=True)
+    for table_name, path in later.items():
+        load_csv_to_table(conn, path, table_name)
+    incremental = update_links(conn)
+
+    sql_rows = min(n, args.sql_max)
+    results = {
+        "scale": args.scale,
+        "settings": CORRELATION_SETTINGS,
+        "sweep": sweep,
+        "incremental": incremental,
+        "sql_join": {"rows": sql_rows, "seconds": sql_join_seconds(conn, sql_rows)},
+    }
+    conn.close()
+    shutil.rmtree(work_dir)
+    path = save_results("correlation", results, args.output)
+
+    print(f"  sweep        {n:,} x {n:,} rows -> {sweep['links']:,} links in {sweep['seconds']:.2f}s")
+    print(f"  incremental  +{incremental['incidents']:,} incidents / +{incremental['tickets']:,} tickets "
+          f"-> {incremental['links']:,} links in {incremental['seconds']:.2f}s")
+    print(f"  sql_join     {sql_rows:,} x {sql_rows:,} rows in {results['sql_join']['seconds']:.2f}s")
+    print(f"✅ Results written to {path}")
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark the data-access layer against a throwaway synthetic database.
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_data_layer --scale 4
+    python -m benchmarks.bench_data_layer --scale 6 --compare benchmarks/results/data_layer-abc123.json
+
+--scale N generates 10^N incidents and 10^N tickets (N = 3..7).
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.data.db import connect_database
+from app.data.migrations import migrate
+from app.data.users import migrate_users_from_file
+from app.data.incidents import (
+    load_csv_to_table,
+    insert_incident,
+    get_all_incidents,
+    get_incident,
+    iter_incidents,
+)
+from app.data.analytics import (
+    get_incidents_by_type_count,
+    get_high_severity_by_status,
+    get_dashboard_bundle,
+)
+from benchmarks.synthetic import generate_dataset
+from benchmarks.report import latency_summary, time_calls, save_results, compare_results
+
+
+def bench_ingest(conn, paths):
+    """Time load_csv_to_table / migrate_users_from_file on the generated files."""
+    results = {}
+    for table_name in ("cyber_incidents", "it_tickets"):
+        start = time.perf_counter()
+        rows = load_csv_to_table(conn, paths[table_name], table_name)
+        elapsed = time.perf_counter() - start
+        results[table_name] = {
+            "rows": rows,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+        }
+
+    start = time.perf_counter()
+    migrate_users_from_file(paths["users"])
+    elapsed = time.perf_counter() - start
+    results["users"] = {"seconds": round(elapsed, 3)}
+    return results
+
+
+def bench_insert_incident(conn, ops):
+    """insert_incident commits once per call, so this is commits/sec."""
+    samples = []
+    for i in range(ops):
+        start = time.perf_counter()
+        insert_incident(conn, "2024-11-05", "Benchmark", "Low", "Open", f"Benchmark incident {i}")
+        samples.append(time.perf_counter() - start)
+
+    total = sum(samples)
+    return {
+        "ops": ops,
+        "ops_per_sec": round(ops / total, 1) if total else None,
+        "latency": latency_summary(samples),
+    }
+
+
+def bench_queries(conn, repeats):
+    """Latency percentiles of the analytics queries and the dashboard bundle."""
+    queries = {
+        "incidents_by_type": lambda: get_incidents_by_type_count(conn),
+        "high_severity_by_status": lambda: get_high_severity_by_status(conn),
+        "dashboard_bundle": lambda: get_dashboard_bundle(conn),
+    }
+    results = {name: latency_summary(time_calls(fn, repeats)) for name, fn in queries.items()}
+
+    # full-table read is O(rows); a couple of repeats is enough
+    results["get_all_incidents"] = latency_summary(time_calls(lambda: get_all_incidents(conn), 3))
+    results["iter_incidents"] = latency_summary(
+        time_calls(lambda: sum(1 for _ in iter_incidents(conn)), 3)
+    )
+    results["get_incident"] = latency_summary(time_calls(lambda: get_incident(conn, 1), repeats))
+    return results
+
+
+def _peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(conn):
+    """Peak Python memory of a full-table read: DataFrame vs streamed records."""
+    return {
+        "get_all_incidents_peak_mb": _peak_mb(lambda: get_all_incidents(conn)),
+        "iter_incidents_peak_mb": _peak_mb(lambda: sum(1 for _ in iter_incidents(conn))),
+        "list_incidents_peak_mb": _peak_mb(lambda: list(iter_incidents(conn))),
+    }
+
+
+def run(scale, seed, ops, repeats, keep):
+    n = 10 ** scale
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_bench_"))
+    print(f"Working directory: {work_dir}")
+
+    # every connect_database() call below now opens the throwaway database
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+
+    start = time.perf_counter()
+    paths = generate_dataset(work_dir / "csv", n, n, max(10, n // 100), seed)
+    gen_seconds = time.perf_counter() - start
+    print(f"Generated {n:,} incidents + {n:,} tickets in {gen_seconds:.1f}s")
+
+    conn = connect_database()
+    migrate(conn)
+
+    results = {
+        "scale": scale,
+        "rows_per_table": n,
+        "seed": seed,
+        "generate_seconds": round(gen_seconds, 3),
+        "ingest": bench_ingest(conn, paths),
+        "insert_incident": bench_insert_incident(conn, ops),
+        "queries": bench_queries(conn, repeats),
+        "memory": bench_memory(conn),
+    }
+    conn.close()
+
+    if not keep:
+        shutil.rmtree(work_dir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data-access layer benchmark.")
+    parser.add_argument("--scale", type=int, default=4, choices=range(3, 8),
+                        help="10^scale incidents and tickets (default 4)")
+    parser.add_argument("--seed", type=int, default=1510)
+    parser.add_argument("--ops", type=int, default=1000, help="insert_incident calls")
+    parser.add_argument("--repeats", type=int, default=30, help="runs per analytics query")
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    parser.add_argument("--keep", action="store_true", help="keep the generated database")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.seed, args.ops, args.repeats, args.keep)
+    path = save_results("data_layer", results, args.output)
+
+    for table_name, r in results["ingest"].items():
+        if "rows_per_sec" in r:
+            print(f"  ingest {table_name:<16} {r['rows_per_sec']:>12,.0f} rows/s")
+    print(f"  insert_incident         {results['insert_incident']['ops_per_sec']:>12,.0f} ops/s")
+    for name, r in results["queries"].items():
+        print(f"  {name:<24} p50 {r['p50_ms']:>9.2f} ms   p95 {r['p95_ms']:>9.2f} ms")
+    for name, mb in results["memory"].items():
+        print(f"  {name:<24} {mb:>12,.2f} MB")
+    print(f"✅ Results written to {path}")
+
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Trend chart payloads with and without downsampling (app/services/downsample.py),
+on the ticket resolution-time series of a seeded synthetic database (one point
+per ticket, as on the IT Operations page).
+
+For the raw series and for every method x --budgets point budget, over the
+whole history and over a one-month zoom:
+
+    downsample   time to pick the points (the page caches the result per
+                 data version, zoom range, budget and method)
+    points       points sent to the chart
+    arrow_kb     the points as Arrow IPC, the format Streamlit ships
+                 DataFrames to the browser in
+    render       st.line_chart on the points (chart spec + serialization,
+                 Streamlit in bare mode, no browser)
+    extremes     whether the highest and lowest value survived
+
+The browser's share (downloading the payload, laying out every point) is
+not measured; it grows with the points like arrow_kb does.
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_downsample --scale 6
+"""
+
+import argparse
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from streamlit import logger as streamlit_logger
+
+from app.data.analytics import get_ticket_resolution_series
+from app.data.db import connect_database
+from app.data.incidents import load_csv_to_table
+from app.data.migrations import migrate
+from app.services.downsample import DOWNSAMPLING_METHODS, downsample, zoom
+from benchmarks.report import compare_results, latency_summary, save_results, time_calls
+from benchmarks.synthetic import generate_dataset
+
+
+def arrow_kb(series):
+    table = pa.Table.from_pandas(series.to_frame().reset_index(), preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return round(sink.tell() / 1024, 1)
+
+
+def measure(raw, method, budget, repeats):
+    if method == "raw":
+        points, samples = raw, []
+    else:
+        points = downsample(raw, budget, method)
+        samples = time_calls(lambda: downsample(raw, budget, method), repeats)
+    render = time_calls(lambda: st.line_chart(points), 3)
+    return {
+        "method": method,
+        "budget": budget,
+        "points": len(points),
+        "arrow_kb": arrow_kb(points),
+        "downsample": latency_summary(samples),
+        "render": latency_summary(render),
+        "extremes_kept": bool(points.max() == raw.max() and points.min() == raw.min()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trend chart payload and render time with LTTB / min-max downsampling.")
+    parser.add_argument("--scale", type=int, default=6, choices=range(3, 8),
+                        help="10^scale tickets (default 6)")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[500, 1000, 5000], help="point budgets")
+    parser.add_argument("--repeats", type=int, default=10, help="timed downsampling calls per case")
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    args = parser.parse_args()
+
+    streamlit_logger.set_log_level("error")   # bare-mode warnings
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_downsample_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+
+    n = 10 ** args.scale
+    paths = generate_dataset(work_dir / "csv", 10, n, 10)
+    conn = connect_database()
+    migrate(conn)
+    load_csv_to_table(conn, paths["it_tickets"], "it_tickets")
+    load = time_calls(lambda: get_ticket_resolution_series(conn), 1)
+    series = get_ticket_resolution_series(conn)
+    conn.close()
+    shutil.rmtree(work_dir)
+
+    month_start = series.index[0].normalize()
+    ranges = {
+        "all": series,
+        "month": zoom(series, month_start, month_start + pd.DateOffset(months=1)),
+    }
+    cases = [("raw", None)] + [(m, b) for m in DOWNSAMPLING_METHODS for b in args.budgets]
+    results = {
+        "tickets": n,
+        "load_series_seconds": round(load[0], 2),
+        "ranges": {
+            name: {"points": len(raw), "cases": [measure(raw, m, b, args.repeats) for m, b in cases]}
+            for name, raw in ranges.items()
+        },
+    }
+    path = save_results("downsample", results, args.output)
+
+    print(f"  resolution series of {n:,} tickets loaded in {results['load_series_seconds']}s")
+    for name, r in results["ranges"].items():
+        print(f"  {name} ({r['points']:,} points)")
+        for c in r["cases"]:
+            label = c["method"] if c["budget"] is None else f"{c['method']} {c['budget']}"
+            ds = c["downsample"].get("p50_ms", 0.0)
+            print(f"      {label:<12} {c['points']:>9,} points  {c['arrow_kb']:>9,.1f} KB   "
+                  f"downsample {ds:>7.1f} ms   render {c['render']['p50_ms']:>8.1f} ms   "
+                  f"extremes {'kept' if c['extremes_kept'] else 'lost'}")
+    print(f"✅ Results written to {path}")
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Export throughput and memory: the streaming exporter vs a DataFrame
+(read_sql_query + to_csv, the naive way to feed a download button).
+
+Every mode exports all tickets of a seeded synthetic database to a sink
+that only counts bytes, once timed and once under tracemalloc for the
+peak Python memory.
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_export --scale 6
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from app.data.db import connect_database
+from app.data.incidents import load_csv_to_table
+from app.data.migrations import migrate
+from app.services.export import FETCH_ROWS, export_to_file
+from benchmarks.report import compare_results, save_results
+from benchmarks.synthetic import generate_dataset
+
+
+class CountingSink:
+    """Binary file stand-in that only counts what is written."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+
+
+def dataframe_export(conn, sink):
+    df = pd.read_sql_query("SELECT * FROM it_tickets ORDER BY id DESC", conn)
+    sink.write(df.to_csv(index=False).encode("utf-8"))
+    return len(df)
+
+
+def stream_export(fmt, compress, batch_size):
+    def run(conn, sink):
+        return export_to_file(conn, "it_tickets", sink, fmt, None, compress, batch_size)["rows"]
+    return run
+
+
+def measure(conn, export):
+    sink = CountingSink()
+    start = time.perf_counter()
+    rows = export(conn, sink)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        export(conn, CountingSink())
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds),
+        "output_mb": round(sink.bytes / 1024 / 1024, 2),
+        "mb_per_sec": round(sink.bytes / 1024 / 1024 / seconds, 2),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming export vs DataFrame export.")
+    parser.add_argument("--scale", type=int, default=5, choices=range(3, 8),
+                        help="10^scale tickets (default 5)")
+    parser.add_argument("--batch-size", type=int, default=FETCH_ROWS, help="rows fetched per step")
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_export_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+
+    n = 10 ** args.scale
+    paths = generate_dataset(work_dir / "csv", 10, n, 10)
+    conn = connect_database()
+    migrate(conn)
+    load_csv_to_table(conn, paths["it_tickets"], "it_tickets")
+
+    modes = {
+        "dataframe_csv": dataframe_export,
+        "stream_csv": stream_export("csv", False, args.batch_size),
+        "stream_ndjson": stream_export("ndjson", False, args.batch_size),
+        "stream_csv_gzip": stream_export("csv", True, args.batch_size),
+        "stream_ndjson_gzip": stream_export("ndjson", True, args.batch_size),
+    }
+    results = {
+        "scale": args.scale,
+        "batch_size": args.batch_size,
+        "modes": {name: measure(conn, export) for name, export in modes.items()},
+    }
+    conn.close()
+    shutil.rmtree(work_dir)
+    path = save_results("export", results, args.output)
+
+    for name, r in results["modes"].items():
+        print(f"  {name:<20} {r['rows']:>10,} rows  {r['seconds']:>7.2f}s  {r['rows_per_sec']:>10,} rows/s  "
+              f"{r['output_mb']:>8.1f} MB out  {r['mb_per_sec']:>7.1f} MB/s  peak {r['peak_mb']:>8.2f} MB")
+    print(f"✅ Results written to {path}")
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Database load of many open dashboards: full reruns vs the live refresh.
+
+--screens threads each "refresh" the dashboard every --interval seconds
+while a writer adds an incident every --write-every seconds:
+
+    full_rerun  every refresh runs get_dashboard_bundle (the old page)
+    live        every refresh asks the shared ChangePoller for versions and
+                only reloads sections whose version is not cached yet
+                (the same scheme as the page's st.cache_data)
+
+SQL time is taken from the instrumented connections.
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_live_dashboard --scale 5 --screens 30 --seconds 10
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.data.analytics import DASHBOARD_SECTIONS, get_dashboard_bundle
+from app.data.db import connect_database
+from app.data.incidents import insert_incident, load_csv_to_table
+from app.data.instrumentation import get_query_stats, reset_query_stats
+from app.data.live import ChangePoller, section_version
+from app.data.migrations import migrate
+from benchmarks.report import latency_summary, save_results
+from benchmarks.synthetic import generate_dataset
+
+
+def run_mode(mode, screens, interval, seconds, write_every):
+    stop = threading.Event()
+    poller = ChangePoller(min_interval=min(1.0, interval))
+    cache, cache_lock = {}, threading.Lock()
+    refresh_samples = []
+
+    def refresh(conn):
+        if mode == "full_rerun":
+            get_dashboard_bundle(conn)
+            return
+        versions = poller.versions()
+        for section in DASHBOARD_SECTIONS:
+            key = (section, section_version(versions, section))
+            with cache_lock:
+                hit = key in cache
+            if not hit:
+                data = get_dashboard_bundle(conn, sections=(section,))
+                with cache_lock:
+                    cache[key] = data
+
+    def screen(offset):
+        conn = connect_database()
+        time.sleep(offset)
+        while not stop.is_set():
+            start = time.perf_counter()
+            refresh(conn)
+            refresh_samples.append(time.perf_counter() - start)
+            stop.wait(interval)
+        conn.close()
+
+    def writer():
+        conn = connect_database()
+        i = 0
+        while not stop.wait(write_every):
+            insert_incident(conn, "2024-11-05", "Benchmark", "High", "Open", f"Wallboard write {i}")
+            i += 1
+        conn.close()
+
+    reset_query_stats()
+    threads = [threading.Thread(target=screen, args=(interval * i / screens,)) for i in range(screens)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    poller.close()
+
+    stats = get_query_stats()
+    return {
+        "refreshes": len(refresh_samples),
+        "sql_statements": sum(s["calls"] for s in stats),
+        "sql_ms_per_sec": round(sum(s["total_ms"] for s in stats) / seconds, 2),
+        "database_polls": poller.polls,
+        "refresh_latency": latency_summary(refresh_samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard database load: full reruns vs live refresh.")
+    parser.add_argument("--scale", type=int, default=5, choices=range(3, 8),
+                        help="10^scale incidents and tickets (default 5)")
+    parser.add_argument("--screens", type=int, default=30, help="open dashboards")
+    parser.add_argument("--interval", type=float, default=5.0, help="refresh interval per screen")
+    parser.add_argument("--write-every", type=float, default=2.0, help="seconds between incident writes")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration per mode")
+    parser.add_argument("--output", help="result JSON path")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_live_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+
+    n = 10 ** args.scale
+    paths = generate_dataset(work_dir / "csv", n, n, 10)
+    conn = connect_database()
+    migrate(conn)
+    for table_name in ("cyber_incidents", "it_tickets"):
+        load_csv_to_table(conn, paths[table_name], table_name)
+    conn.close()
+
+    results = {
+        "scale": args.scale,
+        "screens": args.screens,
+        "interval": args.interval,
+        "write_every": args.write_every,
+        "modes": {
+            mode: run_mode(mode, args.screens, args.interval, args.seconds, args.write_every)
+            for mode in ("full_rerun", "live")
+        },
+    }
+    shutil.rmtree(work_dir)
+    path = save_results("live_dashboard", results, args.output)
+
+    for mode, r in results["modes"].items():
+        lat = r["refresh_latency"]
+        print(f"  {mode:<10} {r['refreshes']:>5} refreshes   {r['sql_statements']:>7,} SQL statements   "
+              f"{r['sql_ms_per_sec']:>8.1f} ms SQL/s   refresh p50 {lat['p50_ms']:.2f} ms "
+              f"p95 {lat['p95_ms']:.2f} ms")
+    print(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
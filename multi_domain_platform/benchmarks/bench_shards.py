@@ -0,0 +1,138 @@
+"""
+Concurrent writers per domain: single database file vs one shard per domain.
+
+One thread per domain inserts rows (one commit each) for a fixed time,
+while another thread runs login lookups. In the single-file layout every
+commit takes the same write lock; with shards they only contend within a
+domain.
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_shards --seconds 5
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.data.db import connect_database
+from app.data.migrations import migrate
+from app.data.users import get_user_by_username, insert_user
+from benchmarks.report import latency_summary, save_results
+from benchmarks.synthetic import PASSWORD_HASH
+
+
+def _ticket_writer(i):
+    return (
+        "INSERT INTO it_tickets (ticket_id, priority, status, category, subject, description) "
+        "VALUES (?, 'Low', 'Open', 'Network', 'VPN drops', 'Benchmark ticket')",
+        (f"BENCH-{threading.get_ident()}-{i}",),
+    )
+
+
+def _incident_writer(i):
+    return (
+        "INSERT INTO cyber_incidents (date, incident_type, severity, status, description) "
+        "VALUES ('2024-11-05', 'Phishing', 'Low', 'Open', ?)",
+        (f"Benchmark incident {i}",),
+    )
+
+
+def _dataset_writer(i):
+    return (
+        "INSERT INTO datasets_metadata (dataset_name, category, record_count) VALUES (?, 'Bench', ?)",
+        (f"bench_{i}", i),
+    )
+
+
+WRITERS = {
+    "tickets": _ticket_writer,
+    "incidents": _incident_writer,
+    "datasets": _dataset_writer,
+}
+
+
+def run_layout(layout, seconds):
+    work_dir = Path(tempfile.mkdtemp(prefix=f"mdp_shards_{layout}_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+    os.environ["MDP_DB_LAYOUT"] = layout
+
+    conn = connect_database()
+    migrate(conn)
+    conn.close()
+    insert_user("bench_user", PASSWORD_HASH)
+
+    stop = threading.Event()
+    results = {}
+
+    def write(domain):
+        conn = connect_database(domain)
+        make_statement = WRITERS[domain]
+        done = busy = 0
+        samples = []
+        while not stop.is_set():
+            sql, params = make_statement(done)
+            start = time.perf_counter()
+            try:
+                conn.execute(sql, params)
+                conn.commit()
+            except sqlite3.OperationalError:   # "database is locked" after the timeout
+                conn.rollback()
+                busy += 1
+                continue
+            samples.append(time.perf_counter() - start)
+            done += 1
+        conn.close()
+        results[domain] = {
+            "commits": done,
+            "commits_per_sec": round(done / seconds, 1),
+            "busy_errors": busy,
+            "latency": latency_summary(samples),
+        }
+
+    def login_lookups():
+        samples = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            get_user_by_username("bench_user")
+            samples.append(time.perf_counter() - start)
+        results["login_lookup"] = {"lookups": len(samples), "latency": latency_summary(samples)}
+
+    threads = [threading.Thread(target=write, args=(d,)) for d in WRITERS]
+    threads.append(threading.Thread(target=login_lookups))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    shutil.rmtree(work_dir)
+    results["total_commits_per_sec"] = round(
+        sum(results[d]["commits"] for d in WRITERS) / seconds, 1
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-file vs per-domain shard write benchmark.")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration per layout")
+    parser.add_argument("--output", help="result JSON path")
+    args = parser.parse_args()
+
+    results = {layout: run_layout(layout, args.seconds) for layout in ("single", "sharded")}
+    path = save_results("shards", results, args.output)
+
+    for layout, r in results.items():
+        print(f"  {layout:<8} total {r['total_commits_per_sec']:>8,.0f} commits/s   "
+              + "   ".join(f"{d} {r[d]['commits_per_sec']:,.0f}/s" for d in WRITERS)
+              + f"   login p95 {r['login_lookup']['latency']['p95_ms']:.2f} ms")
+    print(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
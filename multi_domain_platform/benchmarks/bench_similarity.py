@@ -0,0 +1,104 @@
+"""
+"Similar incidents" index: build time, top-k query latency and
+incremental appends on a seeded synthetic database.
+
+    build     vectorize every incident and write the memory-mapped matrix
+    query     top-k for one stored incident (matrix-vector products)
+    batch     top-k for --batch incidents at once (one matrix product per block)
+    append    index --append freshly inserted incidents
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_similarity --scale 6
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from app.data.db import connect_database
+from app.data.incidents import load_csv_to_table
+from app.data.migrations import migrate
+from app.services.similarity import DIM, open_index, update_index
+from benchmarks.report import compare_results, latency_summary, save_results, time_calls
+from benchmarks.synthetic import generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector index build / query / append timings.")
+    parser.add_argument("--scale", type=int, default=5, choices=range(3, 8),
+                        help="10^scale incidents (default 5)")
+    parser.add_argument("--dim", type=int, default=DIM, help="feature dimensions")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50, help="single queries timed")
+    parser.add_argument("--batch", type=int, default=32, help="queries per batched search")
+    parser.add_argument("--append", type=int, default=1000, help="incidents inserted then appended")
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_similarity_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+
+    n = 10 ** args.scale
+    paths = generate_dataset(work_dir / "csv", n, 10, 10)
+    conn = connect_database()
+    migrate(conn)
+    load_csv_to_table(conn, paths["cyber_incidents"], "cyber_incidents")
+
+    build = update_index(conn, "cyber_incidents", dim=args.dim, rebuild=True)
+    index = open_index("cyber_incidents")
+    rng = np.random.default_rng(1510)
+    picks = [int(i) for i in rng.choice(np.asarray(index.ids), size=args.queries + args.batch)]
+
+    singles = iter(picks[:args.queries])
+    query = time_calls(
+        lambda: (lambda rid: index.search(index.vector(rid), args.k, exclude=[rid]))(next(singles)),
+        args.queries,
+    )
+    batch_vectors = np.stack([index.vector(rid) for rid in picks[args.queries:]])
+    batch = time_calls(lambda: index.search(batch_vectors, args.k), 5)
+
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO cyber_incidents (date, incident_type, severity, status, description) "
+        "VALUES ('2024-11-05', 'Phishing', 'High', 'Open', ?)",
+        [(f"new phishing report {i} mailbox credentials",) for i in range(args.append)],
+    )
+    conn.commit()
+    append = update_index(conn, "cyber_incidents", dim=args.dim)
+    conn.close()
+
+    results = {
+        "scale": args.scale,
+        "dim": args.dim,
+        "k": args.k,
+        "matrix_mb": round(build["rows"] * args.dim * 4 / 1024 / 1024, 1),
+        "build_seconds": build["seconds"],
+        "build_rows_per_sec": round(build["rows"] / build["seconds"]),
+        "query": latency_summary(query),
+        "batch": {**latency_summary(batch), "queries": args.batch,
+                  "ms_per_query": round(float(np.mean(batch)) * 1000 / args.batch, 3)},
+        "append": {"rows": append["appended"], "seconds": append["seconds"]},
+    }
+    del index
+    shutil.rmtree(work_dir)
+    path = save_results("similarity", results, args.output)
+
+    print(f"  build   {build['rows']:,} rows x {args.dim} dims ({results['matrix_mb']} MB) "
+          f"in {build['seconds']:.1f}s ({results['build_rows_per_sec']:,} rows/s)")
+    print(f"  query   top-{args.k}: p50 {results['query']['p50_ms']:.1f} ms  "
+          f"p95 {results['query']['p95_ms']:.1f} ms")
+    print(f"  batch   {args.batch} queries: p50 {results['batch']['p50_ms']:.1f} ms "
+          f"({results['batch']['ms_per_query']:.2f} ms/query)")
+    print(f"  append  {append['appended']:,} rows in {append['seconds'] * 1000:.0f} ms")
+    print(f"✅ Results written to {path}")
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
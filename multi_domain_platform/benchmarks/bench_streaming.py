@@ -0,0 +1,95 @@
+"""
+Compare per-token rendering with the buffered StreamRenderer against the
+local fake OpenAI server (no network access needed).
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_streaming --tokens 2000
+"""
+
+import argparse
+import time
+
+from openai import OpenAI
+
+from app.services.streaming import StreamRenderer, render_chat_stream
+from benchmarks.fake_openai_server import serve
+from benchmarks.report import save_results
+
+
+class CountingPlaceholder:
+    """Stands in for st.empty(): counts renders and characters sent."""
+
+    def __init__(self):
+        self.renders = 0
+        self.chars_sent = 0
+        self.last = ""
+
+    def markdown(self, text):
+        self.renders += 1
+        self.chars_sent += len(text)
+        self.last = text
+
+
+def run_naive(client, messages):
+    """The old loop: re-render the whole growing reply on every chunk."""
+    placeholder = CountingPlaceholder()
+    start = time.perf_counter()
+    stream = client.chat.completions.create(model="fake", messages=messages, stream=True)
+    full_reply = ""
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta and getattr(delta, "content", None):
+            full_reply += delta.content
+            placeholder.markdown(full_reply)
+    return {
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        "renders": placeholder.renders,
+        "chars_sent": placeholder.chars_sent,
+    }, full_reply
+
+
+def run_buffered(client, messages):
+    placeholder = CountingPlaceholder()
+    renderer = StreamRenderer(placeholder)
+    stream = client.chat.completions.create(model="fake", messages=messages, stream=True)
+    reply, stats = render_chat_stream(stream, renderer)
+    stats.update({"renders": placeholder.renders, "chars_sent": placeholder.chars_sent})
+    return stats, reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming render benchmark.")
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    parser.add_argument("--output", help="result JSON path")
+    args = parser.parse_args()
+
+    server, base_url = serve(0, args.ttft, args.token_delay, args.tokens)
+    client = OpenAI(base_url=base_url, api_key="local")
+    messages = [{"role": "user", "content": "Summarise the open tickets."}]
+
+    naive, naive_reply = run_naive(client, messages)
+    buffered, buffered_reply = run_buffered(client, messages)
+    server.shutdown()
+
+    if naive_reply != buffered_reply:
+        # a faster renderer that drops or reorders tokens is not a result
+        raise SystemExit("❌ Buffered renderer produced a different reply")
+
+    print(f"  per-token : {naive['renders']:>6} renders, {naive['chars_sent']:>12,} chars sent")
+    print(f"  buffered  : {buffered['renders']:>6} renders, {buffered['chars_sent']:>12,} chars sent")
+    print(f"  TTFT {buffered['ttft_ms']} ms, {buffered['tokens_per_sec']} tokens/s")
+
+    path = save_results("streaming", {
+        "tokens": args.tokens,
+        "per_token": naive,
+        "buffered": buffered,
+    }, args.output)
+    print(f"✅ Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
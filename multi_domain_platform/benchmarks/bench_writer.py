@@ -0,0 +1,235 @@
+"""
+Concurrency stress test of the write path: every thread committing on its
+own connection vs every write going through the writer thread
+(app/data/writer.py).
+
+In each mode, on one database file:
+
+    --threads analysts    insert an incident and then update its status,
+                          --ops times each
+    one ingest thread     loads --bulk-rows incidents from a CSV in one go,
+                          --bulk-loads times
+    one reader            counts open incidents every --reader-interval
+                          seconds until the writers finish (0 = back to
+                          back: on few cores that measures the reader
+                          taking CPU from the writers, not the write path)
+
+    direct   the old code path: INSERT / UPDATE + commit() on a connection
+             per thread (sqlite3's 5 s busy timeout, then "database is
+             locked")
+    writer   insert_incident / update_incident_status / load_csv_to_table,
+             which queue commands for the one writer connection (WAL,
+             group commit, busy retry with backoff)
+
+Lock errors are counted per mode; the writer mode should have none. A
+bulk load is one command (the load stays all-or-nothing) in a transaction
+of its own: small writes queued behind it wait for it instead of failing
+after the busy timeout, and the ones queued before it commit first.
+
+Run from multi_domain_platform/:
+    python -m benchmarks.bench_writer --threads 16 --ops 300
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.data.db import connect_database, database_file
+from app.data.incidents import insert_incident, load_csv_to_table, update_incident_status
+from app.data.migrations import migrate
+from app.data.writer import close_writers, get_writer
+from benchmarks.report import compare_results, latency_summary, save_results
+from benchmarks.synthetic import generate_dataset
+
+
+def direct_insert(conn, description):
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO cyber_incidents (date, incident_type, severity, status, description) "
+        "VALUES ('2024-11-05', 'Phishing', 'Low', 'Open', ?)",
+        (description,),
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+def direct_update(conn, incident_id, status):
+    conn.execute("UPDATE cyber_incidents SET status = ? WHERE id = ?", (status, incident_id))
+    conn.commit()
+
+
+def bulk_csv(csv_dir, rows):
+    """Synthetic incidents without ids (so every load adds rows), table column names."""
+    path = generate_dataset(csv_dir, rows, 1, 1)["cyber_incidents"]
+    df = pd.read_csv(path).drop(columns=["incident_id"])
+    df = df.rename(columns={"timestamp": "created_at", "category": "incident_type"})
+    df.to_csv(path, index=False)
+    return path
+
+
+def direct_load(conn, csv_path):
+    df = pd.read_csv(csv_path)
+    conn.executemany(
+        f"INSERT INTO cyber_incidents ({', '.join(df.columns)}) VALUES ({', '.join('?' * len(df.columns))})",
+        df.itertuples(index=False, name=None),
+    )
+    conn.commit()
+
+
+def run_mode(mode, args, csv_path):
+    work_dir = Path(tempfile.mkdtemp(prefix=f"mdp_writer_{mode}_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+    os.environ["MDP_DB_LAYOUT"] = "single"
+    conn = connect_database()
+    migrate(conn)
+    conn.close()
+
+    lock = threading.Lock()
+    reads = [0]
+    samples, lock_errors = [], {"analyst": 0, "ingest": 0, "reader": 0}
+    ingest_seconds, analysts_done = [], []
+    writers_done = threading.Event()
+
+    def record(kind, seconds=None, error=None):
+        with lock:
+            if error is not None:
+                if "locked" not in str(error) and "busy" not in str(error):
+                    raise error
+                lock_errors[kind] += 1
+            elif kind == "analyst":
+                samples.append(seconds)
+
+    def analyst(n):
+        conn = connect_database()
+        for i in range(args.ops):
+            start = time.perf_counter()
+            try:
+                if mode == "direct":
+                    incident_id = direct_insert(conn, f"Stress {n}-{i}")
+                    direct_update(conn, incident_id, "In Progress")
+                else:
+                    incident_id = insert_incident(conn, "2024-11-05", "Phishing", "Low", "Open", f"Stress {n}-{i}")
+                    update_incident_status(conn, incident_id, "In Progress")
+            except sqlite3.OperationalError as e:
+                conn.rollback()
+                record("analyst", error=e)
+                continue
+            record("analyst", time.perf_counter() - start)
+        conn.close()
+        analysts_done.append(time.perf_counter())
+
+    def ingest():
+        conn = connect_database()
+        for _ in range(args.bulk_loads):
+            load_start = time.perf_counter()
+            try:
+                if mode == "direct":
+                    direct_load(conn, csv_path)
+                else:
+                    load_csv_to_table(conn, csv_path, "cyber_incidents")
+            except sqlite3.OperationalError as e:
+                conn.rollback()
+                record("ingest", error=e)
+                continue
+            ingest_seconds.append(round(time.perf_counter() - load_start, 2))
+        conn.close()
+
+    def reader():
+        conn = connect_database()
+        while not writers_done.is_set():
+            try:
+                conn.execute("SELECT COUNT(*) FROM cyber_incidents WHERE status = 'Open'").fetchone()
+                reads[0] += 1
+            except sqlite3.OperationalError as e:
+                record("reader", error=e)
+            if args.reader_interval:
+                time.sleep(args.reader_interval)
+        conn.close()
+
+    writers = [threading.Thread(target=analyst, args=(n,)) for n in range(args.threads)]
+    writers.append(threading.Thread(target=ingest))
+    reader_thread = threading.Thread(target=reader)
+    start = time.perf_counter()
+    reader_thread.start()
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    seconds = time.perf_counter() - start
+    writers_done.set()
+    reader_thread.join()
+
+    conn = connect_database()
+    rows = conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+    writer_stats = get_writer(database_file(conn, "cyber_incidents")).stats() if mode == "writer" else None
+    conn.close()
+    close_writers()
+    shutil.rmtree(work_dir)
+
+    # analyst throughput over the analysts' own run (the last bulk load may
+    # still be going after they finished)
+    ops = len(samples) * 2
+    analyst_seconds = max(analysts_done) - start
+    return {
+        "seconds": round(seconds, 2),
+        "rows": rows,
+        "ingest_seconds": ingest_seconds,
+        "analyst_ops": ops,
+        "analyst_ops_per_sec": round(ops / analyst_seconds, 1),
+        "reader_queries": reads[0],
+        "lock_errors": lock_errors,
+        "total_lock_errors": sum(lock_errors.values()),
+        "insert_update_latency": latency_summary(samples),
+        "writer": writer_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-connection commits vs the single writer thread under load.")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent analyst threads")
+    parser.add_argument("--ops", type=int, default=300, help="insert + update pairs per analyst")
+    parser.add_argument("--bulk-rows", type=int, default=100_000, help="rows per bulk CSV load")
+    parser.add_argument("--bulk-loads", type=int, default=1, help="bulk loads during the run (0 = none)")
+    parser.add_argument("--reader-interval", type=float, default=0.01,
+                        help="seconds between reader queries (0 = back to back)")
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    args = parser.parse_args()
+
+    csv_dir = Path(tempfile.mkdtemp(prefix="mdp_writer_csv_"))
+    csv_path = bulk_csv(csv_dir, args.bulk_rows)
+    results = {
+        "threads": args.threads,
+        "ops": args.ops,
+        "bulk_rows": args.bulk_rows,
+        "bulk_loads": args.bulk_loads,
+        "reader_interval": args.reader_interval,
+    }
+    for mode in ("direct", "writer"):
+        results[mode] = run_mode(mode, args, csv_path)
+    shutil.rmtree(csv_dir)
+    path = save_results("writer", results, args.output)
+
+    for mode in ("direct", "writer"):
+        r = results[mode]
+        lat = r["insert_update_latency"]
+        print(f"  {mode:<7} {r['analyst_ops_per_sec']:>9,.0f} ops/s   lock errors {r['total_lock_errors']:>5} "
+              f"{r['lock_errors']}   insert+update p50 {lat['p50_ms']:.1f} ms  p99 {lat['p99_ms']:.1f} ms   "
+              f"bulk loads {r['ingest_seconds']} s   reader queries {r['reader_queries']:,}")
+    w = results["writer"]["writer"]
+    print(f"  writer: {w['commands']:,} commands in {w['commits']:,} commits "
+          f"({w['commands_per_commit']} per commit), {w['busy_retries']} busy retries")
+    print(f"✅ Results written to {path}")
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Serves POST /v1/chat/completions (streaming SSE and plain JSON) with a
+deterministic reply, a configurable time-to-first-token and a fixed
+per-token delay, so streaming and load tests run without network access.
+
+    python -m benchmarks.fake_openai_server --port 8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=local streamlit run app/ui/Home.py
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+WORDS = (
+    "Summary of common issues: repeated login failures, VPN drops and slow laptops. "
+    "Top priorities: restore access for locked accounts, patch the VPN gateway, "
+    "and triage high priority tickets first. Recommended actions: reset credentials, "
+    "apply the gateway update, monitor for recurrence and document the fix."
+).split(" ")
+
+
+def fake_reply(messages, tokens):
+    """Deterministic reply of `tokens` words, seeded by the last message."""
+    last = messages[-1]["content"] if messages else ""
+    offset = int(hashlib.sha256(last.encode("utf-8")).hexdigest(), 16) % len(WORDS)
+    return [WORDS[(offset + i) % len(WORDS)] + " " for i in range(tokens)]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Timing settings (ttft, token_delay, tokens) live on the server, see serve()."""
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        pieces = fake_reply(request.get("messages", []), server.tokens)
+        model = request.get("model", "fake-model")
+        created = int(time.time())
+        prompt_tokens = sum(len(m.get("content", "")) // 4 for m in request.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(pieces),
+            "total_tokens": prompt_tokens + len(pieces),
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+
+        time.sleep(server.ttft)
+
+        if not request.get("stream"):
+            self._json(200, {
+                "id": "chatcmpl-local",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(pieces)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def send(delta, finish_reason=None, usage=None):
+            chunk = {
+                "id": "chatcmpl-local",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if usage:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        for piece in pieces:
+            send({"content": piece})
+            if server.token_delay:
+                time.sleep(server.token_delay)
+        send({}, finish_reason="stop")
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send({}, usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(port=0, ttft=0.2, token_delay=0.01, tokens=120):
+    """
+    Start the fake server on a background thread.
+
+    Returns:
+        (server, base_url) - call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.ttft = ttft
+    server.token_delay = token_delay
+    server.tokens = tokens
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, bound_port = server.server_address
+    return server, f"http://{host}:{bound_port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between tokens")
+    parser.add_argument("--tokens", type=int, default=120, help="tokens per reply")
+    args = parser.parse_args()
+
+    server, base_url = serve(args.port, args.ttft, args.token_delay, args.tokens)
+    print(f"Fake OpenAI server on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Concurrent-session load test of the Streamlit pages, run headlessly with
+AppTest (no browser or server needed).
+
+Every simulated analyst is a worker process with its own AppTest session
+(AppTest swaps process-wide runtime state on each run, so sessions on
+threads of one process would trip over each other). The workers share
+the database files and the fake OpenAI server, not Streamlit's
+in-memory caches: each warms its own caches first, as a server that has
+been up for a while would have them, and then all start together.
+Each session:
+
+    Home            open, register, log in (switches to the Dashboard)
+    Dashboard       open, search incident descriptions
+    IT Operations   open, pick a status filter, then a priority filter,
+                    search tickets, clear the search
+                    (with --ai, also "Analyze with AI")
+
+and repeats the Dashboard / IT Operations part --iterations times. The
+pages have no pagers; stepping through filter combinations and searches
+is what "paging" through the tickets means here. The OpenAI API is
+replaced by the local fake server (benchmarks/fake_openai_server.py).
+
+Every AppTest run (one user action = one script rerun) is timed after an
+untimed warm-up pass; the output is throughput, errors (exceptions shown
+on the page, missing widgets, timeouts) and latency percentiles per page
+and per action.
+
+Run from multi_domain_platform/:
+    python -m benchmarks.load_test --scale 4 --sessions 10 --iterations 3
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from streamlit import logger as streamlit_logger
+
+from app.data.db import connect_database
+from app.data.incidents import load_csv_to_table
+from app.data.migrations import migrate
+from benchmarks.fake_openai_server import serve
+from benchmarks.report import compare_results, latency_summary, save_results
+from benchmarks.synthetic import PHRASES, generate_dataset
+
+
+UI_DIR = Path(__file__).resolve().parents[1] / "app" / "ui"
+DASHBOARD = "pages/1_Dashboard.py"
+IT_OPERATIONS = "pages/2_IT_Operations.py"
+
+
+class Session:
+    """One simulated analyst: an AppTest session plus its timings."""
+
+    def __init__(self, number, timeout, think, rng):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(str(UI_DIR / "Home.py"), default_timeout=timeout)
+        self.username = f"analyst{number}"
+        self.think = think
+        self.rng = rng
+        self.samples = []      # (page, action, seconds, error or None)
+
+    def run(self, page, action, prepare=None):
+        """
+        One user action: `prepare` sets widgets, then the script reruns.
+        A missing widget, an exception element or a timeout count as an
+        error (the first message of each kind is kept for the report).
+        """
+        if self.think:
+            time.sleep(self.rng.exponential(self.think))
+        start = time.perf_counter()
+        error = None
+        try:
+            if prepare is not None:
+                prepare()
+            self.at.run()
+            if self.at.exception:
+                error = self.at.exception[0].message
+        except Exception as e:      # missing widget, AppTest timeout
+            error = f"{type(e).__name__}: {e}"
+        self.samples.append((page, action, time.perf_counter() - start, error))
+        return error is None
+
+    def _button(self, label):
+        return next(b for b in self.at.button if b.label == label)
+
+    def _selectbox(self, label):
+        return next((s for s in self.at.selectbox if s.label == label), None)
+
+    def _register(self):
+        self.at.text_input(key="register_username").input(self.username)
+        self.at.text_input(key="register_password").input("password123")
+        self.at.text_input(key="register_confirm").input("password123")
+        self._button("Create account").click()
+
+    def _login(self):
+        self.at.text_input(key="login_username").input(self.username)
+        self.at.text_input(key="login_password").input("password123")
+        self._button("Log in").click()
+
+    def login(self):
+        return (
+            self.run("Home", "open")
+            and self.run("Home", "register", self._register)
+            and self.run("Home", "login", self._login)
+            and self.at.session_state["logged_in"]
+        )
+
+    def dashboard(self):
+        if not self.run("Dashboard", "open", lambda: self.at.switch_page(DASHBOARD)):
+            return
+        phrase = str(self.rng.choice(PHRASES))
+        self.run("Dashboard", "search", lambda: self.at.text_input(key="incident_search").input(phrase))
+
+    def it_operations(self, ai):
+        if not self.run("IT Operations", "open", lambda: self.at.switch_page(IT_OPERATIONS)):
+            return
+        for label, action in (("Status", "filter_status"), ("Priority", "filter_priority")):
+            box = self._selectbox(label)
+            if box is not None and box.options:
+                option = str(self.rng.choice(box.options))
+                self.run("IT Operations", action, lambda: box.select(option))
+        phrase = str(self.rng.choice(PHRASES))
+        self.run("IT Operations", "search", lambda: self.at.text_input(key="ticket_search").input(phrase))
+        self.run("IT Operations", "clear_search", lambda: self.at.text_input(key="ticket_search").input(""))
+        if ai:
+            self.run("IT Operations", "ai_enqueue", lambda: self._button("Analyze with AI").click())
+
+
+def warm_up(ai, timeout, seed):
+    """
+    One untimed pass through every page first, so the caches, the search
+    index and the ticket clusters exist and the concurrent part measures
+    steady state rather than whoever came first.
+    """
+    session = Session("_warmup", timeout, 0.0, np.random.default_rng(seed))
+    if session.login():
+        session.dashboard()
+        session.it_operations(ai)
+    return [s for s in session.samples if s[3] is not None]
+
+
+def worker(args):
+    """
+    One analyst (a `--worker N` child process): warm its own caches,
+    report ready on stdout, wait for "go" on stdin, then print its
+    samples as JSON. The pages may print too; the parent only reads the
+    lines starting with "ready" / "samples".
+    """
+    if not args.no_warmup:
+        warm_up(args.ai, args.timeout, args.seed)
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    session = Session(args.worker, args.timeout, args.think, np.random.default_rng([args.seed, args.worker]))
+    if session.login():
+        for _ in range(args.iterations):
+            session.dashboard()
+            session.it_operations(args.ai)
+    print("samples", json.dumps(session.samples), flush=True)
+
+
+def run_sessions(args):
+    """
+    Start one worker process per session and release them together once
+    every one has warmed up.
+
+    Returns:
+        (samples, seconds, failed_logins)
+    """
+    command = [
+        sys.executable, "-m", "benchmarks.load_test",
+        "--iterations", str(args.iterations), "--think", str(args.think),
+        "--timeout", str(args.timeout), "--seed", str(args.seed),
+    ] + (["--ai"] if args.ai else []) + (["--no-warmup"] if args.no_warmup else [])
+    workers = [
+        subprocess.Popen(command + ["--worker", str(number)], stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for number in range(args.sessions)
+    ]
+    def read_line(w, tag):
+        for line in w.stdout:
+            if line.startswith(tag):
+                return line[len(tag):].strip()
+        raise RuntimeError(f"load test worker {w.args[-1]} exited early")
+
+    for w in workers:
+        read_line(w, "ready")
+
+    start = time.perf_counter()
+    for w in workers:
+        w.stdin.write("go\n")
+        w.stdin.flush()
+    per_session = [json.loads(read_line(w, "samples")) for w in workers]
+    seconds = time.perf_counter() - start
+    for w in workers:
+        w.wait()
+
+    samples = [tuple(sample) for session in per_session for sample in session]
+    failed_logins = sum(
+        1 for session in per_session
+        if not any(page != "Home" for page, *_ in session)
+    )
+    return samples, seconds, failed_logins
+
+
+def summarize(samples, seconds):
+    """Runs, errors, runs/s and latency percentiles per page and per page/action."""
+    def block(rows):
+        return {
+            "runs": len(rows),
+            "errors": sum(1 for r in rows if r[3] is not None),
+            "runs_per_sec": round(len(rows) / seconds, 2),
+            "latency": latency_summary([r[2] for r in rows]),
+        }
+
+    pages = {}
+    for page in dict.fromkeys(r[0] for r in samples):
+        rows = [r for r in samples if r[0] == page]
+        pages[page] = block(rows)
+        pages[page]["actions"] = {
+            action: block([r for r in rows if r[1] == action])
+            for action in dict.fromkeys(r[1] for r in rows)
+        }
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent AppTest sessions against the Streamlit pages.")
+    parser.add_argument("--scale", type=int, default=4, choices=range(2, 8),
+                        help="10^scale incidents and tickets (default 4)")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent analysts (one process each)")
+    parser.add_argument("--iterations", type=int, default=3, help="Dashboard + IT Operations visits per analyst")
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="mean think time between actions in seconds (exponential)")
+    parser.add_argument("--ai", action="store_true", help="also click 'Analyze with AI' on every visit")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds before a script run counts as failed")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="skip the untimed pass that fills the caches first")
+    parser.add_argument("--seed", type=int, default=1510)
+    parser.add_argument("--output", help="result JSON path")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        # the parent set MDP_DATA_DIR / OPENAI_BASE_URL for us
+        streamlit_logger.set_log_level("error")
+        worker(args)
+        return
+
+    work_dir = Path(tempfile.mkdtemp(prefix="mdp_load_"))
+    os.environ["MDP_DATA_DIR"] = str(work_dir)
+
+    n = 10 ** args.scale
+    paths = generate_dataset(work_dir / "csv", n, n, 10, args.seed)
+    conn = connect_database()
+    migrate(conn)
+    for table_name in ("cyber_incidents", "it_tickets"):
+        load_csv_to_table(conn, paths[table_name], table_name)
+    conn.close()
+
+    # the AI features talk to the local fake server instead of api.openai.com
+    server, base_url = serve(ttft=0.2, token_delay=0.005, tokens=120)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "local"
+
+    if not args.no_warmup:
+        for page, action, _, error in warm_up(args.ai, args.timeout, args.seed):
+            print(f"❌ Warm-up {page} / {action}: {error[:160]}")
+    samples, seconds, failed_logins = run_sessions(args)
+    server.shutdown()
+
+    results = {
+        "scale": args.scale,
+        "sessions": args.sessions,
+        "iterations": args.iterations,
+        "think": args.think,
+        "ai": args.ai,
+        "warmup": not args.no_warmup,
+        "seconds": round(seconds, 2),
+        "failed_logins": failed_logins,
+        "script_runs": len(samples),
+        "runs_per_sec": round(len(samples) / seconds, 2),
+        "pages": summarize(samples, seconds),
+        "error_messages": sorted({r[3] for r in samples if r[3] is not None}),
+    }
+    shutil.rmtree(work_dir, ignore_errors=True)
+    path = save_results("load_test", results, args.output)
+
+    print(f"  {args.sessions} sessions x {args.iterations} iterations: {len(samples):,} script runs "
+          f"in {seconds:.1f}s ({results['runs_per_sec']:.1f} runs/s)")
+    for page, r in results["pages"].items():
+        lat = r["latency"]
+        print(f"  {page:<14} {r['runs']:>5} runs  {r['errors']:>3} errors  {r['runs_per_sec']:>6.2f} runs/s   "
+              f"p50 {lat['p50_ms']:>8.1f} ms  p95 {lat['p95_ms']:>8.1f} ms  p99 {lat['p99_ms']:>8.1f} ms")
+        for action, a in r["actions"].items():
+            lat = a["latency"]
+            print(f"      {action:<16} {a['runs']:>5} runs  {a['errors']:>3} errors   "
+                  f"p50 {lat['p50_ms']:>8.1f} ms  p95 {lat['p95_ms']:>8.1f} ms")
+    for message in results["error_messages"]:
+        print(f"❌ {message[:160]}")
+    print(f"✅ Results written to {path}")
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Helpers shared by the benchmark scripts: timing summaries, JSON output
+and comparison against a previous run.
+"""
+
+import json
+import platform
+import sqlite3
+import subprocess
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def latency_summary(samples_s):
+    """
+    Summarise a list of durations (seconds) in milliseconds.
+
+    Returns:
+        dict: n, mean_ms, p50_ms, p95_ms, p99_ms, max_ms
+    """
+    ms = np.asarray(samples_s, dtype=float) * 1000.0
+    if ms.size == 0:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "n": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def time_calls(fn, repeats):
+    """
+    Call fn() `repeats` times.
+
+    Returns:
+        list[float]: duration of each call in seconds
+    """
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def git_revision():
+    """Short hash of the current commit ("unknown" outside a git checkout)."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment():
+    """Machine / library details stored alongside every result file."""
+    return {
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(name, results, output=None):
+    """
+    Write results (plus environment details) as JSON.
+
+    Default path: benchmarks/results/<name>-<git revision>.json
+
+    Returns:
+        Path: file written
+    """
+    payload = {"benchmark": name, "environment": environment(), "results": results}
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{name}-{payload['environment']['git_revision']}.json"
+    output = Path(output)
+    output.write_text(json.dumps(payload, indent=2))
+    return output
+
+
+def _flatten(d, prefix=""):
+    flat = {}
+    for key, value in d.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare_results(baseline_path, results):
+    """
+    Print every numeric metric next to the value in a previous result file.
+    """
+    baseline = json.loads(Path(baseline_path).read_text())
+    old = _flatten(baseline["results"])
+    new = _flatten(results)
+
+    print(f"\nComparison with {baseline_path} ({baseline['environment']['git_revision']})")
+    for key in sorted(new):
+        if key not in old:
+            continue
+        before, after = old[key], new[key]
+        change = ((after - before) / before * 100.0) if before else 0.0
+        print(f"  {key:<50} {before:>14.3f} -> {after:>14.3f}  ({change:+.1f}%)")
@@ -0,0 +1,134 @@
+"""
+Seeded synthetic data matching the coursework CSV schemas.
+
+The same (seed, n) always produces the same files, so benchmark results
+from different commits are comparable. Rows are generated in vectorised
+chunks, so 10^7 rows never have to sit in memory at once.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+CHUNK_SIZE = 250_000
+
+# Same headers as data/cyber_incidents.csv, data/it_tickets.csv
+INCIDENT_COLUMNS = ["incident_id", "timestamp", "severity", "category", "status", "description"]
+TICKET_COLUMNS = [
+    "ticket_id", "priority", "description", "status",
+    "assigned_to", "created_at", "resolution_time_hours",
+]
+
+SEVERITIES = np.array(["Low", "Medium", "High", "Critical"])
+SEVERITY_P = [0.35, 0.35, 0.2, 0.1]
+INCIDENT_CATEGORIES = np.array(
+    ["Malware", "Phishing", "DDoS", "Unauthorized Access", "Misconfiguration"]
+)
+INCIDENT_STATUSES = np.array(["Open", "In Progress", "Resolved", "Closed"])
+
+PRIORITIES = np.array(["Low", "Medium", "High", "Critical"])
+TICKET_STATUSES = np.array(["Open", "In Progress", "Waiting for User", "Resolved", "Closed"])
+ASSIGNEES = np.array(["IT_Support_A", "IT_Support_B", "IT_Support_C"])
+
+PHRASES = np.array([
+    "problem description", "cannot log in", "vpn disconnects", "password reset",
+    "printer offline", "email not syncing", "slow laptop", "disk almost full",
+    "suspicious attachment", "account locked",
+])
+
+# One valid bcrypt hash (of "password123", cost 4) reused for every user:
+# hashing millions of passwords would benchmark bcrypt, not the database.
+PASSWORD_HASH = "$2b$04$abcdefghijklmnopqrstuuK7Sjs7rFYArh/ytIZsOeM/z4RV2Fw2i"
+
+START = np.datetime64("2024-01-01T00:00:00")
+HOURS_IN_YEAR = 365 * 24
+
+
+def _chunks(n, seed):
+    """Yield (offset, size, rng) for each chunk; each chunk has its own stream."""
+    for i, offset in enumerate(range(0, n, CHUNK_SIZE)):
+        yield offset, min(CHUNK_SIZE, n - offset), np.random.default_rng([seed, i])
+
+
+def _timestamps(rng, size):
+    hours = rng.integers(0, HOURS_IN_YEAR, size=size).astype("timedelta64[h]")
+    return pd.Series(START + hours).dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy()
+
+
+def incident_chunks(n, seed=1510):
+    """Yield DataFrames of synthetic incidents (INCIDENT_COLUMNS)."""
+    for offset, size, rng in _chunks(n, seed):
+        ids = np.arange(offset, offset + size)
+        categories = rng.choice(INCIDENT_CATEGORIES, size=size)
+        yield pd.DataFrame({
+            "incident_id": ids + 1000,
+            "timestamp": _timestamps(rng, size),
+            "severity": rng.choice(SEVERITIES, size=size, p=SEVERITY_P),
+            "category": categories,
+            "status": rng.choice(INCIDENT_STATUSES, size=size),
+            "description": pd.Series(categories) + " incident " + pd.Series(ids).astype(str)
+                + " " + rng.choice(PHRASES, size=size),
+        }, columns=INCIDENT_COLUMNS)
+
+
+def ticket_chunks(n, seed=1510):
+    """Yield DataFrames of synthetic IT tickets (TICKET_COLUMNS)."""
+    for offset, size, rng in _chunks(n, seed + 1):
+        ids = np.arange(offset, offset + size)
+        yield pd.DataFrame({
+            "ticket_id": ids + 2000,
+            "priority": rng.choice(PRIORITIES, size=size),
+            "description": "Ticket " + pd.Series(ids).astype(str) + " "
+                + rng.choice(PHRASES, size=size),
+            "status": rng.choice(TICKET_STATUSES, size=size),
+            "assigned_to": rng.choice(ASSIGNEES, size=size),
+            "created_at": _timestamps(rng, size),
+            "resolution_time_hours": rng.integers(1, 120, size=size),
+        }, columns=TICKET_COLUMNS)
+
+
+def user_lines(n):
+    """Yield users.txt lines (username,password_hash)."""
+    for i in range(n):
+        yield f"bench_user_{i},{PASSWORD_HASH}\n"
+
+
+def write_csv(chunks, path):
+    """
+    Stream DataFrame chunks into one CSV file.
+
+    Returns:
+        int: number of rows written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    total = 0
+    with open(path, "w", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=(i == 0))
+            total += len(chunk)
+    return total
+
+
+def generate_dataset(out_dir, n_incidents, n_tickets, n_users, seed=1510):
+    """
+    Write cyber_incidents.csv, it_tickets.csv and users.txt into out_dir.
+
+    Returns:
+        dict: name -> Path of each generated file
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = {
+        "cyber_incidents": out_dir / "cyber_incidents.csv",
+        "it_tickets": out_dir / "it_tickets.csv",
+        "users": out_dir / "users.txt",
+    }
+    write_csv(incident_chunks(n_incidents, seed), paths["cyber_incidents"])
+    write_csv(ticket_chunks(n_tickets, seed), paths["it_tickets"])
+    with open(paths["users"], "w") as f:
+        f.writelines(user_lines(n_users))
+    return paths
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import os
+
+from app.data.db import connect_database
+from app.data.schema import create_ai_summaries_table
+from app.services.ai_backends import get_backend
+from app.services.prompts import RECORD_SUMMARY, get_prompt_stats
+from app.services.summarize import SUMMARY_SOURCES, count_pending, summarize_table
+
+
+def main():
+    """
+    Offline AI summary + category for every incident / ticket not done yet.
+
+    Run from multi_domain_platform/:
+        python -m scripts.batch_summarize                          # OpenAI
+        python -m scripts.batch_summarize --backend stub --latency 0.02
+        python -m scripts.batch_summarize --backend stub --rate-limit-every 25
+
+    Progress is committed after every batch, so the command can be stopped
+    and re-run; it continues with the rows that have no summary yet.
+    """
+    parser = argparse.ArgumentParser(description="Batch-summarize incidents and tickets.")
+    parser.add_argument("--table", choices=sorted(SUMMARY_SOURCES), action="append",
+                        help="table to summarize (default: all)")
+    parser.add_argument("--backend", choices=["openai", "stub"], default="openai")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="maximum requests in flight (lowered on rate limits)")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="rows per checkpoint commit")
+    parser.add_argument("--limit", type=int, help="stop after this many rows per table")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub: seconds per request")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="stub: answer every Nth request with a 429")
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        backend = get_backend("stub", latency=args.latency, rate_limit_every=args.rate_limit_every)
+    else:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            print("❌ OPENAI_API_KEY is not set (use --backend stub to run offline).")
+            return
+        backend = get_backend("openai", api_key=api_key, base_url=os.environ.get("OPENAI_BASE_URL"))
+
+    def progress(done, failed, limiter, errors):
+        print(f"   {done} done, {failed} failed, limit {limiter.limit:.1f}")
+        for row_id, error in errors[:3]:
+            print(f"   ⚠️ row {row_id}: {error}")
+
+    async def run():
+        conn = connect_database()
+        create_ai_summaries_table(conn)
+        try:
+            for table_name in args.table or sorted(SUMMARY_SOURCES):
+                print(f"🧠 {table_name}: {count_pending(conn, table_name)} rows to summarize")
+                stats = await summarize_table(
+                    conn, table_name, backend, args.model,
+                    concurrency=args.concurrency,
+                    batch_size=args.batch_size,
+                    limit=args.limit,
+                    on_batch=progress,
+                )
+                print(f"✅ {table_name}: {stats['done']} summarized, {stats['failed']} failed, "
+                      f"{stats['rate_limited']} rate limited in {stats['elapsed_s']:.2f}s "
+                      f"({stats['rows_per_sec']} rows/s)")
+
+            usage = next(r for r in get_prompt_stats() if r["prompt"] == RECORD_SUMMARY.id)
+            print(f"📊 {usage['prompt']}: {usage['prompt_tokens']} prompt tokens "
+                  f"({usage['cached_tokens']} cached, prefix ~{usage['prefix_tokens']} tokens), "
+                  f"{usage['completion_tokens']} completion tokens")
+        finally:
+            conn.close()
+            await backend.aclose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
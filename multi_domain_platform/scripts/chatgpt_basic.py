@@ -1,13 +1,14 @@
 from openai import OpenAI
 
+from app.services.prompts import GENERAL_ASSISTANT
+
+# Run from multi_domain_platform/: python -m scripts.chatgpt_basic
+
 client = OpenAI()
 
 response = client.chat.completions.create(
     model="gpt-4o-mini",
-    messages=[
-        {"role": "system", "content": "You are a helpful assistant."},
-        {"role": "user", "content": "Hello! What is AI?"}
-    ]
+    messages=GENERAL_ASSISTANT.messages(input="Hello! What is AI?")
 )
 
 print(response.choices[0].message.content)
\ No newline at end of file
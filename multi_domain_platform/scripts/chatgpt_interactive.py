@@ -1,5 +1,9 @@
 from openai import OpenAI
 
+from app.services.prompts import GENERAL_ASSISTANT
+
+# Run from multi_domain_platform/: python -m scripts.chatgpt_interactive
+
 # Initialise client
 
 client = OpenAI()
@@ -8,7 +12,7 @@ client = OpenAI()
 messages = [
     {
         "role": "system",
-        "content": "You are a helpful assistant."
+        "content": GENERAL_ASSISTANT.system
     }
 ]
 
@@ -0,0 +1,49 @@
+import argparse
+import time
+
+from app.data.db import connect_database
+from app.services.clustering import (
+    CLUSTER_SOURCES,
+    update_clusters,
+    rebuild_clusters,
+    get_cluster_representatives,
+)
+
+
+def main():
+    """
+    Offline near-duplicate clustering of incidents and tickets.
+
+    Run from multi_domain_platform/:
+        python -m scripts.cluster_records            # incremental
+        python -m scripts.cluster_records --rebuild  # from scratch
+    """
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate incidents / tickets.")
+    parser.add_argument("--table", choices=sorted(CLUSTER_SOURCES), action="append",
+                        help="table to cluster (default: all)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="drop existing clusters and recluster every row")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    conn = connect_database()
+
+    for table_name in args.table or sorted(CLUSTER_SOURCES):
+        start = time.perf_counter()
+        if args.rebuild:
+            n = rebuild_clusters(conn, table_name, args.batch_size)
+        else:
+            n = update_clusters(conn, table_name, args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        reps = get_cluster_representatives(conn, table_name)
+        print(f"✅ {table_name}: clustered {n} new or changed rows in {elapsed:.2f}s "
+              f"-> {len(reps)} clusters")
+        for _, row in reps.head(5).iterrows():
+            print(f"   #{row['id']:<8} x{row['cluster_size']:<6} {str(row['description'])[:60]}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+
+from app.data.db import connect_database
+from app.services.correlation import CORRELATION_SETTINGS, get_links, update_links
+
+
+def main():
+    """
+    Link cyber incidents to the IT tickets they probably caused.
+
+    Run from multi_domain_platform/:
+        python -m scripts.correlate_records run                    # new rows only
+        python -m scripts.correlate_records run --after-hours 24   # changed settings rebuild
+        python -m scripts.correlate_records show 1042               # tickets linked to an incident
+    """
+    parser = argparse.ArgumentParser(description="Correlate incidents and tickets by time and keywords.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="link rows added since the last run")
+    for name, value in CORRELATION_SETTINGS.items():
+        run.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value,
+                         help=f"default {value}")
+    run.add_argument("--rebuild", action="store_true", help="recompute every link")
+
+    show = sub.add_parser("show", help="print the tickets linked to an incident")
+    show.add_argument("incident_id", type=int)
+    args = parser.parse_args()
+
+    conn = connect_database()
+    try:
+        if args.command == "run":
+            settings = {name: getattr(args, name) for name in CORRELATION_SETTINGS}
+            r = update_links(conn, settings, rebuild=args.rebuild)
+            print(f"✅ Swept {r['incidents']:,} new incidents and {r['tickets']:,} new tickets: "
+                  f"{r['links']:,} links in {r['seconds']:.2f}s")
+        else:
+            links = get_links(conn, incident_id=args.incident_id)
+            if links.empty:
+                print(f"No tickets linked to incident {args.incident_id}.")
+            for link in links.itertuples(index=False):
+                print(f"   score {link.score:<4g} {link.gap_hours:+8.1f}h  ticket {link.ticket_number:<8} "
+                      f"[{link.matched_on}] {str(link.ticket_description)[:50]}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import sys
+
+from app.data.db import connect_database
+from app.services.export import EXPORT_FORMATS, EXPORT_TABLES, FETCH_ROWS, export_to_file
+
+
+def _parse_filter(text):
+    column, sep, value = text.partition("=")
+    if not sep or not column:
+        raise argparse.ArgumentTypeError(f"expected column=value, got '{text}'")
+    return column.strip(), value
+
+
+def main():
+    """
+    Stream tickets or incidents to CSV / NDJSON (optionally gzipped)
+    without loading them into memory.
+
+    Run from multi_domain_platform/:
+        python -m scripts.export_records tickets -o tickets.csv
+        python -m scripts.export_records tickets --filter status=Open --filter priority=High
+        python -m scripts.export_records incidents --format ndjson --gzip -o incidents.ndjson.gz
+    """
+    parser = argparse.ArgumentParser(description="Export filtered records as CSV or NDJSON.")
+    parser.add_argument("domain", choices=sorted(EXPORT_TABLES), help="what to export")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--filter", type=_parse_filter, action="append", default=[],
+                        metavar="COLUMN=VALUE",
+                        help="only rows with this value (repeatable; 'Unknown' matches empty values)")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--batch-size", type=int, default=FETCH_ROWS, help="rows fetched per step")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    conn = connect_database(args.domain)
+    try:
+        if args.output == "-":
+            out = sys.stdout.buffer
+            stats = export_to_file(conn, EXPORT_TABLES[args.domain], out, args.format,
+                                   dict(args.filter), args.gzip, args.batch_size)
+            out.flush()
+        else:
+            with open(args.output, "wb") as out:
+                stats = export_to_file(conn, EXPORT_TABLES[args.domain], out, args.format,
+                                       dict(args.filter), args.gzip, args.batch_size)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    # stderr, so stdout stays clean for piping
+    print(f"✅ Exported {stats['rows']:,} rows ({stats['bytes'] / 1024 / 1024:.1f} MB) "
+          f"in {stats['seconds']:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import time
 import pandas as pd
 
 from app.data.db import connect_database
-from app.data.schema import create_all_tables
+from app.data.migrations import migrate
 from app.data.users import migrate_users_from_file
 from app.data.incidents import (
     load_csv_to_table,
@@ -32,7 +32,7 @@ def run_comprehensive_tests():
     conn = connect_database()
 
     # Always ensure schema exists
-    create_all_tables(conn)
+    migrate(conn)
 
     # Migrate users 
     migrate_users_from_file()
@@ -0,0 +1,40 @@
+import argparse
+
+from app.data.db import connect_database
+from app.data.migrations import MIGRATIONS, SCHEMA_VERSION, migrate, schema_versions
+
+
+def main():
+    """
+    Apply the pending schema migrations (app/data/migrations.py).
+
+    Run from multi_domain_platform/:
+        python -m scripts.migrate --status
+        python -m scripts.migrate
+
+    The Streamlit app runs the same migrations on startup; this is for
+    doing it ahead of a deploy and seeing how long each step takes.
+    """
+    parser = argparse.ArgumentParser(description="Bring the database schema to the current version.")
+    parser.add_argument("--status", action="store_true", help="only show each file's version")
+    args = parser.parse_args()
+
+    conn = connect_database()
+    versions = schema_versions(conn)
+    for schema, version in versions.items():
+        print(f"   {schema:<10} version {version}")
+
+    current = min(versions.values())
+    pending = [(v, d) for v, d, _ in MIGRATIONS if v > current]
+    if not pending:
+        print(f"✅ Schema is current (version {SCHEMA_VERSION})")
+    elif args.status:
+        for version, description in pending:
+            print(f"   pending {version:>3}  {description}")
+    else:
+        migrate(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import json
+
+from app.data.db import connect_database
+from app.services.dataset_profiler import (
+    DEFAULT_CHUNK_ROWS,
+    DEFAULT_TOP_K,
+    get_column_profiles,
+    profile_catalog,
+    profile_dataset,
+)
+
+
+def _print_outcome(outcome):
+    if "error" in outcome:
+        print(f"❌ #{outcome['dataset_id']} {outcome['path']}: {outcome['error']}")
+    elif outcome["status"] == "unchanged":
+        print(f"   #{outcome['dataset_id']} {outcome['path']}: unchanged, kept profile")
+    else:
+        print(f"✅ #{outcome['dataset_id']} {outcome['path']}: {outcome['row_count']:,} rows, "
+              f"{outcome['column_count']} columns in {outcome['seconds']:.2f}s")
+
+
+def main():
+    """
+    Column statistics for catalogued datasets (run scripts.scan_catalog first).
+
+    Run from multi_domain_platform/:
+        python -m scripts.profile_datasets run                 # every catalogued dataset
+        python -m scripts.profile_datasets run --dataset-id 7 --force
+        python -m scripts.profile_datasets show 7
+    """
+    parser = argparse.ArgumentParser(description="Stream datasets and store per-column profiles.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="profile datasets")
+    run.add_argument("--dataset-id", type=int, action="append", help="only this dataset (repeatable)")
+    run.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows read per chunk")
+    run.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="frequent values kept per column")
+    run.add_argument("--force", action="store_true", help="re-profile unchanged files")
+
+    sub.add_parser("show", help="print a stored profile").add_argument("dataset_id", type=int)
+    args = parser.parse_args()
+
+    conn = connect_database()
+    try:
+        if args.command == "run":
+            if args.dataset_id:
+                for dataset_id in args.dataset_id:
+                    _print_outcome(profile_dataset(conn, dataset_id, args.chunk_rows,
+                                                   args.top_k, args.force))
+            else:
+                outcomes = profile_catalog(conn, args.chunk_rows, args.top_k, args.force,
+                                           on_dataset=_print_outcome)
+                if not outcomes:
+                    print("No catalogued datasets (run python -m scripts.scan_catalog scan).")
+
+        elif args.command == "show":
+            df = get_column_profiles(conn, args.dataset_id)
+            if df.empty:
+                print(f"Dataset {args.dataset_id} has not been profiled.")
+            for col in df.itertuples(index=False):
+                top = ", ".join(f"{v} ({c:,})" for v, c in json.loads(col.top_values)[:5])
+                line = (f"   {col.column_name:<24} {col.kind:<8} nulls {col.null_count:>10,}  "
+                        f"distinct ~{col.distinct_approx:>10,}  min {col.min_value}  max {col.max_value}")
+                if col.kind == "numeric":
+                    variance = col.variance if col.variance is not None else float("nan")
+                    line += f"  mean {col.mean:.4g}  var {variance:.4g}"
+                print(line)
+                print(f"   {'':<24} top: {top}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+from datetime import datetime
+
+from app.data.cdc import CHANGE_LOGS, consumer_positions, current_seq, prune_consumed_changes
+from app.data.db import connect_database, table_exists
+from app.data.retention import RETENTION_POLICIES, archive_table, compact_table, plan_retention
+# the change-log consumers register their positions on import
+import app.services.clustering  # noqa: F401
+import app.services.similarity  # noqa: F401
+
+
+def _mb(n):
+    return f"{n / 1024 / 1024:.2f} MB"
+
+
+def _prune_change_log(conn, table_name, dry_run):
+    """Prune (or, dry run, report) the table's change log; returns changes deleted."""
+    if not table_exists(conn, CHANGE_LOGS[table_name]):
+        return 0
+    if dry_run:
+        positions = consumer_positions(conn, table_name)
+        upto = min(positions.values(), default=current_seq(conn, table_name))
+        print(f"   change log: would prune up to seq {upto} (consumers: {positions or 'none'})")
+        return 0
+    result = prune_consumed_changes(conn, table_name)
+    print(f"✂️  {CHANGE_LOGS[table_name]}: pruned {result['deleted']} changes up to seq "
+          f"{result['upto_seq']} (consumers: {result['positions'] or 'none'})")
+    return result["deleted"]
+
+
+def main():
+    """
+    Archive old / closed incidents and tickets, prune their change logs up
+to the oldest position a consumer (clusters, similarity vectors) still
+needs, then compact the database.
+
+    Run from multi_domain_platform/:
+        python -m scripts.run_retention --dry-run
+        python -m scripts.run_retention                    # -> data/archive.db
+        python -m scripts.run_retention --target parquet   # -> data/archive/<table>/*.parquet
+    """
+    parser = argparse.ArgumentParser(description="Move old rows out of the hot tables.")
+    parser.add_argument("--table", choices=sorted(RETENTION_POLICIES), action="append",
+                        help="table to process (default: all)")
+    parser.add_argument("--target", choices=["sqlite", "parquet"], default="sqlite")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would move")
+    parser.add_argument("--closed-after-days", type=int,
+                        help="override the policy: archive closed rows older than this")
+    parser.add_argument("--max-age-days", type=int,
+                        help="override the policy: archive any row older than this")
+    parser.add_argument("--as-of", help="reference date (YYYY-MM-DD), default today")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--no-compact", action="store_true",
+                        help="skip incremental vacuum + ANALYZE")
+    parser.add_argument("--keep-changes", action="store_true",
+                        help="do not prune the change logs")
+    args = parser.parse_args()
+
+    as_of = datetime.strptime(args.as_of, "%Y-%m-%d") if args.as_of else None
+    conn = connect_database()
+
+    for table_name in args.table or sorted(RETENTION_POLICIES):
+        policy = dict(RETENTION_POLICIES[table_name])
+        if args.closed_after_days is not None:
+            policy["closed_after_days"] = args.closed_after_days
+        if args.max_age_days is not None:
+            policy["max_age_days"] = args.max_age_days
+
+        plan = plan_retention(conn, table_name, policy, as_of)
+        print(f"🗄️  {table_name}: {plan['rows_to_archive']} of {plan['total_rows']} rows "
+              f"match the policy ({plan['oldest']} .. {plan['newest']})")
+        for status, n in plan["by_status"].items():
+            print(f"   {status:<18} {n:>10,}")
+
+        archived = 0
+        if plan["rows_to_archive"] and not args.dry_run:
+            result = archive_table(conn, table_name, args.target, policy, as_of, args.batch_size)
+            archived = result["archived"]
+            print(f"✅ Archived {result['archived']} rows in {result['batches']} batches "
+                  f"({result['seconds']:.2f}s) -> {args.target}")
+
+        pruned = 0
+        if not args.keep_changes:
+            pruned = _prune_change_log(conn, table_name, args.dry_run)
+
+        if not args.dry_run and not args.no_compact and (archived or pruned):
+            stats = compact_table(conn, table_name)
+            note = " (converted to auto_vacuum=INCREMENTAL)" if stats["converted"] else ""
+            print(f"🧹 {stats['schema']}: {_mb(stats['before']['size_bytes'])} -> "
+                  f"{_mb(stats['after']['size_bytes'])}{note}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+
+from app.data.db import connect_database
+from app.services.catalog import list_roots, register_root, scan_catalog
+
+
+def _size(n):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if n < 1024 or unit == "TB":
+            return f"{n:.1f} {unit}" if unit != "B" else f"{n} B"
+        n /= 1024
+
+
+def main():
+    """
+    Fill datasets_metadata from the data files under registered directories.
+
+    Run from multi_domain_platform/:
+        python -m scripts.scan_catalog add-root /data/lake --category "Data Science"
+        python -m scripts.scan_catalog roots
+        python -m scripts.scan_catalog scan --workers 8
+        python -m scripts.scan_catalog scan --force     # rescan unchanged files too
+    """
+    parser = argparse.ArgumentParser(description="Catalogue data files into datasets_metadata.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add-root", help="register a data directory")
+    add.add_argument("path")
+    add.add_argument("--category", help="category given to its datasets")
+
+    sub.add_parser("roots", help="list registered directories")
+
+    scan = sub.add_parser("scan", help="scan new / changed files")
+    scan.add_argument("--root", action="append", help="only this registered root (repeatable)")
+    scan.add_argument("--workers", type=int, default=os.cpu_count(),
+                      help="worker processes (default: CPU count)")
+    scan.add_argument("--force", action="store_true", help="rescan files even if unchanged")
+    args = parser.parse_args()
+
+    conn = connect_database()
+    try:
+        if args.command == "add-root":
+            path = register_root(conn, args.path, args.category)
+            print(f"✅ Registered {path}")
+
+        elif args.command == "roots":
+            roots = list_roots(conn)
+            if not roots:
+                print("No data directories registered (use add-root).")
+            for root in roots:
+                print(f"   {root['path']:<50} {root['category'] or '-':<16} "
+                      f"{root['files']:>8,} files  {_size(root['bytes']):>10}")
+
+        elif args.command == "scan":
+            def progress(stats):
+                if stats["scanned"] % 100 == 0:
+                    print(f"   ... {stats['scanned']:,} files scanned "
+                          f"({_size(stats['bytes_scanned'])})")
+
+            stats = scan_catalog(conn, roots=args.root, workers=args.workers,
+                                 force=args.force, on_progress=progress)
+            rate = stats["bytes_scanned"] / stats["seconds"] if stats["seconds"] else 0
+            print(f"✅ {stats['files']:,} files: {stats['scanned']:,} scanned, "
+                  f"{stats['skipped']:,} unchanged, {stats['removed']:,} removed, "
+                  f"{stats['errors']:,} errors in {stats['seconds']:.2f}s "
+                  f"({_size(rate)}/s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
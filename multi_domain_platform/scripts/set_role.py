@@ -0,0 +1,29 @@
+import argparse
+
+from app.data.migrations import ensure_schema
+from app.data.users import set_user_role
+
+
+def main():
+    """
+    Give an existing user a role, e.g. make them an administrator (the
+    Query Stats page is admin-only). Users registering on the Home page
+    always get the role "user".
+
+    Run from multi_domain_platform/:
+        python -m scripts.set_role alice admin
+        python -m scripts.set_role alice user
+    """
+    parser = argparse.ArgumentParser(description="Change a user's role.")
+    parser.add_argument("username")
+    parser.add_argument("role", choices=["user", "admin"])
+    args = parser.parse_args()
+
+    ensure_schema()
+    if not set_user_role(args.username, args.role):
+        raise SystemExit(f"❌ No user named {args.username}")
+    print(f"✅ {args.username} is now '{args.role}' (takes effect at their next login)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+
+from app.data.db import connect_database
+from app.services.similarity import (
+    DIM,
+    SIMILARITY_SOURCES,
+    similar_records,
+    similar_to_text,
+    update_index,
+)
+
+
+def _print_hits(df, table_name):
+    if df.empty:
+        print("No similar records found.")
+        return
+    text_col = SIMILARITY_SOURCES[table_name]["text"][-1]
+    for row in df.itertuples(index=False):
+        print(f"   {row.similarity:.3f}  #{row.id:<8} {str(getattr(row, text_col))[:70]}")
+
+
+def main():
+    """
+    Vector index of incidents / tickets for "similar records" lookups.
+
+    Run from multi_domain_platform/:
+        python -m scripts.similar_records build                  # append new / changed rows
+        python -m scripts.similar_records build --rebuild
+        python -m scripts.similar_records id cyber_incidents 1042 -k 5
+        python -m scripts.similar_records text it_tickets "vpn disconnects"
+    """
+    parser = argparse.ArgumentParser(description="Find similar incidents / tickets.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="update the vector files")
+    build.add_argument("--table", choices=sorted(SIMILARITY_SOURCES), action="append",
+                       help="table to index (default: all)")
+    build.add_argument("--rebuild", action="store_true", help="vectorize every row again")
+    build.add_argument("--dim", type=int, help=f"feature dimensions (default: kept, {DIM} for a new index; "
+                                               "changing it rebuilds)")
+
+    by_id = sub.add_parser("id", help="records similar to a stored record")
+    by_id.add_argument("table", choices=sorted(SIMILARITY_SOURCES))
+    by_id.add_argument("row_id", type=int)
+    by_id.add_argument("-k", type=int, default=10)
+
+    by_text = sub.add_parser("text", help="records similar to a description")
+    by_text.add_argument("table", choices=sorted(SIMILARITY_SOURCES))
+    by_text.add_argument("text")
+    by_text.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    conn = connect_database()
+    try:
+        if args.command == "build":
+            for table_name in args.table or sorted(SIMILARITY_SOURCES):
+                r = update_index(conn, table_name, dim=args.dim, rebuild=args.rebuild)
+                print(f"✅ {table_name}: {r['appended']:,} rows appended, {r['rewritten']:,} rewritten "
+                      f"in {r['seconds']:.2f}s ({r['rows']:,} indexed)")
+        elif args.command == "id":
+            update_index(conn, args.table)
+            _print_hits(similar_records(conn, args.table, args.row_id, args.k), args.table)
+        else:
+            update_index(conn, args.table)
+            _print_hits(similar_to_text(conn, args.table, args.text, args.k), args.table)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
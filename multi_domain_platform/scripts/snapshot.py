@@ -0,0 +1,95 @@
+import argparse
+import time
+
+from app.data.backup import (
+    KEEP_SNAPSHOTS,
+    PAGES_PER_STEP,
+    STEP_SLEEP,
+    SnapshotScheduler,
+    create_snapshot,
+    list_snapshots,
+    restore_snapshot,
+    rotate_snapshots,
+    snapshot_root,
+    verify_snapshot,
+)
+
+
+def _find(name):
+    for snap in list_snapshots():
+        if snap["name"] == name:
+            return snap["path"]
+    raise SystemExit(f"❌ No snapshot named {name} in {snapshot_root()}")
+
+
+def main():
+    """
+    Online snapshots of the SQLite database(s).
+
+    Run from multi_domain_platform/:
+        python -m scripts.snapshot create
+        python -m scripts.snapshot list
+        python -m scripts.snapshot verify 20250101-120000
+        python -m scripts.snapshot restore 20250101-120000   # stop Streamlit first
+        python -m scripts.snapshot schedule --every 3600 --keep 24
+    """
+    parser = argparse.ArgumentParser(description="Online backups of the SQLite store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for command in ("create", "schedule"):
+        p = sub.add_parser(command)
+        p.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="pages copied per step")
+        p.add_argument("--sleep", type=float, default=STEP_SLEEP, help="seconds between steps")
+        p.add_argument("--keep", type=int, default=KEEP_SNAPSHOTS, help="snapshots to keep")
+    sub.choices["schedule"].add_argument("--every", type=float, default=3600,
+                                         help="seconds between snapshots")
+    sub.add_parser("list")
+    for command in ("verify", "restore"):
+        sub.add_parser(command).add_argument("name")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        folder = create_snapshot(pages=args.pages, step_sleep=args.sleep)
+        deleted = rotate_snapshots(args.keep)
+        print(f"✅ Snapshot {folder.name} written and verified"
+              + (f" (rotated out {len(deleted)})" if deleted else ""))
+
+    elif args.command == "list":
+        snapshots = list_snapshots()
+        if not snapshots:
+            print(f"No snapshots in {snapshot_root()}")
+        for snap in snapshots:
+            print(f"   {snap['name']:<20} {snap['bytes'] / 1024 / 1024:>8.2f} MB  "
+                  f"{', '.join(snap['files'])}")
+
+    elif args.command == "verify":
+        problems = verify_snapshot(_find(args.name))
+        if problems:
+            print(f"❌ {args.name}:")
+            for problem in problems:
+                print(f"   {problem}")
+        else:
+            print(f"✅ {args.name}: checksums and integrity_check ok")
+
+    elif args.command == "restore":
+        restored = restore_snapshot(_find(args.name))
+        print(f"✅ Restored {', '.join(restored)} from {args.name}")
+
+    elif args.command == "schedule":
+        scheduler = SnapshotScheduler(
+            args.every, args.keep, pages=args.pages, step_sleep=args.sleep,
+            on_snapshot=lambda folder, deleted: print(f"✅ Snapshot {folder.name}"
+                                                      + (f", rotated out {len(deleted)}" if deleted else "")),
+            on_error=lambda e: print(f"❌ Snapshot failed: {e}"),
+        )
+        scheduler.start()
+        print(f"Taking a snapshot every {args.every:g}s, keeping {args.keep} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import sqlite3
+import time
+
+from app.data.db import CATALOG_FILE, SHARDS, get_data_dir
+from app.data.migrations import migrate
+from app.data.schema import create_change_log_tables
+
+
+# Objects that move with each domain (FTS indexes live next to their table)
+DOMAIN_OBJECTS = {
+    "users": ["users"],
+    "incidents": ["cyber_incidents", "cyber_incidents_fts", "cyber_incidents_changes"],
+    "datasets": ["datasets_metadata"],
+    "tickets": ["it_tickets", "it_tickets_fts", "it_tickets_changes"],
+}
+
+
+def table_columns(cursor, schema, table_name):
+    cursor.execute(f"PRAGMA {schema}.table_info({table_name})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def row_count(cursor, schema, table_name):
+    cursor.execute(f"SELECT COUNT(*) FROM {schema}.{table_name}")
+    return cursor.fetchone()[0]
+
+
+def split_database(data_dir, dry_run=False):
+    """
+    Move every domain out of the single database file into its shard.
+
+    All shards are attached to the catalog and the copy + drop runs as one
+    transaction. SQLite only commits a multi-file transaction atomically
+    (through a super-journal) when every file uses a rollback journal, not
+    in WAL mode, so the catalog and the shards are switched to
+    journal_mode=DELETE first; a crash or failure then leaves the single
+    file untouched. The writer threads (app/data/writer.py) switch the
+    files back to WAL the next time they open them.
+
+    Returns:
+        dict: base table -> rows moved
+    """
+    catalog_path = data_dir / CATALOG_FILE
+    backup_path = data_dir / CATALOG_FILE.replace(".db", ".pre-split.db")
+
+    conn = sqlite3.connect(str(catalog_path), isolation_level=None)
+    cursor = conn.cursor()
+
+    moved = {}
+    for domain, (_, tables) in SHARDS.items():
+        for table_name in tables:
+            moved[table_name] = row_count(cursor, "main", table_name)
+    if dry_run:
+        conn.close()
+        return moved
+
+    # keep a copy of the original file (online backup, consistent snapshot)
+    backup = sqlite3.connect(str(backup_path))
+    conn.backup(backup)
+    backup.close()
+    print(f"💾 Backup written to {backup_path.name}")
+
+    # bring the single file to the current schema first, so the copy
+    # below moves every column the shard tables have
+    migrate(conn)
+
+    for domain, (filename, _) in SHARDS.items():
+        cursor.execute("ATTACH DATABASE ? AS " + domain, (str(data_dir / filename),))
+
+    # rollback journal on every file, or the transaction below is only
+    # atomic per file (needs no other connection on the catalog)
+    for schema in ["main", *SHARDS]:
+        cursor.execute(f"PRAGMA {schema}.journal_mode = DELETE")
+        mode = cursor.fetchone()[0]
+        if mode != "delete":
+            conn.close()
+            raise RuntimeError(
+                f"{schema}: could not leave journal_mode={mode} (is Streamlit still running?)"
+            )
+
+    # create the tables in the shards at the current schema version
+    # (domain_schema resolves to the attached schema); outside the copy
+    # transaction, empty shard files are harmless
+    migrate(conn)
+
+    cursor.execute("BEGIN")
+    try:
+        for domain, (_, tables) in SHARDS.items():
+            for table_name in tables:
+                log = f"{table_name}_changes"
+                if log in DOMAIN_OBJECTS[domain]:
+                    # moving rows is not a change: bring the existing log
+                    # over as-is (the insert trigger is recreated below)
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {domain}.{table_name}_cdc_ai")
+                columns = ", ".join(table_columns(cursor, "main", table_name))
+                # the shard's FTS triggers index the rows as they arrive
+                cursor.execute(
+                    f"INSERT INTO {domain}.{table_name} ({columns}) "
+                    f"SELECT {columns} FROM main.{table_name}"
+                )
+                cursor.execute(
+                    f"UPDATE {domain}.sqlite_sequence SET seq = "
+                    f"(SELECT seq FROM main.sqlite_sequence WHERE name = ?) "
+                    f"WHERE name = ? AND EXISTS "
+                    f"(SELECT 1 FROM main.sqlite_sequence WHERE name = ?)",
+                    (table_name, table_name, table_name),
+                )
+                copied = row_count(cursor, domain, table_name)
+                if copied != moved[table_name]:
+                    raise RuntimeError(
+                        f"{table_name}: copied {copied} rows, expected {moved[table_name]}"
+                    )
+
+                cursor.execute(
+                    "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?", (log,)
+                )
+                if log in DOMAIN_OBJECTS[domain] and cursor.fetchone():
+                    # explicit seq values also advance the shard's sqlite_sequence
+                    cursor.execute(f"INSERT INTO {domain}.{log} SELECT * FROM main.{log}")
+
+            # dropping a table drops its triggers; dropping an FTS table
+            # drops its shadow tables
+            for name in reversed(DOMAIN_OBJECTS[domain]):
+                cursor.execute(f"DROP TABLE IF EXISTS main.{name}")
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        conn.close()
+        raise
+
+    create_change_log_tables(conn)   # restore the insert triggers dropped for the copy
+
+    for domain in SHARDS:
+        cursor.execute(f"DETACH DATABASE {domain}")
+    cursor.execute("VACUUM")  # give the moved pages back to the filesystem
+    conn.close()
+    return moved
+
+
+def main():
+    """
+    Split data/intelligence_platform.db into one SQLite file per domain.
+
+    Run from multi_domain_platform/ (stop Streamlit first):
+        python -m scripts.split_database --dry-run
+        python -m scripts.split_database
+
+    Afterwards connect_database() detects the shard files and attaches
+    them; the original file is kept as intelligence_platform.pre-split.db.
+    """
+    parser = argparse.ArgumentParser(description="Split the database into per-domain shards.")
+    parser.add_argument("--dry-run", action="store_true", help="only show what would move")
+    args = parser.parse_args()
+
+    data_dir = get_data_dir()
+    existing = [f for f, _ in SHARDS.values() if (data_dir / f).exists()]
+    if existing and not args.dry_run:
+        print(f"❌ Shard files already exist in {data_dir}: {', '.join(existing)}")
+        return
+    if not (data_dir / CATALOG_FILE).exists():
+        print(f"❌ {CATALOG_FILE} not found in {data_dir}")
+        return
+
+    start = time.perf_counter()
+    moved = split_database(data_dir, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    for domain, (filename, tables) in SHARDS.items():
+        for table_name in tables:
+            verb = "would move" if args.dry_run else "moved"
+            print(f"   {table_name:<18} {verb} {moved[table_name]:>10,} rows -> {filename}")
+    if not args.dry_run:
+        print(f"✅ Split into {len(SHARDS)} shards in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()